@@ -1,32 +1,129 @@
 using System;
 using System.Text.Json;
 using System.Collections.Generic;
+using System.Reflection;
 using PKHeX.Core;
 
 namespace PokeLastCatch
 {
     internal static class Program
     {
+        // Método SaveUtil.GetVariantSAV resuelto por reflexión (se busca una sola vez por proceso).
+        private static MethodInfo? _getVariantSav;
+        private static Type? _getVariantSavParam;
+
         private static int Main(string[] args)
         {
             if (args.Length < 1)
             {
-                Console.Error.WriteLine("Uso: PokeLastCatch <ruta_save>");
+                Console.Error.WriteLine("Uso: PokeLastCatch <ruta_save> [--bits | --cajas] | PokeLastCatch --server");
                 return 1;
             }
 
+            if (args[0] == "--server")
+                return EjecutarServidor();
+
             var savePath = args[0];
+            var bits = Array.IndexOf(args, "--bits", 1) >= 0;
 
             try
             {
-                // Carga el archivo de guardado en memoria.
-                var data = System.IO.File.ReadAllBytes(savePath);
+                if (Array.IndexOf(args, "--cajas", 1) >= 0)
+                {
+                    // NDJSON: una línea por slot ocupado, escrita según se recorre.
+                    RecorrerCajas(savePath, registro => Console.WriteLine(JsonSerializer.Serialize(registro)));
+                    return 0;
+                }
+
+                var resultado = LeerSave(savePath, bits);
+                Console.WriteLine(resultado == null ? "{}" : JsonSerializer.Serialize(resultado));
+                return 0;
+            }
+            catch (SaveNoReconocidoException ex)
+            {
+                Console.Error.WriteLine(ex.Message);
+                return 1;
+            }
+            catch (Exception ex)
+            {
+                Console.Error.WriteLine("Error: " + ex.Message);
+                return 1;
+            }
+        }
+
+        /// <summary>
+        /// Modo persistente: lee peticiones JSON (una por línea) de stdin y responde una línea JSON por petición.
+        /// Petición: {"id": 1, "op": "parse", "path": "...", "bits": true} | {"op": "ping"} | {"op": "exit"}
+        /// Con "bits": true la Pokédex va como bitsets en base64 (SeenBits/CaughtBits) en vez de listas.
+        ///           {"id": 2, "op": "boxes", "path": "..."}
+        /// Respuesta: {"id": 1, "ok": true, "data": {...}} | {"id": 1, "ok": false, "error": "..."}
+        /// "boxes" responde en streaming: una línea {"id": 2, "slot": {...}} por slot ocupado y al final
+        /// {"id": 2, "ok": true, "total": N}.
+        /// </summary>
+        private static int EjecutarServidor()
+        {
+            string? linea;
+            while ((linea = Console.In.ReadLine()) != null)
+            {
+                if (string.IsNullOrWhiteSpace(linea))
+                    continue;
+
+                long? id = null;
+                string respuesta;
+                var salir = false;
+                try
+                {
+                    using var doc = JsonDocument.Parse(linea);
+                    var req = doc.RootElement;
+                    if (req.TryGetProperty("id", out var idProp) && idProp.TryGetInt64(out var idValor))
+                        id = idValor;
+                    var op = req.TryGetProperty("op", out var opProp) ? opProp.GetString() : "parse";
+
+                    if (op == "ping" || op == "exit")
+                    {
+                        salir = op == "exit";
+                        respuesta = JsonSerializer.Serialize(new { id, ok = true });
+                    }
+                    else if (op == "parse")
+                    {
+                        var path = req.GetProperty("path").GetString() ?? "";
+                        var bits = req.TryGetProperty("bits", out var bitsProp) && bitsProp.ValueKind == JsonValueKind.True;
+                        var data = LeerSave(path, bits) ?? new { };
+                        respuesta = JsonSerializer.Serialize(new { id, ok = true, data });
+                    }
+                    else if (op == "boxes")
+                    {
+                        var path = req.GetProperty("path").GetString() ?? "";
+                        var total = RecorrerCajas(
+                            path,
+                            registro => Console.Out.WriteLine(JsonSerializer.Serialize(new { id, slot = registro }))
+                        );
+                        respuesta = JsonSerializer.Serialize(new { id, ok = true, total });
+                    }
+                    else
+                    {
+                        respuesta = JsonSerializer.Serialize(new { id, ok = false, error = "Operación desconocida: " + op });
+                    }
+                }
+                catch (Exception ex)
+                {
+                    respuesta = JsonSerializer.Serialize(new { id, ok = false, error = ex.Message });
+                }
 
-                // Intenta detectar automáticamente el tipo de guardado (Ultra Sol/Ultra Luna, etc.).
+                Console.Out.WriteLine(respuesta);
+                Console.Out.Flush();
+                if (salir)
+                    break;
+            }
+            return 0;
+        }
+
+        private static SaveFile? CargarSaveFile(byte[] data)
+        {
+            if (_getVariantSav == null)
+            {
                 // Usamos reflexión para adaptarnos a pequeñas diferencias de versión en PKHeX.Core.
-                SaveFile? sav = null;
-                var methods = typeof(SaveUtil).GetMethods();
-                foreach (var m in methods)
+                foreach (var m in typeof(SaveUtil).GetMethods())
                 {
                     if (m.Name != "GetVariantSAV")
                         continue;
@@ -35,155 +132,214 @@ namespace PokeLastCatch
                     if (ps.Length != 1)
                         continue;
 
-                    object arg;
                     var paramType = ps[0].ParameterType;
-                    if (paramType == typeof(byte[]))
-                        arg = data;
-                    else if (paramType == typeof(System.Memory<byte>))
-                        arg = new System.Memory<byte>(data);
-                    else
+                    if (paramType != typeof(byte[]) && paramType != typeof(System.Memory<byte>))
                         continue;
 
-                    var result = m.Invoke(null, new[] { arg });
-                    sav = result as SaveFile;
-                    if (sav != null)
-                        break;
+                    _getVariantSav = m;
+                    _getVariantSavParam = paramType;
+                    break;
                 }
+                if (_getVariantSav == null)
+                    return null;
+            }
 
-                if (sav == null)
-                {
-                    Console.Error.WriteLine("No se pudo reconocer el archivo de guardado.");
-                    return 1;
-                }
+            object arg = _getVariantSavParam == typeof(byte[]) ? (object)data : new System.Memory<byte>(data);
+            return _getVariantSav.Invoke(null, new[] { arg }) as SaveFile;
+        }
+
+        /// <summary>
+        /// Lee el save y construye el objeto que se serializa a JSON.
+        /// Devuelve null si no hay ningún Pokémon con fecha de captura.
+        /// Con bits = true, visto/capturado van como bitsets little endian en base64
+        /// (bit N = especie N) en lugar de listas de IDs.
+        /// </summary>
+        private static object? LeerSave(string savePath, bool bits = false)
+        {
+            // Carga el archivo de guardado en memoria.
+            var data = System.IO.File.ReadAllBytes(savePath);
 
-                PKM ultimoPkm = null;
-                DateTime? ultimaFecha = null;
-                var party = new List<object>();
+            // Intenta detectar automáticamente el tipo de guardado (Ultra Sol/Ultra Luna, etc.).
+            var sav = CargarSaveFile(data);
+            if (sav == null)
+                throw new SaveNoReconocidoException();
 
-                // Equipo actual
-                for (int i = 0; i < sav.PartyCount; i++)
+            PKM ultimoPkm = null;
+            DateTime? ultimaFecha = null;
+            var party = new List<object>();
+
+            // Equipo actual
+            for (int i = 0; i < sav.PartyCount; i++)
+            {
+                var pkm = sav.GetPartySlotAtIndex(i);
+                if (pkm != null && pkm.Species != 0)
                 {
-                    var pkm = sav.GetPartySlotAtIndex(i);
-                    if (pkm != null && pkm.Species != 0)
-                    {
-                        var friendship = GetIntProperty(
+                    var friendship = GetIntProperty(
+                        pkm,
+                        "CurrentFriendship",
+                        GetIntProperty(
                             pkm,
-                            "CurrentFriendship",
-                            GetIntProperty(
-                                pkm,
-                                "OT_Friendship",
-                                GetIntProperty(pkm, "HT_Friendship", -1)
-                            )
-                        );
-                        party.Add(new
-                        {
-                            SpeciesId = (int)pkm.Species,
-                            Species = pkm.Species.ToString(),
-                            Nickname = pkm.Nickname,
-                            MetDate = pkm.MetDate,
-                            Level = pkm.CurrentLevel,
-                            OT = pkm.OT_Name,
-                            EncounterType = (int)pkm.EncounterType,
-                            MetLocation = (int)pkm.Met_Location,
-                            EggLocation = (int)pkm.Egg_Location,
-                            Ball = (int)pkm.Ball,
-                            IsEgg = pkm.IsEgg,
-                            Friendship = friendship
-                        });
-                    }
+                            "OT_Friendship",
+                            GetIntProperty(pkm, "HT_Friendship", -1)
+                        )
+                    );
+                    party.Add(new
+                    {
+                        SpeciesId = (int)pkm.Species,
+                        Species = pkm.Species.ToString(),
+                        Nickname = pkm.Nickname,
+                        MetDate = pkm.MetDate,
+                        Level = pkm.CurrentLevel,
+                        OT = pkm.OT_Name,
+                        EncounterType = (int)pkm.EncounterType,
+                        MetLocation = (int)pkm.Met_Location,
+                        EggLocation = (int)pkm.Egg_Location,
+                        Ball = (int)pkm.Ball,
+                        IsEgg = pkm.IsEgg,
+                        Friendship = friendship
+                    });
+                }
+                ProcesarPokemon(pkm, ref ultimoPkm, ref ultimaFecha);
+            }
+
+            // Cajas
+            for (int box = 0; box < sav.BoxCount; box++)
+            {
+                for (int slot = 0; slot < sav.BoxSlotCount; slot++)
+                {
+                    var pkm = sav.GetBoxSlotAtIndex(box, slot);
                     ProcesarPokemon(pkm, ref ultimoPkm, ref ultimaFecha);
                 }
+            }
+
+            if (ultimoPkm == null || ultimaFecha == null)
+                return null;
 
-                // Cajas
-                for (int box = 0; box < sav.BoxCount; box++)
+            var hasDex = sav.HasPokeDex;
+            var maxSpecies = (int)sav.MaxSpeciesID;
+            var seen = hasDex ? sav.SeenCount : 0;
+            var caught = hasDex ? sav.CaughtCount : 0;
+            var seenPercent = maxSpecies > 0 ? Math.Round((seen * 100.0) / maxSpecies, 2) : 0.0;
+            var caughtPercent = maxSpecies > 0 ? Math.Round((caught * 100.0) / maxSpecies, 2) : 0.0;
+            var tid = GetIntProperty(sav, "TID16", GetIntProperty(sav, "TID", -1));
+            var sid = GetIntProperty(sav, "SID16", GetIntProperty(sav, "SID", -1));
+            // Con --bits solo se rellenan los bitsets; las listas son para la salida clásica.
+            List<int>? seenSpecies = bits ? null : new List<int>();
+            List<int>? caughtSpecies = bits ? null : new List<int>();
+            var seenBits = new byte[maxSpecies / 8 + 1];
+            var caughtBits = new byte[maxSpecies / 8 + 1];
+            if (hasDex)
+            {
+                for (ushort species = 1; species <= sav.MaxSpeciesID; species++)
                 {
-                    for (int slot = 0; slot < sav.BoxSlotCount; slot++)
+                    if (sav.GetSeen(species))
                     {
-                        var pkm = sav.GetBoxSlotAtIndex(box, slot);
-                        ProcesarPokemon(pkm, ref ultimoPkm, ref ultimaFecha);
+                        seenSpecies?.Add(species);
+                        seenBits[species >> 3] |= (byte)(1 << (species & 7));
+                    }
+                    if (sav.GetCaught(species))
+                    {
+                        caughtSpecies?.Add(species);
+                        caughtBits[species >> 3] |= (byte)(1 << (species & 7));
                     }
                 }
+            }
 
-                if (ultimoPkm == null || ultimaFecha == null)
+            object pokedex = bits
+                ? new
                 {
-                    Console.WriteLine("{}");
-                    return 0;
+                    Enabled = hasDex,
+                    Seen = seen,
+                    Caught = caught,
+                    MaxSpecies = maxSpecies,
+                    SeenPercent = seenPercent,
+                    CaughtPercent = caughtPercent,
+                    SeenBits = Convert.ToBase64String(seenBits),
+                    CaughtBits = Convert.ToBase64String(caughtBits)
                 }
-
-                var hasDex = sav.HasPokeDex;
-                var maxSpecies = (int)sav.MaxSpeciesID;
-                var seen = hasDex ? sav.SeenCount : 0;
-                var caught = hasDex ? sav.CaughtCount : 0;
-                var seenPercent = maxSpecies > 0 ? Math.Round((seen * 100.0) / maxSpecies, 2) : 0.0;
-                var caughtPercent = maxSpecies > 0 ? Math.Round((caught * 100.0) / maxSpecies, 2) : 0.0;
-                var tid = GetIntProperty(sav, "TID16", GetIntProperty(sav, "TID", -1));
-                var sid = GetIntProperty(sav, "SID16", GetIntProperty(sav, "SID", -1));
-                var seenSpecies = new List<int>();
-                var caughtSpecies = new List<int>();
-                if (hasDex)
+                : new
                 {
-                    for (ushort species = 1; species <= sav.MaxSpeciesID; species++)
-                    {
-                        if (sav.GetSeen(species))
-                            seenSpecies.Add(species);
-                        if (sav.GetCaught(species))
-                            caughtSpecies.Add(species);
-                    }
-                }
+                    Enabled = hasDex,
+                    Seen = seen,
+                    Caught = caught,
+                    MaxSpecies = maxSpecies,
+                    SeenPercent = seenPercent,
+                    CaughtPercent = caughtPercent,
+                    SeenSpecies = seenSpecies,
+                    CaughtSpecies = caughtSpecies
+                };
 
-                var resultado = new
+            return new
+            {
+                Trainer = new
                 {
-                    Trainer = new
-                    {
-                        Name = sav.OT,
-                        TID = tid,
-                        SID = sid,
-                        Money = sav.Money,
-                        PlayTime = sav.PlayTimeString,
-                        GameVersion = sav.Version.ToString(),
-                        Generation = (int)sav.Generation
-                    },
-                    Pokedex = new
-                    {
-                        Enabled = hasDex,
-                        Seen = seen,
-                        Caught = caught,
-                        MaxSpecies = maxSpecies,
-                        SeenPercent = seenPercent,
-                        CaughtPercent = caughtPercent,
-                        SeenSpecies = seenSpecies,
-                        CaughtSpecies = caughtSpecies
-                    },
-                    Last = new
-                    {
-                        SpeciesId = (int)ultimoPkm.Species,
-                        Species = ultimoPkm.Species.ToString(),
-                        Nickname = ultimoPkm.Nickname,
-                        MetDate = ultimaFecha.Value.ToString("yyyy-MM-dd"),
-                        Level = ultimoPkm.CurrentLevel,
-                        OT = ultimoPkm.OT_Name,
-                        Friendship = GetIntProperty(
+                    Name = sav.OT,
+                    TID = tid,
+                    SID = sid,
+                    Money = sav.Money,
+                    PlayTime = sav.PlayTimeString,
+                    GameVersion = sav.Version.ToString(),
+                    Generation = (int)sav.Generation
+                },
+                Pokedex = pokedex,
+                Last = new
+                {
+                    SpeciesId = (int)ultimoPkm.Species,
+                    Species = ultimoPkm.Species.ToString(),
+                    Nickname = ultimoPkm.Nickname,
+                    MetDate = ultimaFecha.Value.ToString("yyyy-MM-dd"),
+                    Level = ultimoPkm.CurrentLevel,
+                    OT = ultimoPkm.OT_Name,
+                    Friendship = GetIntProperty(
+                        ultimoPkm,
+                        "CurrentFriendship",
+                        GetIntProperty(
                             ultimoPkm,
-                            "CurrentFriendship",
-                            GetIntProperty(
-                                ultimoPkm,
-                                "OT_Friendship",
-                                GetIntProperty(ultimoPkm, "HT_Friendship", -1)
-                            )
+                            "OT_Friendship",
+                            GetIntProperty(ultimoPkm, "HT_Friendship", -1)
                         )
-                    },
-                    Party = party
-                };
+                    )
+                },
+                Party = party
+            };
+        }
 
-                var json = JsonSerializer.Serialize(resultado);
-                Console.WriteLine(json);
-                return 0;
-            }
-            catch (Exception ex)
+        /// <summary>
+        /// Recorre todas las cajas y llama a emitir con un registro por slot ocupado
+        /// (Box y Slot empiezan en 1). Devuelve cuántos registros se emitieron.
+        /// </summary>
+        private static int RecorrerCajas(string savePath, Action<object> emitir)
+        {
+            var sav = CargarSaveFile(System.IO.File.ReadAllBytes(savePath));
+            if (sav == null)
+                throw new SaveNoReconocidoException();
+
+            var total = 0;
+            for (int box = 0; box < sav.BoxCount; box++)
             {
-                Console.Error.WriteLine("Error: " + ex.Message);
-                return 1;
+                for (int slot = 0; slot < sav.BoxSlotCount; slot++)
+                {
+                    var pkm = sav.GetBoxSlotAtIndex(box, slot);
+                    if (pkm == null || pkm.Species == 0)
+                        continue;
+                    emitir(new
+                    {
+                        Box = box + 1,
+                        Slot = slot + 1,
+                        SpeciesId = (int)pkm.Species,
+                        Species = pkm.Species.ToString(),
+                        Nickname = pkm.Nickname,
+                        Level = pkm.CurrentLevel,
+                        Ball = (int)pkm.Ball,
+                        MetDate = ((DateTime?)pkm.MetDate)?.ToString("yyyy-MM-dd"),
+                        MetLocation = (int)pkm.Met_Location,
+                        OT = pkm.OT_Name,
+                        IsEgg = pkm.IsEgg
+                    });
+                    total++;
+                }
             }
+            return total;
         }
 
         private static void ProcesarPokemon(PKM pkm, ref PKM ultimoPkm, ref DateTime? ultimaFecha)
@@ -220,5 +376,13 @@ namespace PokeLastCatch
                 return fallback;
             }
         }
+
+        private sealed class SaveNoReconocidoException : Exception
+        {
+            public SaveNoReconocidoException()
+                : base("No se pudo reconocer el archivo de guardado.")
+            {
+            }
+        }
     }
 }
@@ -0,0 +1,257 @@
+"""
+Cache persistente (SQLite, un solo archivo) de respuestas JSON de PokeAPI.
+
+Guarda los cuerpos comprimidos junto con ETag/Last-Modified para revalidar con 304,
+caduca por TTL, limita el tamaño total con desalojo LRU y lleva contadores de aciertos/fallos.
+La comparten `ui_equipo.py` y `mostrar_equipo.py` (y cualquier otro proceso en la misma máquina).
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import control_http
+import trazas
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+RUTA_CACHE_API = os.path.join(CACHE_DIR, "pokeapi.sqlite3")
+
+# Los datos de PokeAPI casi no cambian: tras el TTL se revalida con ETag en vez de descargar de nuevo.
+CACHE_TTL_SECONDS = 30 * 24 * 3600
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+class EntradaCache:
+    __slots__ = ("data", "etag", "last_modified", "fresca")
+
+    def __init__(self, data, etag, last_modified, fresca):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fresca = fresca
+
+
+class ApiCache:
+    def __init__(self, ruta=RUTA_CACHE_API, ttl=CACHE_TTL_SECONDS, max_bytes=CACHE_MAX_BYTES):
+        self.ruta = ruta
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "revalidated": 0, "stored": 0, "evicted": 0}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        self._db = sqlite3.connect(ruta, timeout=5, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS respuestas (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_respuestas_accessed ON respuestas(accessed_at)")
+
+    def get(self, url):
+        """Devuelve una EntradaCache (fresca o caducada) o None si la URL no está guardada."""
+        ahora = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM respuestas WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self._db.execute("UPDATE respuestas SET accessed_at = ? WHERE url = ?", (ahora, url))
+            fresca = (ahora - row[3]) < self.ttl
+            self.stats["hits" if fresca else "stale"] += 1
+        data = json.loads(zlib.decompress(row[0]))
+        return EntradaCache(data, row[1], row[2], fresca)
+
+    def put(self, url, data, etag=None, last_modified=None):
+        body = zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"), 6)
+        ahora = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO respuestas (url, body, etag, last_modified, fetched_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, ahora, ahora, len(body)),
+            )
+            self.stats["stored"] += 1
+            self._desalojar()
+
+    def marcar_revalidada(self, url):
+        """El servidor respondió 304: el cuerpo guardado sigue siendo válido otro TTL."""
+        ahora = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE respuestas SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                (ahora, ahora, url),
+            )
+            self.stats["revalidated"] += 1
+
+    def _desalojar(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM respuestas").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Se libera hasta el 90% del límite para no desalojar en cada inserción.
+        objetivo = total - int(self.max_bytes * 0.9)
+        liberado = 0
+        urls = []
+        for url, size in self._db.execute("SELECT url, size FROM respuestas ORDER BY accessed_at ASC"):
+            urls.append((url,))
+            liberado += size
+            if liberado >= objetivo:
+                break
+        self._db.executemany("DELETE FROM respuestas WHERE url = ?", urls)
+        self.stats["evicted"] += len(urls)
+
+    def resumen(self):
+        with self._lock:
+            n, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM respuestas").fetchone()
+            return dict(self.stats, entries=n, bytes=total)
+
+    def cerrar(self):
+        with self._lock:
+            self._db.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def obtener_cache():
+    """Instancia compartida del proceso (se abre bajo demanda)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ApiCache()
+        return _cache
+
+
+def api_get_json(session, url, timeout=12, retries=3, log=False, log_tag="api", cache=None):
+    """
+    GET de PokeAPI pasando por la cache en disco.
+    Si la entrada está fresca no hay red; si caducó se revalida con If-None-Match/If-Modified-Since;
+    si la red falla y hay copia caducada, se devuelve esa copia.
+    Las peticiones simultáneas a la misma URL comparten una descarga y el ritmo hacia la red lo
+    controla `control_http` (limitador, backoff con jitter y disyuntor).
+    """
+    with trazas.tramo("api.get", url=url, tag=log_tag) as tramo:
+        data, compartida = control_http.vuelos.hacer(
+            url, lambda: _api_get_json(session, url, timeout, retries, log, log_tag, cache or obtener_cache(), tramo)
+        )
+        if compartida:
+            tramo.set(compartida=True)
+            control_http.control_para(url).stats["compartidas"] += 1
+        return data
+
+
+def _api_get_json(session, url, timeout, retries, log, log_tag, cache, tramo):
+    import requests
+
+    entrada = cache.get(url)
+    if entrada is not None and entrada.fresca:
+        tramo.set(cache="hit")
+        if log:
+            print(f"[{log_tag}] CACHE -> {url}", flush=True)
+        return entrada.data
+    tramo.set(cache="stale" if entrada is not None else "miss")
+
+    headers = {}
+    if entrada is not None:
+        if entrada.etag:
+            headers["If-None-Match"] = entrada.etag
+        if entrada.last_modified:
+            headers["If-Modified-Since"] = entrada.last_modified
+
+    control = control_http.control_para(url)
+    last_error = None
+    for attempt in range(retries):
+        # Con PokeAPI caída o pidiendo esperar más que el timeout no se va a la red: se falla rápido.
+        if not control.disyuntor.permitir():
+            return _sin_red(url, entrada, "circuito abierto", log, log_tag, control, tramo)
+        espera = control.cubo.tomar(max_espera=timeout)
+        if espera is None:
+            control.disyuntor.cancelar()
+            return _sin_red(url, entrada, "limite de ritmo", log, log_tag, control, tramo)
+        if espera:
+            control.stats["esperas"] += 1
+            tramo.set(espera_ms=round(espera * 1000, 1))
+
+        t0 = time.perf_counter()
+        tramo.set(intentos=attempt + 1)
+        retry_after = None
+        try:
+            with trazas.tramo("api.http", intento=attempt + 1) as http:
+                r = session.get(url, timeout=timeout, headers=headers)
+                http.set(status=r.status_code)
+            tramo.set(status=r.status_code)
+            retry_after = control.observar(r)
+            if r.status_code == 304 and entrada is not None:
+                control.disyuntor.exito()
+                cache.marcar_revalidada(url)
+                if log:
+                    ms = int((time.perf_counter() - t0) * 1000)
+                    print(f"[{log_tag}] 304 revalidado {ms}ms -> {url}", flush=True)
+                return entrada.data
+            r.raise_for_status()
+            control.disyuntor.exito()
+            if log:
+                ms = int((time.perf_counter() - t0) * 1000)
+                print(f"[{log_tag}] OK intento {attempt + 1}/{retries} [{r.status_code}] {ms}ms -> {url}", flush=True)
+            with trazas.tramo("api.json", bytes=len(r.content)):
+                data = r.json()
+            cache.put(url, data, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+            return data
+        except requests.RequestException as ex:
+            last_error = ex
+            status = None
+            if getattr(ex, "response", None) is not None:
+                status = ex.response.status_code
+            if log:
+                ms = int((time.perf_counter() - t0) * 1000)
+                print(f"[{log_tag}] ERROR intento {attempt + 1}/{retries} [HTTP {status or '-'}] {ms}ms -> {url} | {ex}", flush=True)
+            if status is not None and status not in control_http.ESTADOS_REINTENTABLES:
+                # 404 y compañía: el servidor responde bien, reintentar no cambia nada.
+                control.disyuntor.exito()
+                break
+            control.disyuntor.fallo()
+            if attempt + 1 < retries:
+                pausa = control_http.espera_reintento(attempt, retry_after)
+                if pausa > timeout:
+                    break
+                time.sleep(pausa)
+        except BaseException:
+            # Error que no es de red: si este intento era la prueba del disyuntor, queda libre para otro.
+            control.disyuntor.cancelar()
+            raise
+    if entrada is not None:
+        # Sin red: mejor un dato caducado que nada.
+        tramo.set(cache="stale-fallback")
+        if log:
+            print(f"[{log_tag}] usando copia caducada tras {retries} intentos -> {url}", flush=True)
+        return entrada.data
+    if log:
+        print(f"[{log_tag}] FALLO FINAL tras {retries} intentos -> {url}", flush=True)
+    raise last_error if last_error else RuntimeError("Error consultando API")
+
+
+def _sin_red(url, entrada, motivo, log, log_tag, control, tramo):
+    """Respuesta inmediata sin tocar la red: la copia caducada si la hay; si no, `CircuitoAbierto`."""
+    control.stats["fallos_rapidos"] += 1
+    tramo.set(fallo_rapido=motivo)
+    if entrada is not None:
+        tramo.set(cache="stale-fallback")
+        if log:
+            print(f"[{log_tag}] {motivo}: usando copia caducada -> {url}", flush=True)
+        return entrada.data
+    raise control_http.CircuitoAbierto(f"PokeAPI no disponible ({motivo}) -> {url}")
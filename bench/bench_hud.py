@@ -0,0 +1,346 @@
+"""
+Benchmark del HUD sin red, sin emulador y sin .NET.
+
+Levanta el PokeAPI local (`pokeapi_local.py`), aísla las caches en un directorio temporal y mide:
+
+- piezas sueltas: lector nativo y huellas de un save con todas las cajas llenas, índice de la
+  Pokédex completa, análisis de tipos;
+- arranque: primer cuadro del HUD con una instantánea de la sesión anterior y llegada de la
+  lectura fresca del save;
+- piezas del HUD (necesitan Tk): `render_data` con cada fixture (primer pintado y tarjetas completas),
+  `obtener_info_pokedex`, `obtener_siguiente_evolucion` (en frío y en caliente) y la apertura de la
+  Pokédex completa;
+- extremo a extremo: desde que se reescribe el save hasta que el HUD termina de repintar.
+
+El informe es JSON (`--salida`); con `--comparar base.json` se sale con código 1 si alguna mediana
+empeora más que `--tolerancia`. Con `--trazas ruta.json` se exportan además los tramos de toda la
+ejecución (ver `trazas.py`) y el informe incluye su resumen por etapa.
+
+    python bench/bench_hud.py --latencia-ms 40 --salida bench_report.json
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+DIR_BENCH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(DIR_BENCH))
+sys.path.insert(0, DIR_BENCH)
+
+import api_cache  # noqa: E402
+import historial_progreso  # noqa: E402
+import indice_evoluciones  # noqa: E402
+import instantanea  # noqa: E402
+import nombres_especies  # noqa: E402
+import trazas  # noqa: E402
+from fixtures import FIXTURES_WRAPPER, cargar_fixture, escribir_save  # noqa: E402
+from pokeapi_local import RespuestasGrabadas, RespuestasSinteticas, ServidorPokeAPI, redirigir_requests  # noqa: E402
+
+ESPECIES_MUESTRA = (1, 25, 133, 150, 249, 380, 493, 649, 718, 800)
+TIMEOUT_ESPERA_SECONDS = 60
+
+
+class Medidor:
+    def __init__(self):
+        self.muestras = {}
+
+    def agregar(self, nombre, ms):
+        self.muestras.setdefault(nombre, []).append(ms)
+
+    def medir(self, nombre, fn, *args, repeticiones=1):
+        resultado = None
+        for _ in range(repeticiones):
+            t0 = time.perf_counter()
+            resultado = fn(*args)
+            self.agregar(nombre, (time.perf_counter() - t0) * 1000)
+        return resultado
+
+    def resumen(self):
+        salida = {}
+        for nombre, ms in sorted(self.muestras.items()):
+            orden = sorted(ms)
+            salida[nombre] = {
+                "n": len(ms),
+                "min_ms": round(orden[0], 3),
+                "mediana_ms": round(statistics.median(orden), 3),
+                "p95_ms": round(orden[min(len(orden) - 1, int(len(orden) * 0.95))], 3),
+                "max_ms": round(orden[-1], 3),
+            }
+        return salida
+
+
+# --- piezas sin Tk ---
+
+def bench_piezas(medidor, dir_tmp, repeticiones):
+    import save_gen7
+    from indice_pokedex import IndicePokedex
+    from tipos_gen7 import analisis_equipo
+
+    ruta_save = os.path.join(dir_tmp, "main")
+    escribir_save(ruta_save)
+    medidor.medir("save.decodificar_cajas_llenas", save_gen7.decodificar_save, ruta_save, repeticiones=repeticiones)
+    medidor.medir("save.huellas_secciones", save_gen7.huellas_secciones, ruta_save, repeticiones=repeticiones)
+
+    # Cada repetición con otro dinero: el historial no anexa snapshots repetidos.
+    historial = historial_progreso.HistorialProgreso(ruta_save, directorio=os.path.join(dir_tmp, "historial_piezas"))
+    datos = save_gen7.decodificar_save(ruta_save)
+    dinero = iter(range(10 ** 6))
+    medidor.medir(
+        "historial.anexar",
+        lambda: historial.registrar(dict(datos, Trainer=dict(datos["Trainer"], Money=next(dinero)))),
+        repeticiones=repeticiones,
+    )
+
+    dex = cargar_fixture("dex_completa")["Pokedex"]
+    nombres = {sid: f"Especie {sid}" for sid in range(1, dex["MaxSpecies"] + 1)}
+    indice = medidor.medir(
+        "dex.indice_construir", IndicePokedex, nombres, dex["SeenSpecies"], dex["CaughtSpecies"], repeticiones=repeticiones
+    )
+    for consulta in ("", "es", "cie 1", "25"):
+        medidor.medir(f"dex.indice_buscar[{consulta or 'todo'}]", indice.filtrar, consulta, "Vistos", repeticiones=repeticiones)
+
+    equipo = [["fire", "flying"], ["water"], ["grass", "poison"], ["electric"], ["ground", "dragon"], ["psychic"]]
+    medidor.medir("tipos.analisis_equipo", analisis_equipo, equipo, repeticiones=repeticiones)
+
+
+# --- piezas del HUD (Tk) ---
+
+def _ejecutar_en_tk(root, generador, al_terminar):
+    """Avanza un generador que hace `yield condicion` en el hilo de Tk, sondeando cada 2 ms."""
+    limite = {"t": 0.0}
+
+    def paso():
+        try:
+            condicion = next(generador)
+        except StopIteration:
+            al_terminar(None)
+            return
+        except Exception as ex:
+            al_terminar(ex)
+            return
+        limite["t"] = time.monotonic() + TIMEOUT_ESPERA_SECONDS
+
+        def sondear():
+            if condicion():
+                paso()
+            elif time.monotonic() > limite["t"]:
+                al_terminar(TimeoutError("el HUD no terminó a tiempo"))
+            else:
+                root.after(2, sondear)
+
+        root.after(0, sondear)
+
+    paso()
+
+
+def _escenario_hud(hud, medidor, ruta_save, repeticiones):
+    root = hud["root"]
+
+    def sin_pendientes():
+        return hud["pendientes"]() == 0
+
+    # Arranque en caliente: primer cuadro con la instantánea sembrada y llegada de la lectura fresca.
+    arranque = hud["arranque"]
+    yield lambda: arranque["primer_cuadro_ms"] is not None and arranque["datos_frescos_ms"] is not None
+    medidor.agregar(f"arranque.primer_cuadro[{arranque['origen']}]", arranque["primer_cuadro_ms"])
+    medidor.agregar("arranque.datos_frescos", arranque["datos_frescos_ms"])
+
+    # Estado inicial: el HUD ya pintó el save sintético al arrancar.
+    yield sin_pendientes
+
+    # render_data: primer pintado (síncrono) y tarjetas completas (consultas en el pool).
+    for nombre in FIXTURES_WRAPPER:
+        datos = cargar_fixture(nombre)
+        for rep in range(repeticiones):
+            hud["render_data"]({"Trainer": {}, "Pokedex": {}, "Party": [], "Last": None})
+            yield sin_pendientes
+            t0 = time.perf_counter()
+            hud["render_data"](datos)
+            medidor.agregar(f"render.primer_pintado[{nombre}]", (time.perf_counter() - t0) * 1000)
+            yield sin_pendientes
+            # La primera pasada puede ir a la red; las siguientes ya encuentran todo en las caches.
+            fase = "primera" if rep == 0 else "repetida"
+            medidor.agregar(f"render.completo[{nombre}].{fase}", (time.perf_counter() - t0) * 1000)
+
+    # Consultas de datos (bloqueantes; en la UI van en el pool).
+    for species_id in ESPECIES_MUESTRA:
+        medidor.medir("obtener_info_pokedex.frio", hud["obtener_info_pokedex"], species_id)
+        medidor.medir("obtener_info_pokedex.caliente", hud["obtener_info_pokedex"], species_id, repeticiones=repeticiones)
+        medidor.medir("obtener_siguiente_evolucion.frio", hud["obtener_siguiente_evolucion"], species_id)
+        medidor.medir(
+            "obtener_siguiente_evolucion.caliente", hud["obtener_siguiente_evolucion"], species_id, repeticiones=repeticiones
+        )
+        yield lambda: True
+
+    # Pokédex completa: construcción de la ventana con su índice.
+    dex = cargar_fixture("dex_completa")["Pokedex"]
+    for _ in range(repeticiones):
+        antes = set(root.winfo_children())
+        medidor.medir("dex_completa.abrir", hud["abrir_pokedex_completa"], dex)
+        for win in set(root.winfo_children()) - antes:
+            win.destroy()
+        yield lambda: True
+
+    # Extremo a extremo: reescritura del save -> watcher -> parse -> repintado completo.
+    actualizaciones = []
+    hud["status_var"].trace_add("write", lambda *_: actualizaciones.append(time.perf_counter()))
+    for rep in range(repeticiones):
+        vistos = len(actualizaciones)
+        t0 = time.perf_counter()
+        escribir_save(ruta_save, nivel_base=20 + rep)
+        yield lambda: len(actualizaciones) > vistos and sin_pendientes()
+        medidor.agregar("e2e.save_a_repintado", (actualizaciones[vistos] - t0) * 1000)
+        medidor.agregar("e2e.save_a_tarjetas_completas", (time.perf_counter() - t0) * 1000)
+
+
+def bench_hud(medidor, dir_tmp, repeticiones, con_pack):
+    """Arranca `ui_equipo.main` con un save sintético y mide desde el hilo de Tk. Devuelve el motivo si se omite."""
+    try:
+        import tkinter
+
+        tkinter.Tk().destroy()
+    except Exception as ex:
+        return f"Tk no disponible: {ex}"
+
+    import save_gen7
+    import sprite_cache
+
+    ruta_save = os.path.join(dir_tmp, "main")
+    escribir_save(ruta_save)
+    # Como tras una sesión anterior: el HUD arranca pintando esta instantánea.
+    instantanea.guardar_instantanea(ruta_save, save_gen7.decodificar_save(ruta_save))
+
+    import ui_equipo
+
+    ui_equipo.RUTA_SAVE = ruta_save
+    ui_equipo.LOG_EVO_API = False
+    ui_equipo.SpriteCache = functools.partial(sprite_cache.SpriteCache, directorio=os.path.join(dir_tmp, "sprites"))
+    if not con_pack:
+        ui_equipo.cargar_pack = lambda: None
+
+    def sin_dotnet(ruta_save):
+        raise RuntimeError("sin wrapper .NET en el benchmark")
+
+    ui_equipo.leer_wrapper_dotnet = sin_dotnet
+    ui_equipo.cajas_wrapper_dotnet = sin_dotnet
+
+    estado = {"error": None}
+
+    def al_iniciar(hud):
+        def terminar(error):
+            estado["error"] = error
+            hud["cerrar"]()
+
+        _ejecutar_en_tk(hud["root"], _escenario_hud(hud, medidor, ruta_save, repeticiones), terminar)
+
+    ui_equipo.main(al_iniciar=al_iniciar)
+    if estado["error"] is not None:
+        raise estado["error"]
+    return None
+
+
+def comparar(actual, base, tolerancia):
+    """Nombres cuyas medianas empeoraron más que `tolerancia` (fracción) respecto a `base`."""
+    regresiones = []
+    for nombre, r in actual.items():
+        ref = base.get(nombre)
+        if ref and ref["mediana_ms"] > 0 and r["mediana_ms"] > ref["mediana_ms"] * (1 + tolerancia):
+            regresiones.append((nombre, ref["mediana_ms"], r["mediana_ms"]))
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del HUD con PokeAPI local y fixtures")
+    parser.add_argument("--latencia-ms", type=float, default=30.0, help="Latencia por petición del PokeAPI local")
+    parser.add_argument("--errores", type=float, default=0.0, help="Fracción de peticiones que fallan con 503")
+    parser.add_argument("--grabadas", help="Directorio de respuestas grabadas (si no, sintéticas)")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--con-pack", action="store_true", help="Usar el pack offline si está compilado")
+    parser.add_argument("--sin-tk", action="store_true", help="Solo las piezas que no necesitan Tk")
+    parser.add_argument("--salida", help="Ruta del informe JSON (por defecto, stdout)")
+    parser.add_argument("--comparar", help="Informe base para detectar regresiones")
+    parser.add_argument("--tolerancia", type=float, default=0.25)
+    parser.add_argument(
+        "--con-servicio", action="store_true", help="Pasar los JSON por un servicio_cache.py levantado en el proceso"
+    )
+    parser.add_argument("--trazas", help="Exportar las trazas de la ejecución (JSON trace-event de Chrome)")
+    args = parser.parse_args()
+    if args.trazas:
+        trazas.activar()
+
+    respuestas = RespuestasGrabadas(args.grabadas) if args.grabadas else RespuestasSinteticas()
+    servidor = ServidorPokeAPI(respuestas, args.latencia_ms, args.errores).iniciar()
+    redirigir_requests(servidor.base)
+    # Nunca se usa un servicio de cache que el usuario tenga levantado: solo el del benchmark, si se pide.
+    os.environ["HUD_SERVICIO"] = "off"
+
+    medidor = Medidor()
+    omitido = None
+    with tempfile.TemporaryDirectory(prefix="hud-bench-") as dir_tmp:
+        # Caches aisladas: cada ejecución empieza en frío y no toca las del usuario.
+        api_cache._cache = api_cache.ApiCache(ruta=os.path.join(dir_tmp, "pokeapi.sqlite3"))
+        nombres_especies._indice = nombres_especies.IndiceNombres(ruta=os.path.join(dir_tmp, "species_names.json"))
+        indice_evoluciones._indice = indice_evoluciones.IndiceEvoluciones(ruta=os.path.join(dir_tmp, "evoluciones.json"))
+        historial_progreso.DIR_HISTORIAL = os.path.join(dir_tmp, "historial")
+        instantanea.DIR_INSTANTANEAS = os.path.join(dir_tmp, "instantaneas")
+        servicio = None
+        if args.con_servicio:
+            from companion_engine import CompanionEngine, FuenteLocal
+            from servicio_cache import ServicioCache
+            from sprite_cache import SpriteCache
+
+            motor = CompanionEngine(fuente=FuenteLocal(), sprites=SpriteCache(os.path.join(dir_tmp, "sprites")))
+            servicio = ServicioCache(motor, puerto=0).iniciar()
+            os.environ["HUD_SERVICIO"] = servicio.base
+        try:
+            bench_piezas(medidor, dir_tmp, args.repeticiones)
+            omitido = "--sin-tk" if args.sin_tk else bench_hud(medidor, dir_tmp, args.repeticiones, args.con_pack)
+        finally:
+            if servicio is not None:
+                servicio.detener()
+            servidor.detener()
+            api_cache._cache.cerrar()
+
+    informe = {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "latencia_ms": args.latencia_ms,
+            "errores": args.errores,
+            "respuestas": "grabadas" if args.grabadas else "sinteticas",
+            "repeticiones": args.repeticiones,
+            "con_pack": args.con_pack,
+            "con_servicio": args.con_servicio,
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+        },
+        "servidor": servidor.stats,
+        "hud_omitido": omitido,
+        "resultados": medidor.resumen(),
+    }
+    if args.trazas:
+        trazas.exportar_chrome(args.trazas)
+        informe["trazas"] = trazas.resumen()
+    texto = json.dumps(informe, ensure_ascii=False, indent=2)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as fh:
+            fh.write(texto + "\n")
+    else:
+        print(texto)
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as fh:
+            base = json.load(fh)["resultados"]
+        regresiones = comparar(informe["resultados"], base, args.tolerancia)
+        for nombre, antes, ahora in regresiones:
+            print(f"REGRESIÓN {nombre}: {antes:.3f} ms -> {ahora:.3f} ms", file=sys.stderr)
+        if regresiones:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Fixtures del benchmark.
+
+- JSON con la misma forma que `leer_wrapper` (equipo de 1 y de 6, Pokédex completa): se generan de
+  forma determinista y se guardan en `bench/fixtures/` con `python bench/fixtures.py`.
+- Saves binarios sintéticos de USUM o SM (equipo + cajas llenas) para el lector nativo y el detector
+  de cambios; se escriben bajo demanda con `escribir_save`, no se versionan. Llevan la tabla BlockInfo
+  al final, con los tamaños de bloque de PKHeX, y el lector saca de ella los offsets.
+"""
+import json
+import os
+import random
+import struct
+import sys
+
+DIR_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURES_WRAPPER = ("equipo_1", "equipo_6", "dex_completa")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from save_gen7 import (  # noqa: E402
+    _BLOCK_POSITION,
+    ALINEACION_BLOQUES,
+    BOX_COUNT,
+    INFO_DESDE_FIN,
+    INFO_MAGIA,
+    NUM_BLOQUES,
+    BOX_SLOTS,
+    PARTY_SLOTS,
+    SAVE_SIZES,
+    SIZE_PK7,
+    SIZE_PK7_PARTY,
+    ZUKAN_MAGIC,
+    ZUKAN_OFS_CAUGHT,
+    ZUKAN_OFS_SEEN,
+)
+
+MAX_SPECIES = 807
+# Juego ("SM"/"USUM") -> (tamaño del save, especie máxima).
+SAVES_POR_JUEGO = {juego: (size, max_species) for size, (juego, max_species) in SAVE_SIZES.items()}
+# Tamaño de los bloques 00-16 en PKHeX (SaveBlockAccessor7SM / SaveBlockAccessor7USUM).
+TAMANOS_BLOQUES = {
+    "SM": (
+        0x00DE0, 0x0007C, 0x00014, 0x000C0, 0x0061C, 0x00E00, 0x00F78, 0x00228, 0x00104,
+        0x00200, 0x00020, 0x00004, 0x00058, 0x005E6, 0x36600, 0x0572C, 0x00008,
+    ),
+    "USUM": (
+        0x00E28, 0x0007C, 0x00014, 0x000C0, 0x0061C, 0x00E00, 0x00F78, 0x00228, 0x0030C,
+        0x00200, 0x0007C, 0x00004, 0x00058, 0x005E6, 0x36600, 0x0572C, 0x00008,
+    ),
+}
+
+
+def offsets_bloques(tamanos):
+    """Offset de cada bloque: seguidos desde 0 y alineados a 0x200, como los coloca el juego."""
+    offsets, ofs = [], 0
+    for tamano in tamanos:
+        offsets.append(ofs)
+        ofs = -(-(ofs + tamano) // ALINEACION_BLOQUES) * ALINEACION_BLOQUES
+    return offsets
+
+
+def escribir_info_bloques(sav, tamanos):
+    """Tabla BlockInfo al final del save: magia y una entrada (tamaño, id, checksum) por bloque."""
+    inicio = len(sav) - INFO_DESDE_FIN
+    struct.pack_into("<I", sav, inicio, INFO_MAGIA)
+    for i, tamano in enumerate(tamanos):
+        struct.pack_into("<IHH", sav, inicio + 4 + 8 * i, tamano, i, 0)
+
+
+def _mon(i, species_id):
+    return {
+        "SpeciesId": species_id,
+        "Species": str(species_id),
+        "Nickname": f"Mote{i}" if i % 2 else "",
+        "Level": 10 + 7 * i,
+        "Friendship": 70 + 20 * i,
+    }
+
+
+def datos_wrapper(n_party, dex_completa=False):
+    """Dict como el de `leer_wrapper` con `n_party` Pokémon y la Pokédex parcial o completa."""
+    party = [_mon(i, 1 + 3 * i) for i in range(n_party)]
+    if dex_completa:
+        seen = list(range(1, MAX_SPECIES + 1))
+        caught = [s for s in seen if s % 5]
+    else:
+        seen = list(range(1, 60))
+        caught = list(range(1, 30))
+    return {
+        "Trainer": {
+            "Name": "Bench", "TID": 12345, "SID": 4321, "Money": 123456,
+            "PlayTime": "12ː34ː56", "GameVersion": "UM", "Generation": 7,
+        },
+        "Pokedex": {
+            "Enabled": True,
+            "MaxSpecies": MAX_SPECIES,
+            "Seen": len(seen),
+            "Caught": len(caught),
+            "SeenPercent": round(100 * len(seen) / MAX_SPECIES, 1),
+            "CaughtPercent": round(100 * len(caught) / MAX_SPECIES, 1),
+            "SeenSpecies": seen,
+            "CaughtSpecies": caught,
+        },
+        "Party": party,
+        "Last": dict(party[-1], MetDate="2024-01-01", OT="Bench") if party else None,
+    }
+
+
+def generar_fixtures_wrapper(directorio=DIR_FIXTURES):
+    os.makedirs(directorio, exist_ok=True)
+    contenido = {
+        "equipo_1": datos_wrapper(1),
+        "equipo_6": datos_wrapper(6),
+        "dex_completa": datos_wrapper(6, dex_completa=True),
+    }
+    for nombre, datos in contenido.items():
+        with open(os.path.join(directorio, f"{nombre}.json"), "w", encoding="utf-8") as fh:
+            json.dump(datos, fh, ensure_ascii=False, indent=1)
+    return list(contenido)
+
+
+def cargar_fixture(nombre, directorio=DIR_FIXTURES):
+    with open(os.path.join(directorio, f"{nombre}.json"), "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+# --- saves binarios ---
+
+def _cifrar(datos, semilla, ini, fin):
+    for i in range(ini, fin, 2):
+        semilla = (semilla * 0x41C64E6D + 0x6073) & 0xFFFFFFFF
+        (w,) = struct.unpack_from("<H", datos, i)
+        struct.pack_into("<H", datos, i, w ^ (semilla >> 16))
+
+
+def cifrar_pk7(pk):
+    """Inverso de `save_gen7.descifrar_pk7`: checksum, barajado de bloques y XOR con el LCG."""
+    pk = bytearray(pk)
+    ec = struct.unpack_from("<I", pk, 0)[0]
+    struct.pack_into("<H", pk, 6, sum(struct.unpack_from("<112H", pk, 8)) & 0xFFFF)
+    posiciones = _BLOCK_POSITION[(ec >> 13) & 31]
+    barajado = bytearray(pk)
+    for bloque in range(4):
+        destino = int(posiciones[bloque])
+        barajado[8 + 56 * destino:8 + 56 * destino + 56] = pk[8 + 56 * bloque:8 + 56 * bloque + 56]
+    _cifrar(barajado, ec, 8, SIZE_PK7)
+    if len(barajado) > SIZE_PK7:
+        _cifrar(barajado, ec, SIZE_PK7, len(barajado))
+    return bytes(barajado)
+
+
+def _pk7(rng, species_id, mote, nivel, fecha, en_equipo):
+    pk = bytearray(SIZE_PK7_PARTY if en_equipo else SIZE_PK7)
+    struct.pack_into("<I", pk, 0x00, rng.getrandbits(32))
+    struct.pack_into("<H", pk, 0x08, species_id)
+    struct.pack_into("<I", pk, 0x10, 1000 * nivel)
+    texto = mote.encode("utf-16-le")
+    pk[0x40:0x40 + len(texto)] = texto
+    ot = "Bench".encode("utf-16-le")
+    pk[0xB0:0xB0 + len(ot)] = ot
+    pk[0xCA] = 70
+    pk[0xD4], pk[0xD5], pk[0xD6] = fecha
+    struct.pack_into("<H", pk, 0xDA, 30)
+    pk[0xDC] = 4
+    if en_equipo:
+        pk[0xEC] = nivel
+    return cifrar_pk7(pk)
+
+
+def escribir_save(ruta, n_party=6, cajas_llenas=BOX_COUNT, nivel_base=10, semilla=1, juego="USUM", tiempo=(12, 34, 56)):
+    """
+    Save sintético de `juego` ("USUM" o "SM") con los bloques donde los pone PKHeX (TAMANOS_BLOQUES).
+    Cambiar `nivel_base` solo modifica la sección del equipo y `tiempo` (h, min, s), la del tiempo de juego.
+    """
+    rng = random.Random(semilla)
+    size, max_species = SAVES_POR_JUEGO[juego]
+    offsets = offsets_bloques(TAMANOS_BLOQUES[juego])
+    ofs = {bloque: offsets[i] for bloque, i in NUM_BLOQUES.items()}
+    sav = bytearray(size)
+    escribir_info_bloques(sav, TAMANOS_BLOQUES[juego])
+    struct.pack_into("<HHB", sav, ofs["status"], 12345, 54321, 33 if juego == "USUM" else 31)
+    nombre = "Bench".encode("utf-16-le")
+    sav[ofs["status"] + 0x38:ofs["status"] + 0x38 + len(nombre)] = nombre
+    struct.pack_into("<I", sav, ofs["misc"] + 4, 123456)
+    struct.pack_into("<HBB", sav, ofs["time"], *tiempo)
+    struct.pack_into("<I", sav, ofs["zukan"], ZUKAN_MAGIC)
+    for sp in range(1, max_species + 1):
+        bit = sp - 1
+        sav[ofs["zukan"] + ZUKAN_OFS_SEEN + bit // 8] |= 1 << (bit % 8)
+        if sp % 5:
+            sav[ofs["zukan"] + ZUKAN_OFS_CAUGHT + bit // 8] |= 1 << (bit % 8)
+    for i in range(n_party):
+        inicio = ofs["party"] + i * SIZE_PK7_PARTY
+        sav[inicio:inicio + SIZE_PK7_PARTY] = _pk7(rng, 1 + 3 * i, f"Mote{i}", nivel_base + i, (24, 1, 1 + i), True)
+    sav[ofs["party"] + PARTY_SLOTS * SIZE_PK7_PARTY] = n_party
+    vacio = cifrar_pk7(bytes(SIZE_PK7))
+    for slot in range(BOX_COUNT * BOX_SLOTS):
+        inicio = ofs["boxes"] + slot * SIZE_PK7
+        if slot < cajas_llenas * BOX_SLOTS:
+            sav[inicio:inicio + SIZE_PK7] = _pk7(rng, 1 + slot % max_species, f"Caja{slot}", 0, (20 + slot % 4, 1 + slot % 12, 1 + slot % 28), False)
+        else:
+            sav[inicio:inicio + SIZE_PK7] = vacio
+    tmp = f"{ruta}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(sav)
+    os.replace(tmp, ruta)
+
+
+if __name__ == "__main__":
+    for nombre in generar_fixtures_wrapper():
+        print(f"{DIR_FIXTURES}{os.sep}{nombre}.json")
@@ -0,0 +1,311 @@
+"""
+Sustituto local de PokeAPI para el benchmark: servidor HTTP en 127.0.0.1 con latencia y tasa de
+errores configurables.
+
+Las respuestas salen de:
+- `RespuestasSinteticas`: JSON con la misma forma que PokeAPI, deterministas, para N especies;
+- `RespuestasGrabadas`: archivos grabados con `python bench/pokeapi_local.py grabar`, que vuelca
+  la cache SQLite de la app (`.cache/pokeapi.sqlite3`) a un directorio.
+
+`redirigir_requests(base)` hace que cualquier `requests.Session` de la app hable con este servidor.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pokeapi_parse import TYPES  # noqa: E402
+from tipos_gen7 import MATRIZ  # noqa: E402
+
+POKEAPI_BASE = "https://pokeapi.co/"
+SPRITES_BASE = "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/"
+VERSION_GROUPS = (
+    "red-blue", "yellow", "gold-silver", "crystal", "ruby-sapphire", "emerald", "firered-leafgreen",
+    "diamond-pearl", "platinum", "heartgold-soulsilver", "black-white", "black-2-white-2",
+    "x-y", "omega-ruby-alpha-sapphire", "sun-moon", "ultra-sun-ultra-moon",
+)
+METODOS = ("level-up", "machine", "egg", "tutor")
+
+
+class RespuestasSinteticas:
+    """
+    PokeAPI de mentira pero con tamaños parecidos (unos 90 movimientos por especie, cada uno con
+    detalles para todos los grupos de versiones). Las cadenas evolutivas son de 3 especies.
+    """
+
+    def __init__(self, n_especies=807, n_movimientos=90):
+        self.n_especies = n_especies
+        self.n_movimientos = n_movimientos
+
+    def _nombre(self, i):
+        return f"especie-{i}"
+
+    def _pokemon(self, i):
+        rng = random.Random(i)
+        tipos = [TYPES[i % len(TYPES)]] + ([TYPES[(i * 7) % len(TYPES)]] if i % 3 else [])
+        moves = []
+        for m in range(self.n_movimientos):
+            metodo = METODOS[m % len(METODOS)]
+            moves.append({
+                "move": {"name": f"movimiento-{(i * 31 + m) % 700}", "url": f"{POKEAPI_BASE}api/v2/move/{m + 1}/"},
+                "version_group_details": [
+                    {
+                        "level_learned_at": rng.randint(1, 70) if metodo == "level-up" else 0,
+                        "move_learn_method": {"name": metodo, "url": ""},
+                        "version_group": {"name": vg, "url": ""},
+                    }
+                    for vg in VERSION_GROUPS
+                ],
+            })
+        return {
+            "id": i,
+            "name": self._nombre(i),
+            "height": 5 + i % 20,
+            "weight": 40 + i % 900,
+            "types": [{"slot": n + 1, "type": {"name": t, "url": ""}} for n, t in enumerate(dict.fromkeys(tipos))],
+            "stats": [
+                {"base_stat": rng.randint(20, 150), "effort": 0, "stat": {"name": n, "url": ""}}
+                for n in ("hp", "attack", "defense", "special-attack", "special-defense", "speed")
+            ],
+            "abilities": [
+                {"ability": {"name": "habilidad-uno", "url": ""}, "is_hidden": False, "slot": 1},
+                {"ability": {"name": "habilidad-oculta", "url": ""}, "is_hidden": True, "slot": 3},
+            ],
+            "sprites": {"front_default": f"{SPRITES_BASE}{i}.png", "front_female": None},
+            "moves": moves,
+        }
+
+    def _species(self, i):
+        return {
+            "id": i,
+            "name": self._nombre(i),
+            "evolves_from_species": None,
+            "evolution_chain": {"url": f"{POKEAPI_BASE}api/v2/evolution-chain/{(i - 1) // 3 + 1}/"},
+            "growth_rate": {"name": "medium-slow", "url": ""},
+            "genera": [{"genus": "Pokémon Prueba", "language": {"name": "es", "url": ""}}],
+            "flavor_text_entries": [
+                {"flavor_text": f"Descripción\fde la especie {i}.", "language": {"name": lang, "url": ""}}
+                for lang in ("ja", "en", "fr", "de", "es", "it", "ko")
+            ],
+        }
+
+    def _cadena(self, c):
+        base = (c - 1) * 3 + 1
+
+        def especie(k):
+            return {"name": self._nombre(k), "url": f"{POKEAPI_BASE}api/v2/pokemon-species/{k}/"}
+
+        def nodo(k, detalles, siguientes):
+            return {"species": especie(k), "evolution_details": detalles, "evolves_to": siguientes}
+
+        ultimo = nodo(base + 2, [{"trigger": {"name": "use-item"}, "item": {"name": "piedra-hoja"}}], [])
+        medio = nodo(base + 1, [{"trigger": {"name": "level-up"}, "min_level": 16}], [ultimo])
+        return {"id": c, "chain": nodo(base, [], [medio])}
+
+    def _tipo(self, nombre):
+        t = TYPES.index(nombre)
+
+        def lista(valor):
+            return [{"name": TYPES[a], "url": ""} for a in range(len(TYPES)) if MATRIZ[a, t] == valor]
+
+        return {
+            "name": nombre,
+            "damage_relations": {
+                "double_damage_from": lista(2.0),
+                "half_damage_from": lista(0.5),
+                "no_damage_from": lista(0.0),
+            },
+        }
+
+    def obtener(self, ruta):
+        m = re.match(r"/api/v2/pokemon-species\?limit=(\d+)", ruta)
+        if m:
+            n = min(int(m.group(1)), self.n_especies)
+            return {
+                "count": self.n_especies,
+                "results": [
+                    {"name": self._nombre(i), "url": f"{POKEAPI_BASE}api/v2/pokemon-species/{i}/"}
+                    for i in range(1, n + 1)
+                ],
+            }
+        m = re.match(r"/api/v2/(pokemon|pokemon-species|evolution-chain|type)/([\w-]+)/?$", ruta)
+        if not m:
+            return None
+        tipo, clave = m.groups()
+        if tipo == "type":
+            nombre = TYPES[int(clave) - 1] if clave.isdigit() else clave
+            return self._tipo(nombre) if nombre in TYPES else None
+        if not clave.isdigit():
+            return None
+        n = int(clave)
+        if tipo == "evolution-chain":
+            return self._cadena(n) if 1 <= n <= (self.n_especies + 2) // 3 else None
+        if not 1 <= n <= self.n_especies:
+            return None
+        return self._pokemon(n) if tipo == "pokemon" else self._species(n)
+
+
+def _archivo_grabado(directorio, ruta):
+    return os.path.join(directorio, re.sub(r"[^\w.-]+", "_", ruta.strip("/")) + ".json")
+
+
+class RespuestasGrabadas:
+    def __init__(self, directorio):
+        self.directorio = directorio
+
+    def obtener(self, ruta):
+        try:
+            with open(_archivo_grabado(self.directorio, ruta), "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return None
+
+
+def grabar_desde_cache(ruta_sqlite, directorio):
+    """Vuelca las respuestas de la cache de la app como archivos para `RespuestasGrabadas`."""
+    os.makedirs(directorio, exist_ok=True)
+    db = sqlite3.connect(ruta_sqlite)
+    n = 0
+    try:
+        for url, body in db.execute("SELECT url, body FROM respuestas"):
+            if not url.startswith(POKEAPI_BASE):
+                continue
+            ruta = "/" + url[len(POKEAPI_BASE):]
+            with open(_archivo_grabado(directorio, ruta), "wb") as fh:
+                fh.write(zlib.decompress(body))
+            n += 1
+    finally:
+        db.close()
+    return n
+
+
+def png_sprite(size=96):
+    from PIL import Image
+
+    buf = BytesIO()
+    Image.new("RGBA", (size, size), (200, 60, 60, 255)).save(buf, "PNG")
+    return buf.getvalue()
+
+
+class ServidorPokeAPI:
+    """Servidor en un hilo; `base` es la URL a la que redirigir las peticiones."""
+
+    def __init__(self, respuestas, latencia_ms=0.0, tasa_error=0.0, semilla=1):
+        self.respuestas = respuestas
+        self.latencia = latencia_ms / 1000.0
+        self.tasa_error = tasa_error
+        self.stats = {"peticiones": 0, "errores": 0, "no_encontradas": 0}
+        self._rng = random.Random(semilla)
+        self._rng_lock = threading.Lock()
+        self._png = png_sprite()
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                servidor._atender(self)
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.base = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._hilo = threading.Thread(target=self._httpd.serve_forever, name="pokeapi-local", daemon=True)
+
+    def iniciar(self):
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _atender(self, h):
+        self.stats["peticiones"] += 1
+        with self._rng_lock:
+            falla = self._rng.random() < self.tasa_error
+        if self.latencia:
+            time.sleep(self.latencia)
+        if falla:
+            self.stats["errores"] += 1
+            self._responder(h, 503, b'{"detail": "error simulado"}', "application/json")
+            return
+        if h.path.startswith("/sprites/"):
+            self._responder(h, 200, self._png, "image/png")
+            return
+        data = self.respuestas.obtener(h.path)
+        if data is None:
+            self.stats["no_encontradas"] += 1
+            self._responder(h, 404, b'{"detail": "Not found."}', "application/json")
+            return
+        cuerpo = data if isinstance(data, bytes) else json.dumps(data).encode("utf-8")
+        self._responder(h, 200, cuerpo, "application/json; charset=utf-8")
+
+    def _responder(self, h, estado, cuerpo, tipo):
+        h.send_response(estado)
+        h.send_header("Content-Type", tipo)
+        h.send_header("Content-Length", str(len(cuerpo)))
+        h.end_headers()
+        h.wfile.write(cuerpo)
+
+
+def redirigir_requests(base):
+    """Reescribe en `requests.Session.request` las URLs de PokeAPI y de los sprites hacia `base`."""
+    import requests
+
+    original = requests.Session.request
+
+    def request(self, method, url, *args, **kwargs):
+        if url.startswith(SPRITES_BASE):
+            url = f"{base}/sprites/{url[len(SPRITES_BASE):]}"
+        elif url.startswith(POKEAPI_BASE):
+            url = f"{base}/{url[len(POKEAPI_BASE):]}"
+        return original(self, method, url, *args, **kwargs)
+
+    requests.Session.request = request
+    return original
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PokeAPI local para el benchmark")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_serve = sub.add_parser("servir", help="Levanta el servidor y espera (Ctrl+C para salir)")
+    p_serve.add_argument("--grabadas", help="Directorio con respuestas grabadas (si no, sintéticas)")
+    p_serve.add_argument("--latencia-ms", type=float, default=0.0)
+    p_serve.add_argument("--errores", type=float, default=0.0, help="Fracción de peticiones que fallan con 503")
+    p_rec = sub.add_parser("grabar", help="Vuelca la cache SQLite de la app a un directorio de respuestas")
+    p_rec.add_argument("directorio")
+    p_rec.add_argument("--cache", default=None, help="Ruta del SQLite (por defecto la de api_cache)")
+    args = parser.parse_args()
+
+    if args.cmd == "grabar":
+        from api_cache import RUTA_CACHE_API
+
+        n = grabar_desde_cache(args.cache or RUTA_CACHE_API, args.directorio)
+        print(f"{n} respuestas grabadas en {args.directorio}")
+        return
+
+    respuestas = RespuestasGrabadas(args.grabadas) if args.grabadas else RespuestasSinteticas()
+    servidor = ServidorPokeAPI(respuestas, args.latencia_ms, args.errores).iniciar()
+    print(f"PokeAPI local en {servidor.base}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servidor.detener()
+
+
+if __name__ == "__main__":
+    main()
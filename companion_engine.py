@@ -0,0 +1,501 @@
+"""
+Motor de datos compartido por todas las entradas (`ui_equipo.py`, `mostrar_equipo.py`, ...).
+
+`CompanionEngine` es dueño de la sesión HTTP, de las caches en memoria (JSON por URL, evolución,
+tipos, fichas de Pokédex, nombres), de los sprites y de la lectura del save. Es seguro entre hilos:
+las caches se consultan bajo un lock y el trabajo lento (red, parseo) se hace fuera de él.
+
+Las respuestas de PokeAPI salen de una "fuente":
+- `FuenteLocal`: cache SQLite en disco (`api_cache.py`) + red;
+- `servicio_cache.FuenteServicio`: un servicio local (`python servicio_cache.py`) que mantiene un
+  motor caliente para todos los procesos de la máquina; si no responde se usa la fuente local.
+
+`crear_motor()` elige sola: si el servicio está levantado lo usa.
+"""
+import functools
+import itertools
+import os
+import threading
+
+import control_http
+import trazas
+from api_cache import api_get_json
+from gamedata_pack import MAX_SPECIES_GEN7
+from indice_evoluciones import nodos_desde_cadena, obtener_indice_evoluciones
+from indice_pokedex import normalizar_pokedex
+from inventario_cajas import InventarioCajas
+from nombres_especies import obtener_indice_nombres
+from pokeapi_parse import (
+    EntradaPokedex,
+    extract_id_from_url,
+    parse_info_pokedex,
+    relaciones_de_dano,
+    sprite_por_id,
+)
+from sprite_cache import LRU, SpriteCache
+from wrapper_daemon import obtener_daemon
+
+
+POKEAPI = "https://pokeapi.co/api/v2"
+USER_AGENT = "HUD-PokeCompanion/1.0"
+# JSON de PokeAPI ya parseados que se guardan en memoria (por URL).
+MAX_JSON_MEMORIA = 4096
+# Hilos que parsean saves cambiados (modo multi-save); los saves esperan su turno en `ColaParseo`.
+PARSE_WORKERS = 2
+
+# Proyecto del wrapper .NET y save por defecto (los usan el HUD y el overlay).
+RUTA_PROYECTO = r"C:\Users\danie\Documents\HUD-PokeCompanion\PokeLastCatch"
+RUTA_SAVE = r"C:\Users\danie\AppData\Roaming\Azahar\sdmc\Nintendo 3DS\00000000000000000000000000000000\00000000000000000000000000000000\title\00040000\001b5100\data\00000001\main"
+
+
+def etiquetas_saves(rutas):
+    """Nombre corto para cada save: las últimas carpetas de su ruta que bastan para distinguirlos."""
+    partes = [os.path.normpath(os.path.dirname(os.path.abspath(r))).split(os.sep) for r in rutas]
+    for n in range(1, max(len(p) for p in partes) + 1):
+        etiquetas = ["/".join(p[-n:]) for p in partes]
+        if len(set(etiquetas)) == len(etiquetas):
+            return etiquetas
+    return [os.path.abspath(r) for r in rutas]
+
+
+@functools.lru_cache(maxsize=None)
+def lectores_nativos():
+    """
+    (leer_save, leer_cajas, relaciones_de_tipos) de save_gen7/tipos_gen7, o Nones sin NumPy.
+    Se importan al primer uso (NumPy tarda ~100 ms) para que el HUD pinte antes de necesitarlos.
+    """
+    try:
+        from save_gen7 import leer_cajas, leer_save
+        from tipos_gen7 import relaciones_de_tipos
+    except ImportError:
+        # Sin NumPy: el save lo lee siempre el wrapper .NET y las debilidades salen de /type de PokeAPI.
+        return None, None, None
+    return leer_save, leer_cajas, relaciones_de_tipos
+
+
+def crear_session():
+    import requests
+
+    session = requests.Session()
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
+
+class FuenteLocal:
+    """PokeAPI a través de la cache en disco compartida (api_cache.py)."""
+
+    nombre = "local"
+
+    def __init__(self, session=None):
+        self.session = session or crear_session()
+
+    def get_json(self, url, timeout=12, retries=3, log=False, log_tag="api"):
+        return api_get_json(self.session, url, timeout=timeout, retries=retries, log=log, log_tag=log_tag)
+
+
+class CompanionEngine:
+    def __init__(
+        self,
+        fuente=None,
+        pack=None,
+        sprites=None,
+        indice_nombres=None,
+        evoluciones=None,
+        ruta_proyecto=None,
+        leer_dotnet=None,
+        leer_cajas_dotnet=None,
+        log=False,
+    ):
+        """
+        `pack`: pack offline (gamedata_pack) o None; se consulta antes que PokeAPI.
+        `leer_dotnet(ruta_save)`: lector del wrapper .NET para lo que el lector nativo no resuelve;
+        por defecto, el daemon del proyecto `ruta_proyecto` (wrapper_daemon.py).
+        `leer_cajas_dotnet(ruta_save)`: igual para las cajas (registros por slot); por defecto, el mismo daemon.
+        """
+        self.fuente = fuente or FuenteLocal()
+        self.pack = pack
+        self.sprites = sprites or SpriteCache()
+        self.indice_nombres = indice_nombres or obtener_indice_nombres()
+        # `is None` y no `or`: un índice vacío tiene len() 0.
+        self.evoluciones = evoluciones if evoluciones is not None else obtener_indice_evoluciones()
+        self.ruta_proyecto = ruta_proyecto
+        self.leer_dotnet = leer_dotnet
+        self.leer_cajas_dotnet = leer_cajas_dotnet
+        self.log = log
+        self._lock = threading.Lock()
+        self._json = LRU(MAX_JSON_MEMORIA)
+        self._tipos = {}
+        self._fichas = {}
+        self._nombres = {}
+
+    @property
+    def session(self):
+        return getattr(self.fuente, "session", None)
+
+    # --- save ---
+
+    def leer_save(self, ruta_save):
+        """
+        Dict del save (`Trainer`, `Pokedex`, `Party`, `Last`): lector nativo y, si hace falta, el wrapper.
+        Visto/capturado quedan siempre en `Pokedex["SeenBits"]`/`["CaughtBits"]` como BitsetEspecies.
+        """
+        leer_dotnet = self.leer_dotnet
+        if leer_dotnet is None:
+            leer_dotnet = obtener_daemon(self.ruta_proyecto).parse
+        leer_save_nativo = lectores_nativos()[0]
+        if leer_save_nativo is not None:
+            datos = leer_save_nativo(ruta_save, leer_dotnet)
+        else:
+            datos = leer_dotnet(ruta_save)
+        normalizar_pokedex((datos or {}).get("Pokedex"))
+        return datos
+
+    def leer_cajas(self, ruta_save):
+        """
+        `InventarioCajas` del save: lector nativo (nivel por EXP con el ritmo de crecimiento del pack)
+        o los registros que manda en streaming el wrapper (`leer_cajas_dotnet` o el daemon del proyecto).
+        """
+        leer_dotnet = self.leer_cajas_dotnet
+        if leer_dotnet is None:
+            leer_dotnet = obtener_daemon(self.ruta_proyecto).cajas
+        leer_cajas_nativo = lectores_nativos()[1]
+        if leer_cajas_nativo is not None:
+            crecimiento = self.pack.growth_rate if self.pack is not None else None
+            return leer_cajas_nativo(ruta_save, leer_dotnet, crecimiento)
+        with trazas.tramo("cajas.wrapper"):
+            return InventarioCajas.desde_registros(leer_dotnet(ruta_save))
+
+    # --- PokeAPI ---
+
+    def api_get_json(self, url, timeout=12, retries=3, log=False, log_tag="api"):
+        """JSON de PokeAPI: memoria, luego la fuente (cache en disco o servicio) y por último la red."""
+        data = self._json.get(url)
+        if data is not None:
+            return data
+        data = self.fuente.get_json(url, timeout=timeout, retries=retries, log=log and self.log, log_tag=log_tag)
+        self._json.put(url, data)
+        return data
+
+    def pokemon_json(self, pokemon_id):
+        return self.api_get_json(
+            f"{POKEAPI}/pokemon/{pokemon_id}", timeout=12, retries=4, log=True, log_tag=f"evo-pokemon-{pokemon_id}"
+        )
+
+    def species_json(self, species_id):
+        return self.api_get_json(
+            f"{POKEAPI}/pokemon-species/{species_id}", timeout=12, retries=4, log=True, log_tag=f"evo-species-{species_id}"
+        )
+
+    def datos_pokemon(self, species_id):
+        """(Nombre, URL del sprite) de la especie; nunca lanza."""
+        if self.pack is not None and self.pack.tiene(species_id):
+            return self.pack.nombre_pokemon(species_id).capitalize(), self.pack.sprite_url(species_id)
+        try:
+            pj = self.pokemon_json(species_id)
+            nombre = pj["name"].capitalize()
+            sprite_url = pj["sprites"].get("front_default") or pj["sprites"].get("front_female") or ""
+            return nombre, sprite_url
+        except Exception:
+            return f"Species {species_id}", ""
+
+    def siguiente_evolucion(self, species_id):
+        """
+        Devuelve:
+        {
+            "status": "ok" | "no_evolution" | "error",
+            "next": [{"id", "name", "min_level", "condition", "sprite_url"}, ...]
+        }
+        """
+        try:
+            species_id = int(species_id)
+        except Exception:
+            return {"status": "error", "next": []}
+
+        if self.pack is not None and self.pack.tiene(species_id):
+            return self.pack.siguiente_evolucion(species_id)
+        if not self._asegurar_cadena(species_id):
+            return {"status": "error", "next": []}
+
+        next_entries = []
+        for evo_species_id in self.evoluciones.siguientes(species_id):
+            evo = self.evoluciones.nodo(evo_species_id)
+            next_entries.append(
+                {
+                    "id": evo_species_id,
+                    "name": evo["nombre"],
+                    "min_level": evo["min_level"],
+                    "condition": evo["condicion"],
+                    "sprite_url": self._sprite_especie(evo_species_id),
+                }
+            )
+        return {"status": "ok" if next_entries else "no_evolution", "next": next_entries}
+
+    def linea_evolutiva(self, species_id, red=True):
+        """
+        Especies de la cadena por etapas: [{"id", "name", "stage", "condition"}, ...] ([] si no se pudo).
+        Con `red=False` solo responde si la cadena ya está en el índice.
+        """
+        if not self._asegurar_cadena(species_id, red):
+            return []
+        return [self._etapa(sid) for sid in self.evoluciones.linea(species_id)]
+
+    def evolucion_anterior(self, species_id, red=True):
+        """{"id", "name", "stage", "condition"} de la etapa previa o None."""
+        if not self._asegurar_cadena(species_id, red):
+            return None
+        anterior = self.evoluciones.anterior(species_id)
+        return self._etapa(anterior) if anterior is not None else None
+
+    def evoluciones_finales(self, species_id, red=True):
+        """Etapas finales alcanzables (la propia especie si ya no evoluciona)."""
+        if not self._asegurar_cadena(species_id, red):
+            return []
+        return [self._etapa(sid) for sid in self.evoluciones.finales(species_id)]
+
+    def _etapa(self, species_id):
+        nodo = self.evoluciones.nodo(species_id)
+        return {"id": species_id, "name": nodo["nombre"], "stage": nodo["etapa"], "condition": nodo["condicion"]}
+
+    def _sprite_especie(self, species_id):
+        if self.pack is not None and self.pack.tiene(species_id):
+            return self.pack.sprite_url(species_id)
+        # El sprite por defecto de la especie sigue el ID: no hace falta descargar /pokemon para saberlo.
+        return sprite_por_id(species_id)
+
+    def _asegurar_cadena(self, species_id, red=True):
+        """True si la cadena de la especie está (o quedó) en el índice: pack offline o una sola descarga."""
+        if species_id in self.evoluciones:
+            return True
+        if self.pack is not None and self.pack.tiene(species_id):
+            self.evoluciones.registrar(*self._cadena_desde_pack(species_id), persistir=False)
+            return True
+        if not red:
+            return False
+        try:
+            species_json = self.species_json(species_id)
+            chain_url = species_json.get("evolution_chain", {}).get("url", "")
+            if not chain_url:
+                # Especie sin cadena: se indexa sola (clave negativa, no choca con IDs de cadena).
+                nombre = species_json.get("name", "").replace("-", " ").title() or f"Species {species_id}"
+                nodo = {"padre": None, "hijos": [], "nombre": nombre, "min_level": None, "condicion": ""}
+                self.evoluciones.registrar(-species_id, {species_id: nodo})
+                return True
+
+            chain_json = self.api_get_json(
+                chain_url,
+                timeout=12,
+                retries=4,
+                log=True,
+                log_tag=f"evo-chain-{species_id}",
+            ).get("chain", {})
+            self.evoluciones.registrar(extract_id_from_url(chain_url), nodos_desde_cadena(chain_json))
+        except Exception as ex:
+            # No se indexan fallos de red/timeout para permitir reintentos.
+            if self.log:
+                print(f"[evo-{species_id}] ERROR resolviendo cadena evolutiva: {ex}", flush=True)
+            return False
+        return species_id in self.evoluciones
+
+    def _cadena_desde_pack(self, species_id):
+        """(clave, nodos) de la cadena de una especie del pack, subiendo por `evolves_from`."""
+        raiz = species_id
+        while self.pack.evoluciona_de(raiz) is not None:
+            raiz = self.pack.evoluciona_de(raiz)
+        nombres = self.pack.nombres()
+        nodos = {raiz: {"padre": None, "hijos": [], "nombre": nombres.get(raiz, f"Species {raiz}"),
+                        "min_level": None, "condicion": ""}}
+        pendientes = [raiz]
+        while pendientes:
+            padre = pendientes.pop()
+            for evo in (self.pack.siguiente_evolucion(padre) or {}).get("next", []):
+                if evo["id"] in nodos:
+                    continue
+                nodos[padre]["hijos"].append(evo["id"])
+                nodos[evo["id"]] = {"padre": padre, "hijos": [], "nombre": evo["name"],
+                                    "min_level": evo["min_level"], "condicion": evo["condition"]}
+                pendientes.append(evo["id"])
+        # Clave negativa: estas cadenas no se guardan en disco y no deben pisar las de PokeAPI.
+        return -raiz, nodos
+
+    def tipos(self, species_id):
+        """Tipos de la especie (nombres de PokeAPI): pack offline o JSON de /pokemon."""
+        tipos = self.tipos_en_memoria(species_id)
+        if tipos is not None:
+            return tipos
+        info = self.pack.info_pokedex(species_id) if self.pack is not None else None
+        if info is not None:
+            tipos = [t.lower() for t in info.types]
+        else:
+            tipos = [t["type"]["name"] for t in self.pokemon_json(species_id).get("types", [])]
+        with self._lock:
+            self._tipos[species_id] = tipos
+        return tipos
+
+    def tipos_en_memoria(self, species_id):
+        with self._lock:
+            return self._tipos.get(species_id)
+
+    def info_pokedex(self, species_id):
+        """EntradaPokedex de la especie (memorizada) o None si no se pudo obtener. Puede ir a la red."""
+        info = self.info_en_memoria(species_id)
+        if info is not None:
+            return info
+        if self.pack is not None:
+            info = self.pack.info_pokedex(species_id)
+        if info is None:
+            try:
+                pok = self.pokemon_json(species_id)
+                sp = self.species_json(species_id)
+
+                campos = parse_info_pokedex(pok, sp)
+                relaciones_de_tipos = lectores_nativos()[2]
+                if relaciones_de_tipos is not None:
+                    campos.update(relaciones_de_tipos(campos["types"]))
+                else:
+                    type_jsons = [
+                        self.api_get_json(f"{POKEAPI}/type/{t['type']['name']}", timeout=10)
+                        for t in pok.get("types", [])
+                    ]
+                    campos.update(relaciones_de_dano(type_jsons))
+                info = EntradaPokedex(**campos)
+            except Exception:
+                return None
+        with self._lock:
+            self._fichas[species_id] = info
+        return info
+
+    def info_en_memoria(self, species_id):
+        with self._lock:
+            return self._fichas.get(species_id)
+
+    # --- nombres de especie ---
+
+    def nombres_especies(self, max_species):
+        """
+        Nombres por ID sin esperar a la red: pack offline o índice persistente en disco.
+        Si el índice no cubre `max_species` se devuelve lo que haya (el refresco lo pide `pedir_nombres`).
+        """
+        with self._lock:
+            if max_species in self._nombres:
+                return self._nombres[max_species]
+        if self.pack is not None and self.pack.max_species >= max_species:
+            return {sid: name for sid, name in self.pack.nombres().items() if sid <= max_species}
+        nombres = self.indice_nombres.nombres(max_species)
+        # No se memoriza un índice incompleto: se vuelve a consultar cuando llegue el refresco.
+        if self.indice_nombres.completo(max_species):
+            with self._lock:
+                self._nombres[max_species] = nombres
+        return nombres
+
+    def nombres_completos(self, max_species):
+        if self.pack is not None and self.pack.max_species >= max_species:
+            return True
+        return self.indice_nombres.completo(max_species)
+
+    def pedir_nombres(self, max_species=MAX_SPECIES_GEN7, al_terminar=None):
+        """Refresca el índice de nombres en segundo plano; `al_terminar(ok)` se llama desde ese hilo."""
+
+        def terminado(ok):
+            if ok:
+                with self._lock:
+                    self._nombres.clear()
+            if al_terminar is not None:
+                al_terminar(ok)
+
+        session = self.session or crear_session()
+        return self.indice_nombres.refrescar_en_segundo_plano(session, max_species, al_terminar=terminado)
+
+    # --- sprites ---
+
+    def imagen(self, url, size):
+        """Sprite redimensionado (seguro fuera del hilo de Tk) o None."""
+        return self.sprites.imagen(url, size)
+
+    def resumen(self):
+        with self._lock:
+            memoria = {
+                "json": len(self._json),
+                "cadenas_evolutivas": len(self.evoluciones),
+                "tipos": len(self._tipos),
+                "fichas": len(self._fichas),
+            }
+        return {
+            "fuente": self.fuente.nombre,
+            "memoria": memoria,
+            "sprites": dict(self.sprites.stats),
+            "http": control_http.resumen(),
+        }
+
+
+def crear_motor(**kwargs):
+    """Motor con la fuente del servicio local si está levantado; si no, con la fuente local."""
+    if "fuente" not in kwargs:
+        from servicio_cache import conectar_servicio
+
+        with trazas.tramo("motor.conectar") as tramo:
+            kwargs["fuente"] = conectar_servicio() or FuenteLocal()
+            tramo.set(fuente=kwargs["fuente"].nombre)
+    return CompanionEngine(**kwargs)
+
+
+class ColaParseo:
+    """
+    Pool acotado que procesa saves cambiados: `procesar(ruta)` en un hilo del pool.
+
+    Una ruta está como mucho una vez en cola y nunca en dos hilos a la vez: si cambia mientras se
+    procesa, se vuelve a encolar al terminar. Se elige la de menor `prioridad(ruta)` (consultada al
+    sacar de la cola, así que puede cambiar mientras espera) y, a igualdad, la más antigua.
+    """
+
+    def __init__(self, procesar, prioridad=None, workers=PARSE_WORKERS):
+        self.procesar = procesar
+        self.prioridad = prioridad or (lambda ruta: 0)
+        self._cond = threading.Condition()
+        self._orden = itertools.count()
+        self._pendientes = {}
+        self._en_curso = set()
+        self._repetir = set()
+        self._parar = False
+        for n in range(workers):
+            threading.Thread(target=self._trabajador, name=f"hud-parse_{n}", daemon=True).start()
+
+    def encargar(self, ruta):
+        with self._cond:
+            if ruta in self._en_curso:
+                self._repetir.add(ruta)
+            elif ruta not in self._pendientes:
+                self._pendientes[ruta] = next(self._orden)
+                self._cond.notify()
+
+    def pendientes(self):
+        with self._cond:
+            return len(self._pendientes) + len(self._en_curso)
+
+    def detener(self):
+        with self._cond:
+            self._parar = True
+            self._pendientes.clear()
+            self._cond.notify_all()
+
+    def _trabajador(self):
+        while True:
+            with self._cond:
+                while not self._pendientes and not self._parar:
+                    self._cond.wait()
+                if self._parar:
+                    return
+                ruta = min(self._pendientes, key=lambda r: (self.prioridad(r), self._pendientes[r]))
+                del self._pendientes[ruta]
+                self._en_curso.add(ruta)
+            try:
+                self.procesar(ruta)
+            except Exception:
+                # `procesar` informa de sus propios errores; un fallo no debe dejar el hilo muerto.
+                pass
+            finally:
+                with self._cond:
+                    self._en_curso.discard(ruta)
+                    if ruta in self._repetir:
+                        self._repetir.discard(ruta)
+                        self._pendientes[ruta] = next(self._orden)
+                        self._cond.notify()
@@ -0,0 +1,251 @@
+"""
+Control de tráfico hacia PokeAPI para `api_cache.api_get_json`:
+
+- `VueloUnico`: peticiones idénticas simultáneas (la tarjeta y la ficha pidiendo la misma especie)
+  comparten una sola descarga;
+- `CuboTokens`: limitador por host con ráfaga acotada; se frena solo ante 429/`Retry-After` o
+  cabeceras `RateLimit-*` y recupera el ritmo poco a poco con las respuestas buenas;
+- `espera_reintento`: backoff exponencial con jitter completo (o lo que pida `Retry-After`);
+- `Disyuntor`: tras varios fallos seguidos deja de ir a la red durante un rato y las consultas
+  se resuelven al instante con la copia en cache (aunque esté caducada) o con `CircuitoAbierto`.
+
+Todo es por proceso y seguro entre hilos. Con el servicio de cache levantado el control lo hace
+el servicio, que es quien va a la red por todos.
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+# Ritmo sostenido y ráfaga por host (peticiones/segundo y tokens).
+TASA_BASE = 20.0
+RAFAGA = 20
+# Piso del ritmo cuando el servidor pide frenar, y cuánto se recupera por respuesta buena.
+TASA_MINIMA = 1.0
+RECUPERACION = 0.5
+# Backoff: base y techo de la espera entre intentos; techo para lo que pida `Retry-After`.
+BACKOFF_BASE_SECONDS = 0.35
+BACKOFF_MAX_SECONDS = 8.0
+RETRY_AFTER_MAX_SECONDS = 60.0
+# Disyuntor: fallos seguidos que lo abren y tiempo abierto antes de dejar pasar una prueba.
+FALLOS_APERTURA = 5
+ENFRIAMIENTO_SECONDS = 30.0
+# Estados que vale la pena reintentar; el resto de 4xx falla a la primera.
+ESTADOS_REINTENTABLES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitoAbierto(RuntimeError):
+    """PokeAPI está marcada como caída (o limitándonos) y no hay copia en cache."""
+
+
+class CuboTokens:
+    def __init__(self, tasa=TASA_BASE, capacidad=RAFAGA):
+        self.tasa_base = tasa
+        self.tasa = tasa
+        self.capacidad = capacidad
+        self._tokens = float(capacidad)
+        self._ultimo = time.monotonic()
+        self._pausa_hasta = 0.0
+        self._lock = threading.Lock()
+
+    def _rellenar(self, ahora):
+        self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.tasa)
+        self._ultimo = ahora
+
+    def tomar(self, max_espera):
+        """
+        Reserva un token. Devuelve los segundos esperados, o None si habría que esperar más de
+        `max_espera` (no se consume nada y el llamador falla rápido en vez de colgar la UI).
+        """
+        with self._lock:
+            ahora = time.monotonic()
+            self._rellenar(ahora)
+            espera = max(0.0, self._pausa_hasta - ahora, (1.0 - self._tokens) / self.tasa)
+            if espera > max_espera:
+                return None
+            # El token queda reservado ya: los que lleguen detrás esperan su propio turno.
+            self._tokens -= 1.0
+        if espera > 0:
+            time.sleep(espera)
+        return espera
+
+    def pausar(self, segundos):
+        with self._lock:
+            self._pausa_hasta = max(self._pausa_hasta, time.monotonic() + segundos)
+
+    def frenar(self):
+        """El servidor pidió bajar el ritmo: se reduce a la mitad (y se vacía la ráfaga)."""
+        with self._lock:
+            self._rellenar(time.monotonic())
+            self.tasa = max(TASA_MINIMA, self.tasa / 2)
+            self._tokens = min(self._tokens, 0.0)
+
+    def recuperar(self):
+        with self._lock:
+            if self.tasa < self.tasa_base:
+                self._rellenar(time.monotonic())
+                self.tasa = min(self.tasa_base, self.tasa + RECUPERACION)
+
+
+class Disyuntor:
+    """Cerrado → (N fallos seguidos) → abierto → (enfriamiento) → una prueba → cerrado o abierto otra vez."""
+
+    def __init__(self, fallos_apertura=FALLOS_APERTURA, enfriamiento=ENFRIAMIENTO_SECONDS):
+        self.fallos_apertura = fallos_apertura
+        self.enfriamiento = enfriamiento
+        self._fallos = 0
+        self._abierto_hasta = None
+        self._probando = False
+        self._lock = threading.Lock()
+
+    def permitir(self):
+        with self._lock:
+            if self._abierto_hasta is None:
+                return True
+            if time.monotonic() < self._abierto_hasta or self._probando:
+                return False
+            # Semiabierto: pasa una sola petición de prueba (se anota el hilo que la hace).
+            self._probando = threading.get_ident()
+            return True
+
+    def cancelar(self):
+        """La prueba de este hilo no llegó a la red (limitador, error local): queda libre para otra petición."""
+        with self._lock:
+            if self._probando == threading.get_ident():
+                self._probando = False
+
+    def exito(self):
+        with self._lock:
+            self._fallos = 0
+            self._abierto_hasta = None
+            self._probando = False
+
+    def fallo(self):
+        with self._lock:
+            self._fallos += 1
+            if self._probando or self._fallos >= self.fallos_apertura:
+                self._abierto_hasta = time.monotonic() + self.enfriamiento
+                self._probando = False
+
+    def abierto(self):
+        with self._lock:
+            return self._abierto_hasta is not None
+
+
+class _Vuelo:
+    __slots__ = ("listo", "resultado", "error")
+
+    def __init__(self):
+        self.listo = threading.Event()
+        self.resultado = None
+        self.error = None
+
+
+class VueloUnico:
+    def __init__(self):
+        self._vuelos = {}
+        self._lock = threading.Lock()
+
+    def hacer(self, clave, funcion):
+        """(resultado, compartido): si ya hay una llamada en curso con `clave`, se espera la suya."""
+        with self._lock:
+            vuelo = self._vuelos.get(clave)
+            lider = vuelo is None
+            if lider:
+                vuelo = self._vuelos[clave] = _Vuelo()
+        if not lider:
+            vuelo.listo.wait()
+            if vuelo.error is not None:
+                raise vuelo.error
+            return vuelo.resultado, True
+        try:
+            vuelo.resultado = funcion()
+        except BaseException as ex:
+            vuelo.error = ex
+            raise
+        finally:
+            with self._lock:
+                del self._vuelos[clave]
+            vuelo.listo.set()
+        return vuelo.resultado, False
+
+
+def segundos_retry_after(valor):
+    """`Retry-After` en segundos (admite segundos o fecha HTTP), acotado; None si no se entiende."""
+    if not valor:
+        return None
+    try:
+        segundos = float(valor)
+    except ValueError:
+        try:
+            segundos = parsedate_to_datetime(valor).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(RETRY_AFTER_MAX_SECONDS, max(0.0, segundos))
+
+
+def espera_reintento(intento, retry_after=None):
+    """Espera antes del intento `intento + 1`: lo que pida el servidor o backoff exponencial con jitter."""
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** intento))
+
+
+class ControlHost:
+    """Limitador, disyuntor y contadores de un host."""
+
+    def __init__(self):
+        self.cubo = CuboTokens()
+        self.disyuntor = Disyuntor()
+        self.stats = {"esperas": 0, "compartidas": 0, "fallos_rapidos": 0, "frenadas": 0}
+
+    def observar(self, respuesta):
+        """Lee las pistas de ritmo de una respuesta. Devuelve la espera pedida por `Retry-After` o None."""
+        headers = respuesta.headers
+        retry_after = segundos_retry_after(headers.get("Retry-After"))
+        if respuesta.status_code == 429 or retry_after is not None:
+            self.stats["frenadas"] += 1
+            self.cubo.frenar()
+            if retry_after is not None:
+                self.cubo.pausar(retry_after)
+            return retry_after
+        restantes = headers.get("RateLimit-Remaining") or headers.get("X-RateLimit-Remaining")
+        reinicio = headers.get("RateLimit-Reset") or headers.get("X-RateLimit-Reset")
+        if restantes is not None and reinicio is not None:
+            try:
+                restantes, reinicio = int(restantes), float(reinicio)
+            except ValueError:
+                return None
+            # X-RateLimit-Reset suele ser un instante epoch; RateLimit-Reset, segundos que faltan.
+            if reinicio > 1e9:
+                reinicio -= time.time()
+            if restantes <= 0:
+                self.cubo.pausar(min(RETRY_AFTER_MAX_SECONDS, max(0.0, reinicio)))
+                return None
+        if respuesta.status_code < 400:
+            self.cubo.recuperar()
+        return None
+
+    def resumen(self):
+        return dict(self.stats, tasa=round(self.cubo.tasa, 2), circuito_abierto=self.disyuntor.abierto())
+
+
+_controles = {}
+_controles_lock = threading.Lock()
+vuelos = VueloUnico()
+
+
+def control_para(url):
+    """Control compartido del host de `url` (uno por host y proceso)."""
+    host = urlsplit(url).netloc
+    with _controles_lock:
+        control = _controles.get(host)
+        if control is None:
+            control = _controles[host] = ControlHost()
+        return control
+
+
+def resumen():
+    with _controles_lock:
+        return {host: control.resumen() for host, control in _controles.items()}
@@ -0,0 +1,421 @@
+"""
+Pack binario offline con los datos estáticos de Gen 7 (especies, tipos, stats, habilidades,
+evoluciones y movimientos de USUM).
+
+Se compila una sola vez desde PokeAPI (pasando por la cache en disco):
+
+    python gamedata_pack.py build
+
+y la UI lo abre con `cargar_pack()` antes de tocar la red. El archivo se mapea en memoria:
+la tabla de especies es de tamaño fijo e indexada por ID, así que cada consulta es O(1).
+
+Formato (little endian):
+    cabecera    HEADER
+    tipos       18 x 18 bytes, multiplicador x2 (0, 1, 2, 4) [atacante][defensor]
+    especies    (table_count) registros SPECIES, el índice es el ID de especie
+    strings     (n_strings + 1) offsets u32 + datos UTF-8 (el string 0 es "")
+    listas      palabras u32; cada lista empieza con su longitud
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from pokeapi_parse import (
+    TYPE_INDEX,
+    TYPES,
+    EntradaPokedex,
+    extract_id_from_url,
+    format_evolution_condition,
+    parse_info_pokedex,
+    sprite_url,
+)
+
+RUTA_PACK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gamedata_gen7.bin")
+PACK_MAGIC = b"HUDG"
+PACK_VERSION = 1
+MAX_SPECIES_GEN7 = 807
+
+GROWTH_RATES = ("slow", "medium", "fast", "medium-slow", "slow-then-very-fast", "fast-then-very-slow")
+SIN_TIPO = 0xFF
+SIN_VALOR = 0xFFFFFFFF
+
+# magic, version, max_species, table_count, n_strings, ofs_especies, ofs_strings, ofs_listas
+HEADER = struct.Struct("<4sHHHIIII")
+# name, species_name, genus, flavor, sprite (ids de string), type1, type2, 6 stats,
+# height, weight, growth, evolves_from, listas: abilities, moves_level, moves_tm, moves_egg, moves_tutor, evolutions
+SPECIES = struct.Struct("<5I2B6BHHBH6I")
+OFS_TIPOS = HEADER.size
+
+_STAT_ORDER = ("PS", "Ataque", "Defensa", "At. Esp.", "Def. Esp.", "Velocidad")
+
+
+class PackInvalido(Exception):
+    pass
+
+
+class GameDataPack:
+    """Lector del pack mapeado en memoria. Los resultados se memorizan por especie."""
+
+    def __init__(self, ruta=RUTA_PACK):
+        self.ruta = ruta
+        self._fh = open(ruta, "rb")
+        try:
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._fh.close()
+            raise PackInvalido("Pack vacío")
+        magic, version, max_species, table_count, n_strings, ofs_esp, ofs_str, ofs_lst = HEADER.unpack_from(self._mm, 0)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            self.cerrar()
+            raise PackInvalido(f"Pack no compatible ({magic!r} v{version})")
+        self.max_species = max_species
+        self.table_count = table_count
+        self._n_strings = n_strings
+        self._ofs_especies = ofs_esp
+        self._ofs_strings = ofs_str
+        self._ofs_datos_strings = ofs_str + 4 * (n_strings + 1)
+        self._ofs_listas = ofs_lst
+        self._tipos = self._mm[OFS_TIPOS:OFS_TIPOS + len(TYPES) ** 2]
+        self._lock = threading.Lock()
+        self._info_memo = {}
+        self._evo_memo = {}
+        self._nombres = None
+
+    def cerrar(self):
+        try:
+            self._mm.close()
+        except Exception:
+            pass
+        self._fh.close()
+
+    # --- acceso de bajo nivel ---
+
+    def _registro(self, species_id):
+        if not 0 < species_id < self.table_count:
+            return None
+        rec = SPECIES.unpack_from(self._mm, self._ofs_especies + species_id * SPECIES.size)
+        return rec if rec[0] else None
+
+    def _str(self, sid):
+        ini, fin = struct.unpack_from("<II", self._mm, self._ofs_strings + 4 * sid)
+        return self._mm[self._ofs_datos_strings + ini:self._ofs_datos_strings + fin].decode("utf-8")
+
+    def _lista(self, ofs):
+        base = self._ofs_listas + 4 * ofs
+        (n,) = struct.unpack_from("<I", self._mm, base)
+        return struct.unpack_from(f"<{n}I", self._mm, base + 4)
+
+    # --- consultas ---
+
+    def tiene(self, species_id):
+        return self._registro(species_id) is not None
+
+    def multiplicador(self, atacante, defensor):
+        """Multiplicador de daño entre tipos (nombres de PokeAPI)."""
+        return self._tipos[TYPE_INDEX[atacante] * len(TYPES) + TYPE_INDEX[defensor]] / 2
+
+    def nombre_pokemon(self, species_id):
+        rec = self._registro(species_id)
+        return self._str(rec[0]) if rec else ""
+
+    def sprite_url(self, species_id):
+        rec = self._registro(species_id)
+        return self._str(rec[4]) if rec else ""
+
+    def evoluciona_de(self, species_id):
+        """ID de la etapa anterior o None."""
+        rec = self._registro(species_id)
+        return (rec[16] or None) if rec else None
+
+    def growth_rate(self, species_id):
+        rec = self._registro(species_id)
+        return GROWTH_RATES[rec[15]] if rec else None
+
+    def nombres(self):
+        """{id: "Nombre Especie"} para toda la Pokédex (mismo formato que pokemon-species?limit=N)."""
+        with self._lock:
+            if self._nombres is None:
+                nombres = {}
+                for sid in range(1, self.max_species + 1):
+                    rec = self._registro(sid)
+                    if rec:
+                        nombres[sid] = self._str(rec[1]).replace("-", " ").title()
+                self._nombres = nombres
+            return self._nombres
+
+    def info_pokedex(self, species_id):
+        """Misma EntradaPokedex que `obtener_info_pokedex` en ui_equipo.py, o None si la especie no está."""
+        info = self._info_memo.get(species_id)
+        if info is not None:
+            return info
+        rec = self._registro(species_id)
+        if rec is None:
+            return None
+        tipos = [TYPES[t] for t in rec[5:7] if t != SIN_TIPO]
+
+        relaciones = {"weaknesses": [], "resistances": [], "immunities": []}
+        for atacante in TYPES:
+            mult = 1.0
+            for defensor in tipos:
+                mult *= self.multiplicador(atacante, defensor)
+            if mult > 1:
+                relaciones["weaknesses"].append(atacante.capitalize())
+            elif mult == 0:
+                relaciones["immunities"].append(atacante.capitalize())
+            elif mult < 1:
+                relaciones["resistances"].append(atacante.capitalize())
+
+        moves_level_raw = self._lista(rec[18])
+        info = EntradaPokedex(
+            name=self._str(rec[0]).capitalize(),
+            sprite_url=self._str(rec[4]),
+            types=[t.capitalize() for t in tipos],
+            height=rec[13] / 10.0,
+            weight=rec[14] / 10.0,
+            flavor_text=self._str(rec[3]),
+            genus=self._str(rec[2]),
+            stats=zip(_STAT_ORDER, rec[7:13]),
+            abilities=[self._str(s) for s in self._lista(rec[17])],
+            moves_level=[
+                (moves_level_raw[i], self._str(moves_level_raw[i + 1])) for i in range(0, len(moves_level_raw), 2)
+            ],
+            moves_tm=[self._str(s) for s in self._lista(rec[19])],
+            moves_egg=[self._str(s) for s in self._lista(rec[20])],
+            moves_tutor=[self._str(s) for s in self._lista(rec[21])],
+            **relaciones,
+        )
+        self._info_memo[species_id] = info
+        return info
+
+    def siguiente_evolucion(self, species_id):
+        """Mismo dict que `obtener_siguiente_evolucion` en ui_equipo.py, o None si la especie no está."""
+        result = self._evo_memo.get(species_id)
+        if result is not None:
+            return result
+        rec = self._registro(species_id)
+        if rec is None:
+            return None
+        evos = self._lista(rec[22])
+        next_entries = []
+        for i in range(0, len(evos), 3):
+            evo_id, min_level, condition = evos[i:i + 3]
+            evo_rec = self._registro(evo_id)
+            evo_name = self._str(evo_rec[1]).replace("-", " ").title() if evo_rec else ""
+            next_entries.append(
+                {
+                    "id": evo_id,
+                    "name": evo_name or f"Species {evo_id}",
+                    "min_level": None if min_level == SIN_VALOR else min_level,
+                    "condition": self._str(condition),
+                    "sprite_url": self._str(evo_rec[4]) if evo_rec else "",
+                }
+            )
+        result = {"status": "ok" if next_entries else "no_evolution", "next": next_entries}
+        self._evo_memo[species_id] = result
+        return result
+
+
+def cargar_pack(ruta=RUTA_PACK):
+    """Abre el pack si existe y es de esta versión; si no, devuelve None (la UI usará PokeAPI)."""
+    if not os.path.exists(ruta):
+        return None
+    try:
+        return GameDataPack(ruta)
+    except (OSError, PackInvalido, struct.error) as ex:
+        print(f"[pack] ignorando {ruta}: {ex}", flush=True)
+        return None
+
+
+# --- compilación ---
+
+
+class _Strings:
+    def __init__(self):
+        self.ids = {"": 0}
+        self.valores = [""]
+
+    def id(self, texto):
+        texto = texto or ""
+        sid = self.ids.get(texto)
+        if sid is None:
+            sid = len(self.valores)
+            self.ids[texto] = sid
+            self.valores.append(texto)
+        return sid
+
+
+def _descargar_especie(get, species_id):
+    pok = get(f"https://pokeapi.co/api/v2/pokemon/{species_id}")
+    sp = get(f"https://pokeapi.co/api/v2/pokemon-species/{species_id}")
+    info = parse_info_pokedex(pok, sp)
+    return {
+        "id": species_id,
+        "info": info,
+        "pokemon_name": pok.get("name", ""),
+        "species_name": sp.get("name", ""),
+        "sprite_url": sprite_url(pok),
+        "types": [t["type"]["name"] for t in sorted(pok.get("types", []), key=lambda t: t.get("slot", 0))],
+        "stats": {s["stat"]["name"]: s["base_stat"] for s in pok.get("stats", [])},
+        "height": pok.get("height", 0),
+        "weight": pok.get("weight", 0),
+        "growth_rate": (sp.get("growth_rate") or {}).get("name", ""),
+        "chain_url": (sp.get("evolution_chain") or {}).get("url", ""),
+    }
+
+
+def compilar_pack(ruta_salida=RUTA_PACK, max_species=MAX_SPECIES_GEN7, workers=8, log=print):
+    """Descarga (vía cache) y compila el pack. Devuelve el número de especies escritas."""
+    import requests
+
+    from api_cache import api_get_json
+
+    session = requests.Session()
+    session.headers.update({"User-Agent": "HUD-PokeCompanion/1.0"})
+
+    def get(url):
+        return api_get_json(session, url, timeout=20, retries=4)
+
+    # Tabla de tipos: fila = tipo atacante.
+    tabla_tipos = bytearray([2] * (len(TYPES) ** 2))
+    for a, nombre in enumerate(TYPES):
+        dr = get(f"https://pokeapi.co/api/v2/type/{nombre}").get("damage_relations", {})
+        for clave, valor in (("double_damage_to", 4), ("half_damage_to", 1), ("no_damage_to", 0)):
+            for d in dr.get(clave, []):
+                if d["name"] in TYPE_INDEX:
+                    tabla_tipos[a * len(TYPES) + TYPE_INDEX[d["name"]]] = valor
+
+    especies = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for n, datos in enumerate(pool.map(lambda sid: _descargar_especie(get, sid), range(1, max_species + 1)), 1):
+            especies[datos["id"]] = datos
+            if n % 50 == 0:
+                log(f"[pack] {n}/{max_species} especies")
+
+    # Cadenas evolutivas: se recorre cada cadena una sola vez.
+    evoluciones = {}
+    evolves_from = {}
+    for chain_url in sorted({d["chain_url"] for d in especies.values() if d["chain_url"]}):
+        pendientes = [get(chain_url).get("chain", {})]
+        while pendientes:
+            nodo = pendientes.pop()
+            padre = extract_id_from_url(nodo.get("species", {}).get("url", ""))
+            for hijo in nodo.get("evolves_to", []):
+                hijo_id = extract_id_from_url(hijo.get("species", {}).get("url", ""))
+                details = (hijo.get("evolution_details") or [{}])[0]
+                if padre is not None and hijo_id is not None:
+                    evoluciones.setdefault(padre, []).append(
+                        (hijo_id, details.get("min_level"), format_evolution_condition(details))
+                    )
+                    evolves_from[hijo_id] = padre
+                pendientes.append(hijo)
+
+    # Evoluciones de generaciones posteriores: se incluyen para poder mostrar nombre y sprite.
+    extra = sorted({h for lst in evoluciones.values() for h, _, _ in lst if h not in especies})
+    if extra:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for datos in pool.map(lambda sid: _descargar_especie(get, sid), extra):
+                especies[datos["id"]] = datos
+
+    strings = _Strings()
+    listas = []
+
+    def lista(valores):
+        ofs = len(listas)
+        listas.append(len(valores))
+        listas.extend(valores)
+        return ofs
+
+    table_count = max(especies) + 1
+    tabla = bytearray(table_count * SPECIES.size)
+    for sid, d in especies.items():
+        info = d["info"]
+        tipos = [TYPE_INDEX.get(t, SIN_TIPO) for t in d["types"][:2]] + [SIN_TIPO, SIN_TIPO]
+        stats = [min(255, d["stats"].get(n, 0)) for n in ("hp", "attack", "defense", "special-attack", "special-defense", "speed")]
+        evos = []
+        for hijo_id, min_level, condicion in evoluciones.get(sid, []):
+            evos.extend((hijo_id, SIN_VALOR if min_level is None else min_level, strings.id(condicion)))
+        moves_level = []
+        for level, nombre in info["moves_level"]:
+            moves_level.extend((level, strings.id(nombre)))
+        SPECIES.pack_into(
+            tabla,
+            sid * SPECIES.size,
+            strings.id(d["pokemon_name"]) or strings.id(f"species-{sid}"),
+            strings.id(d["species_name"]),
+            strings.id(info["genus"]),
+            strings.id(info["flavor_text"]),
+            strings.id(d["sprite_url"]),
+            tipos[0],
+            tipos[1],
+            *stats,
+            min(0xFFFF, d["height"]),
+            min(0xFFFF, d["weight"]),
+            GROWTH_RATES.index(d["growth_rate"]) if d["growth_rate"] in GROWTH_RATES else 0,
+            evolves_from.get(sid, 0),
+            lista([strings.id(a) for a in info["abilities"]]),
+            lista(moves_level),
+            lista([strings.id(m) for m in info["moves_tm"]]),
+            lista([strings.id(m) for m in info["moves_egg"]]),
+            lista([strings.id(m) for m in info["moves_tutor"]]),
+            lista(evos),
+        )
+
+    datos_strings = bytearray()
+    offsets = [0]
+    for texto in strings.valores:
+        datos_strings.extend(texto.encode("utf-8"))
+        offsets.append(len(datos_strings))
+
+    ofs_especies = OFS_TIPOS + len(tabla_tipos)
+    ofs_strings = ofs_especies + len(tabla)
+    ofs_listas = ofs_strings + 4 * len(offsets) + len(datos_strings)
+    ofs_listas += (-ofs_listas) % 4
+    cabecera = HEADER.pack(
+        PACK_MAGIC, PACK_VERSION, max_species, table_count, len(strings.valores), ofs_especies, ofs_strings, ofs_listas
+    )
+
+    os.makedirs(os.path.dirname(ruta_salida), exist_ok=True)
+    tmp = ruta_salida + ".tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(cabecera)
+        fh.write(tabla_tipos)
+        fh.write(tabla)
+        fh.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        fh.write(datos_strings)
+        fh.write(b"\0" * (ofs_listas - fh.tell()))
+        fh.write(struct.pack(f"<{len(listas)}I", *listas))
+    # Reemplazo atómico: una UI abierta sigue leyendo el pack anterior hasta reabrirlo.
+    os.replace(tmp, ruta_salida)
+    log(f"[pack] {len(especies)} especies, {len(strings.valores)} strings -> {ruta_salida}")
+    return len(especies)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pack offline de datos de Gen 7 para HUD PokeCompanion")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_build = sub.add_parser("build", help="Compila el pack desde PokeAPI (usa la cache en disco)")
+    p_build.add_argument("--salida", default=RUTA_PACK)
+    p_build.add_argument("--max-species", type=int, default=MAX_SPECIES_GEN7)
+    p_build.add_argument("--workers", type=int, default=8)
+    p_info = sub.add_parser("info", help="Muestra el contenido de un pack")
+    p_info.add_argument("--ruta", default=RUTA_PACK)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "build":
+        compilar_pack(args.salida, args.max_species, args.workers)
+        return 0
+
+    pack = cargar_pack(args.ruta)
+    if pack is None:
+        print("No hay pack válido en", args.ruta, file=sys.stderr)
+        return 1
+    print(f"Pack v{PACK_VERSION}: {pack.max_species} especies de Pokédex, {pack.table_count - 1} registros")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
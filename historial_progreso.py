@@ -0,0 +1,264 @@
+"""
+Historial de progreso de cada save: serie temporal por columnas, solo de anexar.
+
+Cada refresco con datos distintos del anterior añade una fila: instante, tiempo de juego, dinero,
+vistos, capturados y nivel medio y máximo del equipo. Cada columna es un archivo binario de ancho
+fijo (`array`), así anexar es escribir unos bytes al final de cada archivo sin leer lo anterior, y
+una gráfica lee solo las columnas que dibuja.
+
+Lo viejo se reduce solo, por niveles (`.cache/historial/<save>/<nivel>/`):
+- `crudo`: todas las filas, en segmentos por día; los de más de RETENCION_CRUDO_DIAS se borran;
+- `minuto` y `hora`: la última fila de cada minuto / hora (son métricas de progreso: vale el valor
+  al cerrar el intervalo). Se anexan al cambiar de intervalo y no caducan.
+
+`leer_serie` elige el nivel más fino que no pasa de unos pocos `max_puntos`, así una gráfica de semanas de partidas
+no toca las filas crudas. Si se corta una escritura a medias, al abrir se recortan las columnas al
+largo de la más corta.
+"""
+import hashlib
+import os
+import shutil
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from api_cache import CACHE_DIR
+
+DIR_HISTORIAL = os.path.join(CACHE_DIR, "historial")
+# Columna -> código de `array` (anchos fijos en todas las plataformas).
+COLUMNAS = (
+    ("t", "d"),
+    ("juego", "I"),
+    ("dinero", "I"),
+    ("vistos", "H"),
+    ("capturados", "H"),
+    ("nivel_medio", "f"),
+    ("nivel_max", "B"),
+)
+TIPOS = dict(COLUMNAS)
+# Niveles reducidos: (nombre, segundos por intervalo), del más fino al más grueso.
+NIVELES_REDUCIDOS = (("minuto", 60), ("hora", 3600))
+RETENCION_CRUDO_DIAS = 7
+MAX_PUNTOS = 600
+# Un nivel sirve si tiene como mucho este múltiplo de `max_puntos` filas (luego se toma una de cada k).
+MARGEN_LECTURA = 4
+
+
+def segundos_juego(play_time):
+    """"HHHːMMːSS" (el separador de PKHeX o ":") -> segundos; 0 si no se entiende."""
+    try:
+        horas, minutos, segundos = str(play_time or "").replace("ː", ":").split(":")
+        return int(horas) * 3600 + int(minutos) * 60 + int(segundos)
+    except ValueError:
+        return 0
+
+
+def fila_de(datos, ahora):
+    """Fila (en el orden de COLUMNAS) con las métricas del dict del save."""
+    trainer = datos.get("Trainer") or {}
+    dex = datos.get("Pokedex") or {}
+    niveles = [mon["Level"] for mon in datos.get("Party") or [] if isinstance(mon.get("Level"), int)]
+    dinero = trainer.get("Money")
+    fila = (
+        ahora,
+        segundos_juego(trainer.get("PlayTime")),
+        dinero if isinstance(dinero, int) and dinero >= 0 else 0,
+        int(dex.get("Seen") or 0),
+        int(dex.get("Caught") or 0),
+        sum(niveles) / len(niveles) if niveles else 0.0,
+        min(255, max(niveles, default=0)),
+    )
+    # Con la precisión con que se guarda, para que comparar con la última fila leída del disco funcione.
+    return tuple(array(tipo, (valor,))[0] for (_, tipo), valor in zip(COLUMNAS, fila))
+
+
+class _Segmento:
+    """Un archivo por columna en `directorio`; todas con el mismo número de filas."""
+
+    def __init__(self, directorio):
+        self.directorio = directorio
+
+    def _ruta(self, columna):
+        return os.path.join(self.directorio, f"{columna}.bin")
+
+    def filas(self):
+        try:
+            return min(
+                os.path.getsize(self._ruta(columna)) // array(tipo).itemsize for columna, tipo in COLUMNAS
+            )
+        except OSError:
+            return 0
+
+    def reparar(self):
+        """Recorta las columnas más largas (escritura cortada a medias) al largo común."""
+        filas = self.filas()
+        for columna, tipo in COLUMNAS:
+            ruta = self._ruta(columna)
+            largo = filas * array(tipo).itemsize
+            if os.path.exists(ruta) and os.path.getsize(ruta) != largo:
+                os.truncate(ruta, largo)
+
+    def anexar(self, fila):
+        os.makedirs(self.directorio, exist_ok=True)
+        for (columna, tipo), valor in zip(COLUMNAS, fila):
+            with open(self._ruta(columna), "ab") as fh:
+                fh.write(array(tipo, (valor,)).tobytes())
+
+    def leer(self, columna, desde=0):
+        """Filas `desde`.. de una columna (solo esa columna se lee del disco)."""
+        valores = array(TIPOS[columna])
+        filas = self.filas()
+        if desde >= filas:
+            return valores
+        with open(self._ruta(columna), "rb") as fh:
+            fh.seek(desde * valores.itemsize)
+            valores.fromfile(fh, filas - desde)
+        return valores
+
+    def ultima(self):
+        filas = self.filas()
+        if not filas:
+            return None
+        return tuple(self.leer(columna, filas - 1)[0] for columna, _ in COLUMNAS)
+
+
+class HistorialProgreso:
+    def __init__(self, ruta_save, directorio=None):
+        clave = hashlib.blake2b(os.path.abspath(ruta_save).encode("utf-8"), digest_size=8).hexdigest()
+        self.directorio = os.path.join(directorio or DIR_HISTORIAL, clave)
+        self.ruta_save = ruta_save
+        self._lock = threading.Lock()
+        self._reducidos = {nombre: _Segmento(os.path.join(self.directorio, nombre)) for nombre, _ in NIVELES_REDUCIDOS}
+        # Última fila anexada (para no repetir), su segmento crudo y la pendiente de cada nivel reducido.
+        self._ultima = None
+        self._dia = None
+        self._abiertas = {}
+        self._cargar()
+
+    # --- escritura ---
+
+    def _dir_crudo(self):
+        return os.path.join(self.directorio, "crudo")
+
+    def _dias_crudo(self):
+        try:
+            return sorted(d for d in os.listdir(self._dir_crudo()) if d.isdigit())
+        except OSError:
+            return []
+
+    def _segmento_crudo(self, dia):
+        return _Segmento(os.path.join(self._dir_crudo(), dia))
+
+    def _cargar(self):
+        dias = self._dias_crudo()
+        if dias:
+            self._segmento_crudo(dias[-1]).reparar()
+        for segmento in self._reducidos.values():
+            segmento.reparar()
+        self._ultima = self._segmento_crudo(dias[-1]).ultima() if dias else None
+        self._dia = dias[-1] if dias else None
+        # Lo último visto en el nivel anterior y aún no cerrado en este sigue abierto.
+        anterior = self._ultima
+        for nombre, ancho in NIVELES_REDUCIDOS:
+            cerrada = self._reducidos[nombre].ultima()
+            if anterior is not None and (cerrada is None or anterior[0] // ancho > cerrada[0] // ancho):
+                self._abiertas[nombre] = anterior
+            anterior = self._abiertas.get(nombre) or cerrada
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            with open(os.path.join(self.directorio, "save.txt"), "w", encoding="utf-8") as fh:
+                fh.write(os.path.abspath(self.ruta_save))
+        except OSError:
+            pass
+
+    def registrar(self, datos, ahora=None):
+        """Anexa las métricas del save si cambiaron desde la última fila. True si se escribió algo."""
+        if not datos:
+            return False
+        fila = fila_de(datos, time.time() if ahora is None else ahora)
+        with self._lock:
+            if self._ultima is not None and self._ultima[1:] == fila[1:]:
+                return False
+            dia = time.strftime("%Y%m%d", time.localtime(fila[0]))
+            self._segmento_crudo(dia).anexar(fila)
+            if dia != self._dia:
+                # Segmento nuevo: es el único momento en que se mira si sobran días viejos.
+                self._dia = dia
+                self._purgar(self._dias_crudo())
+            for nombre, ancho in NIVELES_REDUCIDOS:
+                abierta = self._abiertas.get(nombre)
+                if abierta is not None and abierta[0] // ancho != fila[0] // ancho:
+                    self._reducidos[nombre].anexar(abierta)
+                self._abiertas[nombre] = fila
+            self._ultima = fila
+        return True
+
+    def _purgar(self, dias):
+        limite = time.strftime("%Y%m%d", time.localtime(time.time() - RETENCION_CRUDO_DIAS * 86400))
+        for dia in dias:
+            if dia < limite:
+                shutil.rmtree(os.path.join(self._dir_crudo(), dia), ignore_errors=True)
+
+    # --- lectura ---
+
+    def _niveles(self):
+        """(nombre, segmentos) del más fino al más grueso; los intervalos abiertos van aparte."""
+        niveles = [("crudo", [self._segmento_crudo(dia) for dia in self._dias_crudo()])]
+        niveles += [(nombre, [self._reducidos[nombre]]) for nombre, _ in NIVELES_REDUCIDOS]
+        return niveles
+
+    def leer_serie(self, columnas, desde=None, max_puntos=MAX_PUNTOS):
+        """
+        (nivel, {columna: lista}) con las filas de instante >= `desde` (epoch; None = todo), como mucho
+        `max_puntos`: del nivel más fino que no pasa de MARGEN_LECTURA veces eso, tomando una de cada k.
+        """
+        columnas = ["t"] + [c for c in columnas if c != "t"]
+        limite = max_puntos * MARGEN_LECTURA
+        with self._lock:
+            abiertas = dict(self._abiertas)
+        grueso = NIVELES_REDUCIDOS[-1][0]
+        for nombre, segmentos in self._niveles():
+            if nombre == "crudo":
+                # Las filas crudas solo se leen si caben: la cota sale del tamaño de los segmentos del periodo.
+                if desde is not None:
+                    primer_dia = time.strftime("%Y%m%d", time.localtime(desde))
+                    segmentos = [s for s in segmentos if os.path.basename(s.directorio) >= primer_dia]
+                if sum(s.filas() for s in segmentos) > limite:
+                    continue
+            partes = []
+            for segmento in segmentos:
+                inicio = bisect_left(segmento.leer("t"), desde) if desde is not None else 0
+                if inicio < segmento.filas():
+                    partes.append((segmento, inicio))
+            if sum(segmento.filas() - inicio for segmento, inicio in partes) <= limite or nombre == grueso:
+                break
+        serie = {columna: [] for columna in columnas}
+        for segmento, inicio in partes:
+            for columna in columnas:
+                serie[columna].extend(segmento.leer(columna, inicio))
+        # El intervalo en curso de un nivel reducido aún no está en disco: se añade al final.
+        abierta = abiertas.get(nombre)
+        if abierta is not None and (desde is None or abierta[0] >= desde):
+            indices = {columna: i for i, (columna, _) in enumerate(COLUMNAS)}
+            for columna in columnas:
+                serie[columna].append(abierta[indices[columna]])
+        paso = -(-len(serie["t"]) // max_puntos) if max_puntos else 1
+        if paso > 1:
+            # Una de cada `paso` contando desde el final, para que el último valor siempre esté.
+            serie = {columna: valores[::-1][::paso][::-1] for columna, valores in serie.items()}
+        return nombre, serie
+
+
+_historiales = {}
+_historiales_lock = threading.Lock()
+
+
+def historial_para(ruta_save):
+    """Historial compartido del save (uno por ruta y proceso)."""
+    clave = os.path.abspath(ruta_save)
+    with _historiales_lock:
+        historial = _historiales.get(clave)
+        if historial is None:
+            historial = _historiales[clave] = HistorialProgreso(ruta_save)
+        return historial
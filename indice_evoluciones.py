@@ -0,0 +1,151 @@
+"""
+Índice persistente de cadenas evolutivas, por cadena y no por especie.
+
+Cada `/evolution-chain` se recorre una sola vez y se guardan todas sus especies (padre, hijos y
+condición ya formateada), así Bulbasaur, Ivysaur y Venusaur comparten una única descarga. Se
+guarda en `.cache/evoluciones.json` y al cargarlo se precalculan la línea completa (por etapas) y
+las etapas finales de cada especie: siguiente, anterior, línea y final son consultas a diccionarios.
+Lo usa `CompanionEngine` (companion_engine.py).
+"""
+import json
+import os
+import threading
+from collections import deque
+
+from api_cache import CACHE_DIR
+from pokeapi_parse import extract_id_from_url, format_evolution_condition
+
+RUTA_EVOLUCIONES = os.path.join(CACHE_DIR, "evoluciones.json")
+FORMATO_EVOLUCIONES = 1
+
+
+def nodos_desde_cadena(chain_json):
+    """{species_id: {padre, hijos, nombre, min_level, condicion}} recorriendo el árbol de la cadena una vez."""
+    nodos = {}
+    pendientes = [(chain_json, None, None)]
+    while pendientes:
+        nodo, padre, details = pendientes.pop()
+        especie = nodo.get("species", {})
+        species_id = extract_id_from_url(especie.get("url", ""))
+        if species_id is None:
+            continue
+        nodos[species_id] = {
+            "padre": padre,
+            "hijos": [],
+            "nombre": especie.get("name", "").replace("-", " ").title() or f"Species {species_id}",
+            "min_level": details.get("min_level") if padre is not None else None,
+            "condicion": format_evolution_condition(details) if padre is not None else "",
+        }
+        if padre is not None:
+            nodos[padre]["hijos"].append(species_id)
+        # Al revés para que la pila visite los hijos en el orden de PokeAPI.
+        for hijo in reversed(nodo.get("evolves_to", [])):
+            pendientes.append((hijo, species_id, (hijo.get("evolution_details") or [{}])[0]))
+    return nodos
+
+
+class IndiceEvoluciones:
+    def __init__(self, ruta=RUTA_EVOLUCIONES):
+        self.ruta = ruta
+        # Lo que se guarda en disco: {cadena: {species_id: nodo}}.
+        self._cadenas = {}
+        # Derivados: nodo por especie (con "cadena" y "etapa"), línea por cadena y finales por especie.
+        self._nodos = {}
+        self._lineas = {}
+        self._finales = {}
+        self._lock = threading.Lock()
+        self.cargar()
+
+    def cargar(self):
+        try:
+            with open(self.ruta, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            if data.get("formato") != FORMATO_EVOLUCIONES:
+                return
+            cadenas = {
+                int(cadena): {int(sid): nodo for sid, nodo in nodos.items()}
+                for cadena, nodos in data.get("cadenas", {}).items()
+            }
+        except (OSError, ValueError, AttributeError):
+            return
+        with self._lock:
+            for cadena, nodos in cadenas.items():
+                self._indexar(cadena, nodos)
+            self._cadenas.update(cadenas)
+
+    def _guardar(self):
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+        tmp = f"{self.ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"formato": FORMATO_EVOLUCIONES, "cadenas": self._cadenas}, fh, ensure_ascii=False)
+        os.replace(tmp, self.ruta)
+
+    def registrar(self, cadena, nodos, persistir=True):
+        """
+        Añade una cadena ya recorrida (`nodos_desde_cadena`). `persistir=False` para las que salen
+        del pack offline, que ya es persistente por sí mismo.
+        """
+        with self._lock:
+            self._indexar(cadena, nodos)
+            if persistir:
+                self._cadenas[cadena] = nodos
+                try:
+                    self._guardar()
+                except OSError:
+                    pass
+
+    def _indexar(self, cadena, nodos):
+        raices = [sid for sid, nodo in nodos.items() if nodo["padre"] not in nodos]
+        orden = []
+        pendientes = deque((sid, 0) for sid in raices)
+        while pendientes:
+            sid, etapa = pendientes.popleft()
+            self._nodos[sid] = dict(nodos[sid], cadena=cadena, etapa=etapa)
+            orden.append(sid)
+            pendientes.extend((hijo, etapa + 1) for hijo in nodos[sid]["hijos"] if hijo in nodos)
+        self._lineas[cadena] = tuple(orden)
+        # Por etapas al revés: cuando se llega a un padre sus hijos ya tienen sus finales.
+        for sid in reversed(orden):
+            hijos = [hijo for hijo in nodos[sid]["hijos"] if hijo in nodos]
+            self._finales[sid] = tuple(final for hijo in hijos for final in self._finales[hijo]) or (sid,)
+
+    # --- consultas (sin red) ---
+
+    def __contains__(self, species_id):
+        return species_id in self._nodos
+
+    def __len__(self):
+        return len(self._lineas)
+
+    def nodo(self, species_id):
+        return self._nodos.get(species_id)
+
+    def siguientes(self, species_id):
+        nodo = self._nodos.get(species_id)
+        return [hijo for hijo in nodo["hijos"] if hijo in self._nodos] if nodo is not None else []
+
+    def anterior(self, species_id):
+        nodo = self._nodos.get(species_id)
+        return nodo["padre"] if nodo is not None else None
+
+    def linea(self, species_id):
+        """Todas las especies de la cadena, ordenadas por etapa (la raíz primero)."""
+        nodo = self._nodos.get(species_id)
+        return self._lineas[nodo["cadena"]] if nodo is not None else ()
+
+    def finales(self, species_id):
+        """Etapas finales alcanzables desde la especie (ella misma si ya no evoluciona)."""
+        return self._finales.get(species_id, ())
+
+
+_indice = None
+_indice_lock = threading.Lock()
+
+
+def obtener_indice_evoluciones():
+    """Instancia compartida del proceso (se carga de disco la primera vez)."""
+    global _indice
+    with _indice_lock:
+        if _indice is None:
+            _indice = IndiceEvoluciones()
+        return _indice
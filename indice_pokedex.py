@@ -0,0 +1,175 @@
+"""
+Índice de búsqueda de la ventana "Pokédex completa".
+
+Se construye una vez por ventana: cada n-grama (1 a 3 caracteres) de los nombres y de los IDs
+apunta a un bitmap (int de Python, bit i = especie i) y los estados visto/capturado/no visto
+son bitmaps precalculados. Buscar y filtrar son intersecciones de bitmaps; solo las consultas de
+más de 3 caracteres necesitan verificar los candidatos con una comparación de subcadena.
+
+`BitsetEspecies` es el mismo bitmap como conjunto de especies: así llegan visto/capturado desde el
+lector nativo y desde el wrapper (`SeenBits`/`CaughtBits`, base64 en el JSON), sin listas de IDs.
+"""
+import base64
+
+N_GRAMA = 3
+FILTROS = ("Todos", "Vistos", "Capturados", "No vistos")
+
+
+def bitmap_de(ids):
+    bitmap = 0
+    for i in ids:
+        bitmap |= 1 << i
+    return bitmap
+
+
+def ids_de(bitmap):
+    """IDs (ordenados) con el bit activo."""
+    ids = []
+    while bitmap:
+        bajo = bitmap & -bitmap
+        ids.append(bajo.bit_length() - 1)
+        bitmap ^= bajo
+    return ids
+
+
+class BitsetEspecies:
+    """Conjunto de IDs de especie sobre un int de Python (bit i = especie i)."""
+
+    __slots__ = ("bits",)
+
+    def __init__(self, bits=0):
+        self.bits = bits
+
+    @classmethod
+    def desde_ids(cls, ids):
+        return cls(bitmap_de(int(i) for i in ids))
+
+    @classmethod
+    def desde_bytes(cls, data):
+        """Bytes little endian: bit 0 del byte 0 = especie 0 (formato de `SeenBits` del wrapper)."""
+        return cls(int.from_bytes(data, "little"))
+
+    @classmethod
+    def desde_base64(cls, texto):
+        return cls.desde_bytes(base64.b64decode(texto))
+
+    def a_base64(self):
+        return base64.b64encode(self.bits.to_bytes((self.bits.bit_length() + 7) // 8, "little")).decode("ascii")
+
+    def __contains__(self, species_id):
+        return species_id >= 0 and bool(self.bits >> species_id & 1)
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def __iter__(self):
+        return iter(ids_de(self.bits))
+
+    def __and__(self, otro):
+        return BitsetEspecies(self.bits & otro.bits)
+
+    def __or__(self, otro):
+        return BitsetEspecies(self.bits | otro.bits)
+
+    def __sub__(self, otro):
+        return BitsetEspecies(self.bits & ~otro.bits)
+
+    def __eq__(self, otro):
+        return isinstance(otro, BitsetEspecies) and self.bits == otro.bits
+
+    def __hash__(self):
+        return hash(self.bits)
+
+    def __repr__(self):
+        return f"BitsetEspecies({len(self)} especies)"
+
+
+def _como_bitset(valor):
+    if isinstance(valor, BitsetEspecies):
+        return valor
+    if isinstance(valor, str):
+        return BitsetEspecies.desde_base64(valor)
+    return BitsetEspecies.desde_ids(valor or ())
+
+
+def normalizar_pokedex(dex):
+    """
+    Deja `SeenBits`/`CaughtBits` como BitsetEspecies venga el dict de donde venga (lector nativo,
+    wrapper con `bits` en base64 o wrapper antiguo con listas `SeenSpecies`/`CaughtSpecies`).
+    """
+    if not dex:
+        return dex
+    for bits, lista in (("SeenBits", "SeenSpecies"), ("CaughtBits", "CaughtSpecies")):
+        if bits in dex:
+            dex[bits] = _como_bitset(dex[bits])
+        else:
+            dex[bits] = _como_bitset(dex.pop(lista, None))
+    return dex
+
+
+def bitsets_pokedex(dex):
+    """(vistos, capturados) como BitsetEspecies sin modificar `dex`."""
+    dex = dict(dex or {})
+    normalizar_pokedex(dex)
+    return dex["SeenBits"], dex["CaughtBits"]
+
+
+def _ngramas(texto, n_max=N_GRAMA):
+    for n in range(1, n_max + 1):
+        for i in range(len(texto) - n + 1):
+            yield texto[i:i + n]
+
+
+class IndicePokedex:
+    def __init__(self, nombres, vistos, capturados):
+        """`nombres`: {id: nombre}; `vistos` y `capturados`: BitsetEspecies o iterables de IDs."""
+        self.nombres = nombres
+        self._claves = {}
+        self._ngramas = {}
+        for species_id, nombre in nombres.items():
+            bit = 1 << species_id
+            claves = (nombre.lower(), str(species_id))
+            self._claves[species_id] = claves
+            for grama in {g for clave in claves for g in _ngramas(clave)}:
+                self._ngramas[grama] = self._ngramas.get(grama, 0) | bit
+
+        todos = bitmap_de(nombres)
+        capturados = _como_bitset(capturados).bits & todos
+        vistos = (_como_bitset(vistos).bits | capturados) & todos
+        self.capturados = capturados
+        self._por_filtro = {
+            "Todos": todos,
+            "Vistos": vistos,
+            "Capturados": capturados,
+            "No vistos": todos & ~vistos,
+        }
+
+    def estado(self, species_id):
+        if self.capturados >> species_id & 1:
+            return "Capturado"
+        if self._por_filtro["Vistos"] >> species_id & 1:
+            return "Visto"
+        return "No visto"
+
+    def _coincidencias(self, consulta):
+        """Bitmap de las especies cuyo nombre o ID contiene `consulta`."""
+        if len(consulta) <= N_GRAMA:
+            return self._ngramas.get(consulta, 0)
+        candidatos = -1
+        for grama in {consulta[i:i + N_GRAMA] for i in range(len(consulta) - N_GRAMA + 1)}:
+            candidatos &= self._ngramas.get(grama, 0)
+            if not candidatos:
+                return 0
+        # Tener todos los trigramas no garantiza la subcadena completa: se verifica cada candidato.
+        return bitmap_de(
+            sid for sid in ids_de(candidatos)
+            if any(consulta in clave for clave in self._claves[sid])
+        )
+
+    def filtrar(self, consulta="", filtro="Todos"):
+        """IDs ordenados que cumplen búsqueda y filtro."""
+        bitmap = self._por_filtro.get(filtro, self._por_filtro["Todos"])
+        consulta = consulta.strip().lower()
+        if consulta:
+            bitmap &= self._coincidencias(consulta)
+        return ids_de(bitmap)
@@ -0,0 +1,64 @@
+"""
+Última lectura de cada save guardada en disco, para arrancar en caliente.
+
+Al abrir el HUD se pinta la instantánea de la sesión anterior (entrenador, Pokédex, equipo y última
+captura) antes de que termine la primera lectura del save: las tarjetas se rellenan desde las caches
+en disco (PokeAPI, pack, sprites) y la lectura fresca solo reconcilia lo que haya cambiado.
+
+Un JSON por save en `.cache/instantaneas/` (nombre: hash de la ruta), escrito de forma atómica;
+visto/capturado van en base64 como los `SeenBits`/`CaughtBits` del wrapper.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+from api_cache import CACHE_DIR
+from indice_pokedex import BitsetEspecies, normalizar_pokedex
+
+DIR_INSTANTANEAS = os.path.join(CACHE_DIR, "instantaneas")
+VERSION = 1
+
+
+def ruta_instantanea(ruta_save, directorio=None):
+    clave = hashlib.blake2b(os.path.abspath(ruta_save).encode("utf-8"), digest_size=8).hexdigest()
+    return os.path.join(directorio or DIR_INSTANTANEAS, f"{clave}.json")
+
+
+def _a_json(valor):
+    if isinstance(valor, BitsetEspecies):
+        return valor.a_base64()
+    raise TypeError(f"{type(valor).__name__} no se guarda en la instantánea")
+
+
+def guardar_instantanea(ruta_save, datos, directorio=None, ahora=None):
+    """Guarda el dict del save (el de `CompanionEngine.leer_save`) como última lectura conocida."""
+    ruta = ruta_instantanea(ruta_save, directorio)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    documento = {
+        "version": VERSION,
+        "save": os.path.abspath(ruta_save),
+        "guardada": time.time() if ahora is None else ahora,
+        "datos": datos,
+    }
+    tmp = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(documento, fh, ensure_ascii=False, default=_a_json)
+    os.replace(tmp, ruta)
+
+
+def cargar_instantanea(ruta_save, directorio=None):
+    """(datos, instante en que se guardó) de la última lectura, o None si no hay o no se entiende."""
+    try:
+        with open(ruta_instantanea(ruta_save, directorio), "r", encoding="utf-8") as fh:
+            documento = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(documento, dict) or documento.get("version") != VERSION:
+        return None
+    datos = documento.get("datos")
+    if not isinstance(datos, dict):
+        return None
+    normalizar_pokedex(datos.get("Pokedex"))
+    return datos, documento.get("guardada")
@@ -0,0 +1,163 @@
+"""
+Inventario de las cajas del PC como índice columnar (ventana "Cajas" y `mostrar_equipo.py --cajas`).
+
+Una fila por slot ocupado, en orden de caja y slot. Las columnas que se filtran (caja, especie,
+nivel, ball, fecha de captura, huevo) son arrays compactos y cada valor distinto apunta a un bitmap
+de filas (int de Python, bit i = fila i, como en indice_pokedex): filtrar es AND/OR de bitmaps y un
+rango de nivel o de fechas es el OR de los valores que caen dentro. Mote, entrenador original y lugar
+de captura no se guardan en columnas: se decodifican al pedir la fila (`fila(i)`), así una página
+de la ventana cuesta lo que sus 30 filas y no las 960 de las cajas.
+
+Lo construyen `save_gen7.inventario_cajas` (lector nativo) y `desde_registros` (líneas del wrapper,
+`PokeLastCatch <ruta_save> --cajas`).
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+
+from indice_pokedex import bitmap_de, ids_de
+
+SLOTS_POR_CAJA = 30
+
+# Nombre por ID de ball en Gen 7 (el 0 no existe).
+BALLS = (
+    "", "Master Ball", "Ultra Ball", "Super Ball", "Poké Ball", "Safari Ball", "Malla Ball", "Buceo Ball",
+    "Nido Ball", "Acopio Ball", "Turno Ball", "Lujo Ball", "Honor Ball", "Ocaso Ball", "Sana Ball",
+    "Veloz Ball", "Gloria Ball", "Rapid Ball", "Nivel Ball", "Cebo Ball", "Peso Ball", "Amor Ball",
+    "Amigo Ball", "Luna Ball", "Competi Ball", "Ensueño Ball", "Ente Ball",
+)
+
+# Columna -> código de tipo de `array`. Nivel 0 = desconocido; fecha AAAAMMDD, 0 = sin fecha.
+COLUMNAS = {"caja": "B", "slot": "B", "especie": "H", "nivel": "B", "ball": "B", "fecha": "L", "huevo": "B"}
+INDEXADAS = ("caja", "especie", "nivel", "ball", "fecha", "huevo")
+
+
+def nombre_ball(ball):
+    return BALLS[ball] if 0 < ball < len(BALLS) else f"Ball {ball}"
+
+
+def fecha_a_entero(fecha):
+    """"AAAA-MM-DD" (o date/datetime) -> AAAAMMDD; 0 si no hay fecha."""
+    if not fecha:
+        return 0
+    if not isinstance(fecha, str):
+        return fecha.year * 10000 + fecha.month * 100 + fecha.day
+    try:
+        anio, mes, dia = fecha[:10].split("-")
+        return int(anio) * 10000 + int(mes) * 100 + int(dia)
+    except ValueError:
+        return 0
+
+
+def entero_a_fecha(valor):
+    return f"{valor // 10000:04d}-{valor // 100 % 100:02d}-{valor % 100:02d}" if valor else None
+
+
+class InventarioCajas:
+    def __init__(self, columnas, detalle):
+        """
+        `columnas`: {nombre: valores por fila} con las de COLUMNAS, filas ordenadas por caja y slot.
+        `detalle(i)`: dict con `Species`, `Nickname`, `OT` y `MetLocation` de la fila i (se llama una vez por fila).
+        """
+        self.columnas = {nombre: array(tipo, columnas[nombre]) for nombre, tipo in COLUMNAS.items()}
+        self._detalle = detalle
+        self._filas = {}
+        self.todas = (1 << len(self)) - 1
+        # Por columna indexada: {valor: bitmap de filas} y los valores ordenados (para los rangos).
+        self._bitmaps = {}
+        self._claves = {}
+        for nombre in INDEXADAS:
+            filas_por_valor = {}
+            for i, valor in enumerate(self.columnas[nombre]):
+                filas_por_valor.setdefault(valor, []).append(i)
+            self._bitmaps[nombre] = {valor: bitmap_de(filas) for valor, filas in filas_por_valor.items()}
+            self._claves[nombre] = sorted(filas_por_valor)
+
+    @classmethod
+    def desde_registros(cls, registros):
+        """Desde dicts en el formato del wrapper (`Box`, `Slot`, `SpeciesId`, `Level`, `Ball`, `MetDate`, ...)."""
+        registros = sorted(registros, key=lambda r: (r["Box"], r["Slot"]))
+        columnas = {
+            "caja": [r["Box"] for r in registros],
+            "slot": [r["Slot"] for r in registros],
+            "especie": [r["SpeciesId"] for r in registros],
+            "nivel": [r.get("Level") or 0 for r in registros],
+            "ball": [r.get("Ball") or 0 for r in registros],
+            "fecha": [fecha_a_entero(r.get("MetDate")) for r in registros],
+            "huevo": [1 if r.get("IsEgg") else 0 for r in registros],
+        }
+        return cls(columnas, registros.__getitem__)
+
+    def __len__(self):
+        return len(self.columnas["caja"])
+
+    def fila(self, i):
+        """Registro completo de la fila `i`, en el formato de las líneas de `PokeLastCatch --cajas`."""
+        registro = self._filas.get(i)
+        if registro is None:
+            c = self.columnas
+            detalle = self._detalle(i)
+            especie = c["especie"][i]
+            registro = {
+                "Box": c["caja"][i],
+                "Slot": c["slot"][i],
+                "SpeciesId": especie,
+                "Species": detalle.get("Species") or str(especie),
+                "Nickname": detalle.get("Nickname", ""),
+                "Level": c["nivel"][i] or None,
+                "Ball": c["ball"][i],
+                "MetDate": entero_a_fecha(c["fecha"][i]),
+                "MetLocation": detalle.get("MetLocation"),
+                "OT": detalle.get("OT", ""),
+                "IsEgg": bool(c["huevo"][i]),
+            }
+            self._filas[i] = registro
+        return registro
+
+    def registros(self):
+        """Todas las filas en orden, de una en una (para volcarlas en NDJSON sin armar la lista)."""
+        return (self.fila(i) for i in range(len(self)))
+
+    def valores(self, columna):
+        """Valores distintos de una columna indexada, ordenados."""
+        return list(self._claves[columna])
+
+    def cajas(self):
+        """Número de cajas a mostrar: hasta la última con algo (al menos 1)."""
+        return max(self._claves["caja"], default=1)
+
+    def caja(self, numero):
+        """Filas de la caja `numero` (desde 1), por slot."""
+        return ids_de(self._bitmaps["caja"].get(numero, 0))
+
+    def _en(self, columna, valores):
+        por_valor = self._bitmaps[columna]
+        bitmap = 0
+        for valor in valores:
+            bitmap |= por_valor.get(valor, 0)
+        return bitmap
+
+    def _rango(self, columna, desde=None, hasta=None):
+        claves = self._claves[columna]
+        ini = 0 if desde is None else bisect_left(claves, desde)
+        fin = len(claves) if hasta is None else bisect_right(claves, hasta)
+        return self._en(columna, claves[ini:fin])
+
+    def filtrar(self, cajas=None, especies=None, nivel=None, balls=None, fecha=None, huevos=True):
+        """
+        Filas (por caja y slot) que cumplen todos los filtros dados; None = sin filtro.
+        `cajas`, `especies` y `balls`: valores aceptados. `nivel` y `fecha`: (desde, hasta) con extremos
+        opcionales (fechas "AAAA-MM-DD" o date); un rango deja fuera los de nivel o fecha desconocidos.
+        """
+        bitmap = self.todas
+        for columna, valores in (("caja", cajas), ("especie", especies), ("ball", balls)):
+            if valores is not None:
+                bitmap &= self._en(columna, valores)
+        if nivel is not None:
+            desde, hasta = nivel
+            bitmap &= self._rango("nivel", max(1, desde or 0), hasta)
+        if fecha is not None:
+            desde, hasta = fecha
+            bitmap &= self._rango("fecha", max(1, fecha_a_entero(desde)), fecha_a_entero(hasta) or None)
+        if not huevos:
+            bitmap &= ~self._bitmaps["huevo"].get(1, 0)
+        return ids_de(bitmap)
@@ -1,35 +1,62 @@
 """
 Usa el wrapper PokeLastCatch para leer el save y muestra el equipo con datos de PokeAPI.
+Los datos salen del mismo motor que la UI (companion_engine.py), y del servicio local de cache si está levantado.
+
+Modo lote (archivos de backups): con rutas de saves o carpetas se genera un informe, un registro por save.
+
+    python mostrar_equipo.py backups/ otro/main [--formato ndjson|csv] [--salida informe.ndjson]
+
+Los saves se parsean en un pool de procesos con una ventana acotada de trabajos y cada registro se
+escribe en cuanto su save termina, así la memoria no crece con el tamaño del archivo. Los datos de
+PokeAPI se piden una sola vez por especie en todo el lote, en paralelo.
+
+Inventario de cajas: `--cajas` vuelca en NDJSON un registro por slot ocupado de las cajas del save
+(el de siempre o los dados), con el mismo formato que `PokeLastCatch <ruta_save> --cajas`.
+
+    python mostrar_equipo.py --cajas [main] [--salida cajas.ndjson]
 """
+import argparse
+import csv
+import importlib.util
 import json
-import subprocess
+import os
 import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from companion_engine import CompanionEngine, FuenteLocal, crear_motor
+from gamedata_pack import cargar_pack
+
+try:
+    from save_gen7 import SAVE_SIZES
+except ImportError:
+    # Sin NumPy no hay lector nativo: en las carpetas solo se toman los archivos llamados "main".
+    SAVE_SIZES = None
 
 RUTA_PROYECTO = r"C:\Users\danie\Documents\HUD-PokeCompanion\PokeLastCatch"
 RUTA_SAVE = r"C:\Users\danie\AppData\Roaming\Azahar\sdmc\Nintendo 3DS\00000000000000000000000000000000\00000000000000000000000000000000\title\00040000\001b5100\data\00000001\main"
 
 
-def leer_wrapper(ruta_save: str = RUTA_SAVE):
-    proc = subprocess.run(
-        ["dotnet", "run", "--project", RUTA_PROYECTO, "--", ruta_save],
-        capture_output=True,
-        text=True,
-        cwd=RUTA_PROYECTO,
-    )
-    if proc.returncode != 0:
-        print("Error al ejecutar wrapper:", proc.stderr or proc.stdout, file=sys.stderr)
+def leer_wrapper(motor, ruta_save: str = RUTA_SAVE):
+    try:
+        return motor.leer_save(ruta_save)
+    except Exception as ex:
+        print("Error al ejecutar wrapper:", ex, file=sys.stderr)
         sys.exit(1)
-    return json.loads(proc.stdout)
 
 
 def mostrar_equipo_con_pokeapi():
-    try:
-        import requests
-    except ImportError:
+    # requests solo se comprueba: lo importa el motor al ir a la red.
+    if importlib.util.find_spec("requests") is None:
         print("Instala requests: pip install requests")
         sys.exit(1)
 
-    datos = leer_wrapper()
+    motor = crear_motor(ruta_proyecto=RUTA_PROYECTO)
+    datos = leer_wrapper(motor)
+    # Índice de nombres que guarda la UI: da nombre a las especies aunque falle PokeAPI.
+    nombres = motor.indice_nombres
 
     if not datos.get("Party"):
         print("No hay Pokémon en el equipo.")
@@ -42,13 +69,11 @@ def mostrar_equipo_con_pokeapi():
         level = mon.get("Level", "?")
 
         try:
-            r = requests.get(f"https://pokeapi.co/api/v2/pokemon/{species_id}", timeout=10)
-            r.raise_for_status()
-            pj = r.json()
+            pj = motor.pokemon_json(species_id)
             nombre_api = pj["name"]
             sprite = pj["sprites"].get("front_default") or pj["sprites"].get("front_female") or ""
         except Exception as e:
-            nombre_api = f"Species {species_id}"
+            nombre_api = nombres.nombre(species_id) or f"Species {species_id}"
             sprite = ""
             print(f"  (PokeAPI error: {e})")
 
@@ -59,8 +84,304 @@ def mostrar_equipo_con_pokeapi():
 
     last = datos.get("Last")
     if last:
-        print(f"Último capturado: {last.get('Nickname')} (SpeciesId {last.get('SpeciesId')})")
+        last_id = last.get("SpeciesId")
+        last_nombre = nombres.nombre(last_id) or f"SpeciesId {last_id}"
+        print(f"Último capturado: {last.get('Nickname')} ({last_nombre})")
+
+
+# --- modo lote ---
+
+# Trabajos encargados al pool por cada proceso: lo justo para que ninguno quede ocioso.
+VENTANA_POR_PROCESO = 4
+HILOS_API_LOTE = 8
+COLUMNAS_CSV = (
+    "ruta", "ok", "error", "entrenador", "tid", "sid", "version", "tiempo_jugado", "dinero",
+    "vistos", "capturados", "total_pokedex", "equipo", "ultimo",
+)
+
+_motor_lote = None
+
+
+def enumerar_saves(rutas):
+    """Saves bajo `rutas` (archivos sueltos o carpetas recorridas en orden); generador, no arma la lista."""
+    for ruta in rutas:
+        if not os.path.isdir(ruta):
+            yield ruta
+            continue
+        for carpeta, subcarpetas, archivos in os.walk(ruta):
+            subcarpetas.sort()
+            for nombre in sorted(archivos):
+                completa = os.path.join(carpeta, nombre)
+                if _parece_save(completa, nombre):
+                    yield completa
+
+
+def _parece_save(ruta, nombre):
+    if SAVE_SIZES is None:
+        return nombre == "main"
+    try:
+        return os.path.getsize(ruta) in SAVE_SIZES
+    except OSError:
+        return False
+
+
+def _leer_para_lote(ruta):
+    """Proceso del pool: (ruta, datos, error). Sin los bitsets de especies de la Pokédex, que no van al informe."""
+    global _motor_lote
+    if _motor_lote is None:
+        # Este motor solo lee saves (lector nativo o wrapper); PokeAPI se consulta en el proceso principal.
+        _motor_lote = CompanionEngine(fuente=FuenteLocal(), ruta_proyecto=RUTA_PROYECTO)
+    try:
+        datos = _motor_lote.leer_save(ruta)
+    except Exception as ex:
+        return ruta, None, str(ex) or type(ex).__name__
+    dex = {k: v for k, v in (datos.get("Pokedex") or {}).items() if k not in ("SeenBits", "CaughtBits")}
+    return ruta, {
+        "Trainer": datos.get("Trainer") or {},
+        "Pokedex": dex,
+        "Party": datos.get("Party") or [],
+        "Last": datos.get("Last") or {},
+    }, None
+
+
+class ResolutorEspecies:
+    """Nombre y sprite por especie: una consulta por especie en todo el lote, repartidas en hilos."""
+
+    def __init__(self, motor, hilos=HILOS_API_LOTE):
+        self.motor = motor
+        self._pool = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="lote-api")
+        # Acotado por el número de especies, no por el de saves.
+        self._futuros = {}
+
+    def pedir(self, species_id):
+        futuro = self._futuros.get(species_id)
+        if futuro is None:
+            futuro = self._futuros[species_id] = self._pool.submit(self.motor.datos_pokemon, species_id)
+        return futuro
+
+    def cerrar(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def registro_lote(ruta, datos, error, especies):
+    """Registro del informe para un save; `especies(species_id)` devuelve (nombre, sprite)."""
+    if error is not None:
+        return {"ruta": ruta, "ok": False, "error": error}
+    trainer = datos["Trainer"]
+    dex = datos["Pokedex"]
+    last = datos["Last"]
+
+    def pokemon(mon):
+        nombre, sprite = especies(mon["SpeciesId"])
+        return {
+            "species_id": mon["SpeciesId"],
+            "nombre": nombre,
+            "apodo": mon.get("Nickname") or "",
+            "nivel": mon.get("Level"),
+            "amistad": mon.get("Friendship"),
+            "sprite": sprite,
+        }
+
+    return {
+        "ruta": ruta,
+        "ok": True,
+        "entrenador": {
+            "nombre": trainer.get("Name"),
+            "tid": trainer.get("TID"),
+            "sid": trainer.get("SID"),
+            "version": trainer.get("GameVersion"),
+            "tiempo_jugado": trainer.get("PlayTime"),
+            "dinero": trainer.get("Money"),
+        },
+        "pokedex": {
+            "vistos": dex.get("Seen", 0),
+            "capturados": dex.get("Caught", 0),
+            "total": dex.get("MaxSpecies", 0),
+        } if dex.get("Enabled") else None,
+        "equipo": [pokemon(mon) for mon in datos["Party"]],
+        "ultimo": pokemon(last) if last.get("SpeciesId") else None,
+    }
+
+
+def fila_csv(registro):
+    if not registro["ok"]:
+        return {"ruta": registro["ruta"], "ok": 0, "error": registro["error"]}
+    entrenador = registro["entrenador"]
+    dex = registro["pokedex"] or {}
+
+    def texto(mon):
+        return f"{mon['apodo'] or mon['nombre']} ({mon['nombre']}) Nv.{mon['nivel']}"
+
+    return {
+        "ruta": registro["ruta"],
+        "ok": 1,
+        "error": "",
+        "entrenador": entrenador["nombre"],
+        "tid": entrenador["tid"],
+        "sid": entrenador["sid"],
+        "version": entrenador["version"],
+        "tiempo_jugado": entrenador["tiempo_jugado"],
+        "dinero": entrenador["dinero"],
+        "vistos": dex.get("vistos", ""),
+        "capturados": dex.get("capturados", ""),
+        "total_pokedex": dex.get("total", ""),
+        "equipo": "; ".join(texto(mon) for mon in registro["equipo"]),
+        "ultimo": texto(registro["ultimo"]) if registro["ultimo"] else "",
+    }
+
+
+def procesar_lote(rutas, salida, formato="ndjson", procesos=None, hilos=HILOS_API_LOTE):
+    """Escribe un registro por save en `salida` según van terminando. Devuelve (saves, errores)."""
+    procesos = procesos or max(1, (os.cpu_count() or 2) - 1)
+    motor = crear_motor(pack=cargar_pack(), ruta_proyecto=RUTA_PROYECTO)
+    resolutor = ResolutorEspecies(motor, hilos)
+    if formato == "csv":
+        escritor = csv.DictWriter(salida, fieldnames=COLUMNAS_CSV)
+        escritor.writeheader()
+
+        def escribir(registro):
+            escritor.writerow(fila_csv(registro))
+    else:
+        def escribir(registro):
+            salida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+    def especies(species_id):
+        return resolutor.pedir(species_id).result()
+
+    saves = enumerar_saves(rutas)
+    total = errores = 0
+    # Si un proceso muere (p. ej. un save que tumba al wrapper) su pool queda roto y se pierden todos
+    # los saves que llevaba: se abre otro pool y esos saves se reintentan de uno en uno, cada uno solo
+    # en un pool de un proceso ("aislado"). Solo el que vuelve a tumbarlo ahí queda como error.
+    pools = {"lote": ProcessPoolExecutor(max_workers=procesos), "aislado": None}
+    # Futuro -> (ruta, "lote"/"aislado", pool al que se encargó).
+    encargos = {}
+    reintentos = deque()
+
+    def encargar_en(nombre, ruta):
+        if pools[nombre] is None:
+            pools[nombre] = ProcessPoolExecutor(max_workers=1 if nombre == "aislado" else procesos)
+        try:
+            futuro = pools[nombre].submit(_leer_para_lote, ruta)
+        except BrokenProcessPool:
+            renovar(pools[nombre])
+            return encargar_en(nombre, ruta)
+        encargos[futuro] = (ruta, nombre, pools[nombre])
+        pendientes.add(futuro)
+
+    def renovar(pool):
+        """Cierra `pool` si sigue siendo uno de los vigentes; el siguiente encargo abre otro."""
+        for nombre, actual in pools.items():
+            if actual is pool:
+                pool.shutdown(wait=False)
+                pools[nombre] = None
+
+    def leido(futuro):
+        """(ruta, datos, error) del save, o None si queda para reintentarlo aislado."""
+        ruta, nombre, pool = encargos.pop(futuro)
+        try:
+            return futuro.result()
+        except BrokenProcessPool as ex:
+            renovar(pool)
+            if nombre == "aislado":
+                return ruta, None, str(ex) or type(ex).__name__
+            reintentos.append(ruta)
+            return None
+
+    try:
+        pendientes = set()
+
+        def encargar():
+            # Un reintento a la vez: así, si el pool aislado cae, se sabe qué save lo tumbó.
+            if reintentos and all(nombre != "aislado" for _, nombre, _ in encargos.values()):
+                encargar_en("aislado", reintentos.popleft())
+            # Ventana acotada: nunca hay más saves leídos esperando que VENTANA_POR_PROCESO por proceso.
+            while len(pendientes) < procesos * VENTANA_POR_PROCESO:
+                ruta = next(saves, None)
+                if ruta is None:
+                    return
+                encargar_en("lote", ruta)
+
+        encargar()
+        while pendientes:
+            hechos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            # Se piden todas las especies de los saves listos antes de esperar ninguna.
+            leidos = [resultado for resultado in map(leido, hechos) if resultado is not None]
+            for _, datos, _ in leidos:
+                if datos is not None:
+                    for mon in datos["Party"] + ([datos["Last"]] if datos["Last"].get("SpeciesId") else []):
+                        resolutor.pedir(mon["SpeciesId"])
+            encargar()
+            for ruta, datos, error in leidos:
+                escribir(registro_lote(ruta, datos, error, especies))
+                total += 1
+                errores += error is not None
+            salida.flush()
+    finally:
+        for pool in pools.values():
+            if pool is not None:
+                pool.shutdown()
+        resolutor.cerrar()
+    return total, errores
+
+
+# --- inventario de cajas ---
+
+def exportar_cajas(rutas, salida):
+    """Escribe las cajas de cada save según se recorren; con varios saves cada registro lleva su `ruta`."""
+    # Sin PokeAPI: el pack solo aporta el ritmo de crecimiento para calcular el nivel en caja.
+    motor = CompanionEngine(fuente=FuenteLocal(), pack=cargar_pack(), ruta_proyecto=RUTA_PROYECTO)
+    total = errores = 0
+    for ruta in rutas:
+        try:
+            inventario = motor.leer_cajas(ruta)
+        except Exception as ex:
+            errores += 1
+            print(f"{ruta}: {ex}", file=sys.stderr)
+            continue
+        for registro in inventario.registros():
+            if len(rutas) > 1:
+                registro = dict(registro, ruta=ruta)
+            salida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        salida.flush()
+        total += len(inventario)
+    return total, errores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Equipo del save con datos de PokeAPI (o informe de muchos saves)")
+    parser.add_argument("rutas", nargs="*", help="Saves o carpetas de backups: activa el modo lote")
+    parser.add_argument("--formato", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument("--salida", help="Archivo del informe (por defecto, la salida estándar)")
+    parser.add_argument("--procesos", type=int, help="Procesos que parsean saves (por defecto, núcleos - 1)")
+    parser.add_argument("--hilos", type=int, default=HILOS_API_LOTE, help="Consultas a PokeAPI en paralelo")
+    parser.add_argument("--cajas", action="store_true", help="Inventario de cajas (NDJSON, un slot por línea)")
+    args = parser.parse_args(argv)
+
+    if args.cajas:
+        salida = open(args.salida, "w", encoding="utf-8", newline="") if args.salida else sys.stdout
+        try:
+            total, errores = exportar_cajas(args.rutas or [RUTA_SAVE], salida)
+        finally:
+            if args.salida:
+                salida.close()
+        print(f"{total} Pokémon en cajas ({errores} saves con error)", file=sys.stderr)
+        return 0 if not errores else 2
+
+    if not args.rutas:
+        mostrar_equipo_con_pokeapi()
+        return 0
+
+    inicio = time.perf_counter()
+    salida = open(args.salida, "w", encoding="utf-8", newline="") if args.salida else sys.stdout
+    try:
+        total, errores = procesar_lote(args.rutas, salida, args.formato, args.procesos, args.hilos)
+    finally:
+        if args.salida:
+            salida.close()
+    print(f"{total} saves ({errores} con error) en {time.perf_counter() - inicio:.1f} s", file=sys.stderr)
+    return 0 if total else 2
 
 
 if __name__ == "__main__":
-    mostrar_equipo_con_pokeapi()
+    sys.exit(main())
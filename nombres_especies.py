@@ -0,0 +1,130 @@
+"""
+Índice persistente de nombres de especie ({id: "Nombre"}) para la Pokédex completa.
+
+Se guarda en `.cache/species_names.json`, se carga al arrancar y se refresca en segundo plano
+desde `pokemon-species?limit=N` con reintentos; un fallo nunca se guarda como índice vacío.
+Lo leen `ui_equipo.py` y `mostrar_equipo.py`.
+"""
+import json
+import os
+import threading
+import time
+
+from api_cache import CACHE_DIR, api_get_json
+from gamedata_pack import MAX_SPECIES_GEN7
+from pokeapi_parse import extract_id_from_url
+
+RUTA_NOMBRES = os.path.join(CACHE_DIR, "species_names.json")
+# Los nombres no cambian: el índice solo se vuelve a pedir pasado este tiempo.
+NOMBRES_TTL_SECONDS = 30 * 24 * 3600
+REINTENTOS_REFRESCO = 5
+ESPERA_BASE_SECONDS = 2.0
+
+
+def nombres_desde_lista(data):
+    """{id: nombre} a partir del JSON de `pokemon-species?limit=N`."""
+    mapping = {}
+    for item in data.get("results", []):
+        species_id = extract_id_from_url(item.get("url", ""))
+        if species_id is not None:
+            mapping[species_id] = item.get("name", "").replace("-", " ").title()
+    return mapping
+
+
+class IndiceNombres:
+    def __init__(self, ruta=RUTA_NOMBRES):
+        self.ruta = ruta
+        self._nombres = {}
+        self._actualizado = 0.0
+        self._lock = threading.Lock()
+        self._refrescando = False
+        self.cargar()
+
+    def cargar(self):
+        try:
+            with open(self.ruta, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            nombres = {int(k): v for k, v in data.get("names", {}).items()}
+        except (OSError, ValueError, AttributeError):
+            return
+        with self._lock:
+            self._nombres = nombres
+            self._actualizado = float(data.get("updated_at", 0))
+
+    def _guardar(self):
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+        tmp = f"{self.ruta}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"updated_at": self._actualizado, "names": self._nombres}, fh, ensure_ascii=False)
+        os.replace(tmp, self.ruta)
+
+    def nombres(self, max_species):
+        """Lo que haya en memoria hasta `max_species` (nunca va a la red)."""
+        with self._lock:
+            return {sid: n for sid, n in self._nombres.items() if sid <= max_species}
+
+    def nombre(self, species_id):
+        return self._nombres.get(species_id)
+
+    def completo(self, max_species):
+        with self._lock:
+            return all(sid in self._nombres for sid in range(1, max_species + 1))
+
+    def caducado(self):
+        return time.time() - self._actualizado >= NOMBRES_TTL_SECONDS
+
+    def refrescar(self, session, max_species=MAX_SPECIES_GEN7, reintentos=REINTENTOS_REFRESCO):
+        """Descarga el índice con reintentos (espera exponencial). Devuelve True si se actualizó."""
+        limite = max(max_species, MAX_SPECIES_GEN7)
+        for intento in range(reintentos):
+            try:
+                data = api_get_json(session, f"https://pokeapi.co/api/v2/pokemon-species?limit={limite}", timeout=20)
+                nombres = nombres_desde_lista(data)
+            except Exception:
+                nombres = {}
+            if nombres:
+                with self._lock:
+                    self._nombres = nombres
+                    self._actualizado = time.time()
+                    # Sin poder escribir la cache el índice en memoria sigue valiendo para esta sesión.
+                    try:
+                        self._guardar()
+                    except OSError:
+                        pass
+                return True
+            if intento < reintentos - 1:
+                time.sleep(ESPERA_BASE_SECONDS * 2 ** intento)
+        return False
+
+    def refrescar_en_segundo_plano(self, session, max_species=MAX_SPECIES_GEN7, al_terminar=None):
+        """Lanza `refrescar` en un hilo (uno a la vez); `al_terminar(ok)` se llama desde ese hilo."""
+        with self._lock:
+            if self._refrescando:
+                return False
+            self._refrescando = True
+
+        def trabajo():
+            ok = False
+            try:
+                ok = self.refrescar(session, max_species)
+            finally:
+                with self._lock:
+                    self._refrescando = False
+                if al_terminar is not None:
+                    al_terminar(ok)
+
+        threading.Thread(target=trabajo, name="species-names", daemon=True).start()
+        return True
+
+
+_indice = None
+_indice_lock = threading.Lock()
+
+
+def obtener_indice_nombres():
+    """Instancia compartida del proceso (se carga de disco la primera vez)."""
+    global _indice
+    with _indice_lock:
+        if _indice is None:
+            _indice = IndiceNombres()
+        return _indice
@@ -0,0 +1,229 @@
+"""
+Funciones puras para interpretar los JSON de PokeAPI (sin red ni UI).
+Las usan la UI, el modo consola y el compilador del pack de datos offline.
+"""
+
+STAT_NAMES_ES = {
+    "hp": "PS",
+    "attack": "Ataque",
+    "defense": "Defensa",
+    "special-attack": "At. Esp.",
+    "special-defense": "Def. Esp.",
+    "speed": "Velocidad",
+}
+
+# Grupos de versiones de Gen 7 de los que se toman los movimientos (en orden de preferencia).
+VERSION_GROUPS_GEN7 = ("ultra-sun-ultra-moon", "sun-moon")
+
+# Orden de los IDs de PokeAPI (/type/1 .. /type/18)
+TYPES = (
+    "normal", "fighting", "flying", "poison", "ground", "rock", "bug", "ghost", "steel",
+    "fire", "water", "grass", "electric", "psychic", "ice", "dragon", "dark", "fairy",
+)
+TYPE_INDEX = {name: i for i, name in enumerate(TYPES)}
+SPRITES_POKEMON = "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/"
+
+
+def extract_id_from_url(url):
+    try:
+        return int(url.rstrip("/").split("/")[-1])
+    except Exception:
+        return None
+
+
+def sprite_url(pokemon_json):
+    sprites = pokemon_json.get("sprites", {}) or {}
+    return sprites.get("front_default") or sprites.get("front_female") or ""
+
+
+def sprite_por_id(species_id):
+    """`front_default` de la forma por defecto de la especie (su ID coincide con el de la especie)."""
+    return f"{SPRITES_POKEMON}{species_id}.png"
+
+
+def format_evolution_condition(details):
+    """Normaliza evolution_details de PokeAPI a un texto legible."""
+    if not details:
+        return "Condicion especial"
+
+    # Helpers para nombres legibles
+    def norm_name(node, fallback=""):
+        if not node:
+            return fallback
+        return str(node.get("name", fallback)).replace("-", " ").title()
+
+    min_level = details.get("min_level")
+    item_name = norm_name(details.get("item"))
+    held_item = norm_name(details.get("held_item"))
+    trigger = norm_name(details.get("trigger"), "Especial")
+    min_happiness = details.get("min_happiness")
+    min_affection = details.get("min_affection")
+    min_beauty = details.get("min_beauty")
+    time_of_day = details.get("time_of_day", "")
+    known_move = norm_name(details.get("known_move"))
+    known_move_type = norm_name(details.get("known_move_type"))
+    location = norm_name(details.get("location"))
+    trade_species = norm_name(details.get("trade_species"))
+
+    # Prioridad de condiciones frecuentes
+    if min_level is not None:
+        extra = []
+        if time_of_day:
+            extra.append(f"de {time_of_day}")
+        if known_move:
+            extra.append(f"con {known_move}")
+        if location:
+            extra.append(f"en {location}")
+        return "Nivel " + str(min_level) + (f" ({', '.join(extra)})" if extra else "")
+
+    if item_name:
+        return f"Usar {item_name}"
+
+    if trigger == "Trade":
+        if held_item:
+            return f"Intercambio con {held_item}"
+        if trade_species:
+            return f"Intercambio por {trade_species}"
+        return "Intercambio"
+
+    if min_happiness is not None:
+        return f"Amistad {min_happiness}+"
+    if min_affection is not None:
+        return f"Afecto {min_affection}+"
+    if min_beauty is not None:
+        return f"Belleza {min_beauty}+"
+    if known_move:
+        return f"Conoce {known_move}"
+    if known_move_type:
+        return f"Conoce movimiento tipo {known_move_type}"
+    if location:
+        return f"Subir nivel en {location}"
+
+    return trigger
+
+
+def relaciones_de_dano(type_jsons):
+    """Debilidades, resistencias e inmunidades (agregando todos los tipos) a partir de los JSON de /type."""
+    damage_mult = {}
+    for ty in type_jsons:
+        dr = ty.get("damage_relations", {})
+        for weak in dr.get("double_damage_from", []):
+            n = weak["name"]
+            damage_mult[n] = damage_mult.get(n, 1) * 2
+        for res in dr.get("half_damage_from", []):
+            n = res["name"]
+            damage_mult[n] = damage_mult.get(n, 1) * 0.5
+        for imm in dr.get("no_damage_from", []):
+            damage_mult[imm["name"]] = 0
+    return {
+        "weaknesses": [name.capitalize() for name, mult in damage_mult.items() if mult > 1],
+        "resistances": [name.capitalize() for name, mult in damage_mult.items() if 0 < mult < 1],
+        "immunities": [name.capitalize() for name, mult in damage_mult.items() if mult == 0],
+    }
+
+
+class EntradaPokedex:
+    """
+    Ficha de Pokédex ya interpretada, lista para pintar. Es compacta (`__slots__` y tuplas) porque se
+    memoriza por especie: los movimientos vienen separados por método de aprendizaje.
+    """
+
+    __slots__ = (
+        "name", "sprite_url", "types", "height", "weight", "flavor_text", "genus", "stats", "abilities",
+        "moves_level", "moves_tm", "moves_egg", "moves_tutor", "weaknesses", "resistances", "immunities",
+    )
+
+    def __init__(self, name, sprite_url, types, height, weight, flavor_text, genus, stats, abilities,
+                 moves_level, moves_tm, moves_egg, moves_tutor, weaknesses=(), resistances=(), immunities=()):
+        self.name = name
+        self.sprite_url = sprite_url
+        self.types = tuple(types)
+        self.height = height
+        self.weight = weight
+        self.flavor_text = flavor_text
+        self.genus = genus
+        self.stats = tuple(stats)
+        self.abilities = tuple(abilities)
+        self.moves_level = tuple(moves_level)
+        self.moves_tm = tuple(moves_tm)
+        self.moves_egg = tuple(moves_egg)
+        self.moves_tutor = tuple(moves_tutor)
+        self.weaknesses = tuple(weaknesses)
+        self.resistances = tuple(resistances)
+        self.immunities = tuple(immunities)
+
+
+def parse_info_pokedex(pok, sp):
+    """Ficha de Pokédex (sin relaciones de daño) a partir de /pokemon y /pokemon-species."""
+    types = [t["type"]["name"] for t in pok.get("types", [])]
+
+    # Stats base
+    stats = []
+    for s in pok.get("stats", []):
+        name = s["stat"]["name"]
+        stats.append((STAT_NAMES_ES.get(name, name), s["base_stat"]))
+
+    # Habilidades
+    abilities = []
+    for a in pok.get("abilities", []):
+        name = a["ability"]["name"].replace("-", " ").title()
+        if a.get("is_hidden"):
+            name += " (oculta)"
+        abilities.append(name)
+
+    # Movimientos que puede aprender (Gen 7: ultra-sun-ultra-moon o sun-moon)
+    moves_level = []
+    moves_tm = []
+    moves_egg = []
+    moves_tutor = []
+    for m in pok.get("moves", []):
+        move_name = m["move"]["name"].replace("-", " ").title()
+        for vg in m.get("version_group_details", []):
+            if vg.get("version_group", {}).get("name") in VERSION_GROUPS_GEN7:
+                method = vg.get("move_learn_method", {}).get("name", "")
+                level = vg.get("level_learned_at", 0)
+                if method == "level-up":
+                    moves_level.append((level, move_name))
+                elif method == "machine":
+                    moves_tm.append(move_name)
+                elif method == "egg":
+                    moves_egg.append(move_name)
+                elif method == "tutor":
+                    moves_tutor.append(move_name)
+                break
+    moves_level.sort(key=lambda x: x[0])
+    moves_tm = list(dict.fromkeys(moves_tm))
+    moves_egg = list(dict.fromkeys(moves_egg))
+    moves_tutor = list(dict.fromkeys(moves_tutor))
+
+    # Descripción y género en español
+    flavor = ""
+    for e in sp.get("flavor_text_entries", []):
+        if e.get("language", {}).get("name") == "es":
+            flavor = e.get("flavor_text", "").replace("\n", " ")
+            break
+    if not flavor and sp.get("flavor_text_entries"):
+        flavor = sp["flavor_text_entries"][0].get("flavor_text", "").replace("\n", " ")
+    genus = ""
+    for g in sp.get("genera", []):
+        if g.get("language", {}).get("name") == "es":
+            genus = g.get("genus", "")
+            break
+    if not genus and sp.get("genera"):
+        genus = sp["genera"][0].get("genus", "")
+
+    return {
+        "name": pok["name"].capitalize(),
+        "sprite_url": sprite_url(pok),
+        "types": [t.capitalize() for t in types],
+        "height": pok.get("height", 0) / 10.0,
+        "weight": pok.get("weight", 0) / 10.0,
+        "flavor_text": flavor,
+        "genus": genus,
+        "stats": stats,
+        "abilities": abilities,
+        "moves_level": moves_level,
+        "moves_tm": moves_tm,
+        "moves_egg": moves_egg,
+        "moves_tutor": moves_tutor,
+    }
@@ -0,0 +1,521 @@
+"""
+Lector nativo (Python + NumPy) del save `main` de Sol/Luna y Ultra Sol/Ultra Luna.
+
+Descifra y reordena los PK7 del equipo y de las cajas de forma vectorizada sobre una vista
+mapeada en memoria del archivo, y devuelve el mismo dict que el wrapper PokeLastCatch
+(`Trainer`, `Pokedex`, `Party`, `Last`; visto/capturado como `BitsetEspecies`, igual que el wrapper
+con `bits`). Lo que no se puede decodificar aquí se pide al wrapper.
+
+`inventario_cajas` da las 32 cajas completas como `InventarioCajas`; el nivel de los Pokémon en
+caja (que el save no guarda) se calcula con su EXP y el ritmo de crecimiento de la especie.
+"""
+import datetime
+import hashlib
+import mmap
+import os
+
+import numpy as np
+
+import trazas
+from gamedata_pack import GROWTH_RATES
+from indice_pokedex import BitsetEspecies
+from inventario_cajas import InventarioCajas
+
+# Tamaños de save reconocidos -> (juego, especie máxima)
+SAVE_SIZES = {
+    0x6BE00: ("SM", 802),
+    0x6CC00: ("USUM", 807),
+}
+
+SIZE_PK7 = 0xE8
+SIZE_PK7_PARTY = 0x104
+PARTY_SLOTS = 6
+BOX_COUNT = 32
+BOX_SLOTS = 30
+
+ZUKAN_MAGIC = 0x2F120F17
+ZUKAN_OFS_CAUGHT = 0x88
+ZUKAN_OFS_SEEN = 0xF0
+ZUKAN_SEEN_SIZE = 0x8C
+
+# Los offsets de los bloques salen de la tabla BlockInfo del final del propio save (como en PKHeX):
+# la magia "BEEF" a 0x1F0 del final y tras ella una entrada de 8 bytes por bloque (tamaño u32, id u16,
+# checksum u16). Los bloques van seguidos desde el offset 0, cada uno alineado a 0x200.
+INFO_DESDE_FIN = 0x1F0
+INFO_MAGIA = 0x42454546
+ALINEACION_BLOQUES = 0x200
+# Bloques que usamos -> número de bloque en PKHeX (SaveBlockAccessor7SM / SaveBlockAccessor7USUM).
+NUM_BLOQUES = {"status": 3, "party": 4, "zukan": 6, "misc": 9, "boxes": 14, "time": 16}
+# Bytes que se leen de cada bloque (desde su inicio).
+REGIONES = {
+    "status": 0xC0,
+    "party": PARTY_SLOTS * SIZE_PK7_PARTY + 4,
+    "zukan": ZUKAN_OFS_SEEN + 4 * ZUKAN_SEEN_SIZE,
+    "misc": 0x10,
+    "time": 4,
+    "boxes": BOX_COUNT * BOX_SLOTS * SIZE_PK7,
+}
+
+
+def juego_de(size):
+    """"SM" o "USUM" según el tamaño del save; SaveNoSoportado si no se reconoce."""
+    if size not in SAVE_SIZES:
+        raise SaveNoSoportado(f"Tamaño de save no reconocido: 0x{size:X}")
+    return SAVE_SIZES[size][0]
+
+
+# Game ID (MyStatus + 0x04) -> nombre de GameVersion en PKHeX
+GAME_VERSIONS = {30: "SN", 31: "MN", 32: "US", 33: "UM"}
+
+# Orden de bloques A/B/C/D según (EC >> 13) & 31 (igual que PKHeX; 24-31 repiten 0-7)
+_BLOCK_POSITION = np.array(
+    [
+        [0, 1, 2, 3], [0, 1, 3, 2], [0, 2, 1, 3], [0, 3, 1, 2],
+        [0, 2, 3, 1], [0, 3, 2, 1], [1, 0, 2, 3], [1, 0, 3, 2],
+        [2, 0, 1, 3], [3, 0, 1, 2], [2, 0, 3, 1], [3, 0, 2, 1],
+        [1, 2, 0, 3], [1, 3, 0, 2], [2, 1, 0, 3], [3, 1, 0, 2],
+        [2, 3, 0, 1], [3, 2, 0, 1], [1, 2, 3, 0], [1, 3, 2, 0],
+        [2, 1, 3, 0], [3, 1, 2, 0], [2, 3, 1, 0], [3, 2, 1, 0],
+        [0, 1, 2, 3], [0, 1, 3, 2], [0, 2, 1, 3], [0, 3, 1, 2],
+        [0, 2, 3, 1], [0, 3, 2, 1], [1, 0, 2, 3], [1, 0, 3, 2],
+    ],
+    dtype=np.intp,
+)
+
+
+def _lcg_coeficientes(n):
+    """Coeficientes (A_k, C_k) tales que seed_k = A_k * EC + C_k (mod 2^32) para k = 1..n."""
+    a, c = 1, 0
+    coef_a, coef_c = [], []
+    for _ in range(n):
+        a = (a * 0x41C64E6D) & 0xFFFFFFFF
+        c = (c * 0x41C64E6D + 0x6073) & 0xFFFFFFFF
+        coef_a.append(a)
+        coef_c.append(c)
+    return np.array(coef_a, dtype=np.uint32), np.array(coef_c, dtype=np.uint32)
+
+
+_WORDS_BLOQUES = (SIZE_PK7 - 8) // 2
+_LCG_A, _LCG_C = _lcg_coeficientes(_WORDS_BLOQUES)
+
+
+def _exp_nivel(ritmo, n):
+    """EXP mínima del nivel `n` con el ritmo de crecimiento `ritmo` (nombres de PokeAPI)."""
+    if n == 1:
+        return 0
+    if ritmo == "slow":
+        return 5 * n ** 3 // 4
+    if ritmo == "medium":
+        return n ** 3
+    if ritmo == "fast":
+        return 4 * n ** 3 // 5
+    if ritmo == "medium-slow":
+        return 6 * n ** 3 // 5 - 15 * n ** 2 + 100 * n - 140
+    if ritmo == "slow-then-very-fast":
+        if n < 50:
+            return n ** 3 * (100 - n) // 50
+        if n < 68:
+            return n ** 3 * (150 - n) // 100
+        if n < 98:
+            return n ** 3 * ((1911 - 10 * n) // 3) // 500
+        return n ** 3 * (160 - n) // 100
+    # fast-then-very-slow
+    if n < 15:
+        return n ** 3 * ((n + 1) // 3 + 24) // 50
+    if n < 36:
+        return n ** 3 * (n + 14) // 50
+    return n ** 3 * (n // 2 + 32) // 50
+
+
+# Fila = ritmo (orden de gamedata_pack.GROWTH_RATES), columna = EXP mínima de los niveles 1..100.
+_EXP_POR_NIVEL = np.array([[_exp_nivel(ritmo, n) for n in range(1, 101)] for ritmo in GROWTH_RATES], dtype=np.uint32)
+
+
+class SaveNoSoportado(Exception):
+    """El archivo no es un save Gen 7 que este lector sepa decodificar."""
+
+
+def descifrar_pk7(raw):
+    """
+    Descifra y reordena N Pokémon a la vez.
+    `raw` es un array uint8 de forma (N, 0xE8) o (N, 0x104); devuelve (datos, checksum_ok).
+    """
+    n, size = raw.shape
+    words = raw.copy().view("<u2")
+    ec = raw[:, 0:4].copy().view("<u4").reshape(n)
+
+    # Flujo de claves del LCG para todas las filas en una sola operación.
+    keystream = ((ec[:, None] * _LCG_A[None, :] + _LCG_C[None, :]) >> 16).astype(np.uint16)
+    words[:, 4:4 + _WORDS_BLOQUES] ^= keystream
+    if size > SIZE_PK7:
+        # Las stats de equipo se cifran aparte, reiniciando la semilla con el EC.
+        extra = (size - SIZE_PK7) // 2
+        words[:, 4 + _WORDS_BLOQUES:] ^= keystream[:, :extra]
+
+    bloques = words[:, 4:4 + _WORDS_BLOQUES].reshape(n, 4, _WORDS_BLOQUES // 4)
+    orden = _BLOCK_POSITION[(ec >> 13) & 31]
+    words[:, 4:4 + _WORDS_BLOQUES] = np.take_along_axis(bloques, orden[:, :, None], axis=1).reshape(n, -1)
+
+    checksum = words[:, 4:4 + _WORDS_BLOQUES].sum(axis=1, dtype=np.uint32) & 0xFFFF
+    return words.view(np.uint8), checksum == words[:, 3]
+
+
+def _u16(datos, ofs):
+    return int(datos[ofs]) | (int(datos[ofs + 1]) << 8)
+
+
+def _u32(datos, ofs):
+    return _u16(datos, ofs) | (_u16(datos, ofs + 2) << 16)
+
+
+def _texto(datos, ofs, size=0x1A):
+    """Cadena UTF-16LE terminada en 0 (con los símbolos de género propios de Gen 7)."""
+    texto = bytes(datos[ofs:ofs + size]).decode("utf-16-le", errors="replace")
+    texto = texto.split("\x00", 1)[0]
+    return texto.replace("\uE08E", "♂").replace("\uE08F", "♀")
+
+
+def _fecha(anio, mes, dia):
+    try:
+        return datetime.date(2000 + int(anio), int(mes), int(dia))
+    except ValueError:
+        return None
+
+
+def _amistad(pk):
+    # CurrentHandler = 0 -> entrenador original; 1 -> último entrenador
+    return int(pk[0xCA]) if pk[0x93] == 0 else int(pk[0xA2])
+
+
+def bloques_save(info, size):
+    """
+    {bloque: (offset, tamaño)} de los bloques de NUM_BLOQUES según la tabla BlockInfo del save.
+    `info` son los últimos INFO_DESDE_FIN bytes del archivo (copiados, no una vista del mapeo).
+    """
+    inicio = size - INFO_DESDE_FIN
+    if inicio < 0 or len(info) != INFO_DESDE_FIN or _u32(info, 0) != INFO_MAGIA:
+        raise SaveNoSoportado("Tabla de bloques (BlockInfo) no encontrada")
+    posiciones = []
+    ofs = 0
+    for i in range(max(NUM_BLOQUES.values()) + 1):
+        entrada = 4 + 8 * i
+        if _u16(info, entrada + 4) != i:
+            raise SaveNoSoportado(f"Tabla de bloques (BlockInfo) inválida en el bloque {i}")
+        largo = _u32(info, entrada)
+        posiciones.append((ofs, largo))
+        ofs = -(-(ofs + largo) // ALINEACION_BLOQUES) * ALINEACION_BLOQUES
+    bloques = {nombre: posiciones[i] for nombre, i in NUM_BLOQUES.items()}
+    for nombre, largo in REGIONES.items():
+        ofs, tam = bloques[nombre]
+        if tam < largo or ofs + tam > inicio:
+            raise SaveNoSoportado(f"Bloque {nombre} fuera de lugar en la tabla BlockInfo")
+    return bloques
+
+
+def _leer_regiones(ruta_save):
+    """Copia las regiones necesarias desde una vista mapeada en memoria del save."""
+    with open(ruta_save, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        juego_de(size)
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            bloques = bloques_save(mm[size - INFO_DESDE_FIN:], size)
+            vista = np.frombuffer(mm, dtype=np.uint8)
+            regiones = {"size": size}
+            for nombre, largo in REGIONES.items():
+                ofs = bloques[nombre][0]
+                regiones[nombre] = vista[ofs:ofs + largo].copy()
+            # La vista debe soltarse antes de cerrar el mapeo.
+            del vista
+    return regiones
+
+
+def _secciones(bloques):
+    """Secciones del save que usa el HUD -> rangos (offset, tamaño) leídos de cada bloque."""
+    rango = {nombre: (bloques[nombre][0], largo) for nombre, largo in REGIONES.items()}
+    return {
+        "trainer": (rango["status"], rango["misc"]),
+        "time": (rango["time"],),
+        "party": (rango["party"],),
+        "dex": (rango["zukan"],),
+        "boxes": (rango["boxes"],),
+    }
+
+
+# Secciones que vigila el detector; lo que queda fuera (opciones, objetos, etc.) no afecta a ningún panel.
+NOMBRES_SECCIONES = ("trainer", "time", "party", "dex", "boxes")
+
+
+def huellas_secciones(ruta_save):
+    """Hash por sección calculado directamente sobre el mapeo del archivo (sin copiar ni descifrar)."""
+    with open(ruta_save, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        juego_de(size)
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Mismos offsets que el lector: de la tabla BlockInfo del propio save.
+            secciones = _secciones(bloques_save(mm[size - INFO_DESDE_FIN:], size))
+            vista = memoryview(mm)
+            try:
+                huellas = {"size": size}
+                for nombre, rangos in secciones.items():
+                    h = hashlib.blake2b(digest_size=16)
+                    for ofs, largo in rangos:
+                        h.update(vista[ofs:ofs + largo])
+                    huellas[nombre] = h.digest()
+            finally:
+                vista.release()
+    return huellas
+
+
+class DetectorCambios:
+    """
+    Recuerda las huellas del último save procesado y dice qué secciones cambiaron desde entonces.
+    `cambios()` devuelve un set (vacío si no se movió nada relevante) o None si no se puede saber.
+    """
+
+    def __init__(self):
+        self._huellas = None
+
+    def cambios(self, ruta_save):
+        try:
+            huellas = huellas_secciones(ruta_save)
+        except (SaveNoSoportado, OSError, ValueError):
+            self._huellas = None
+            return None
+        anteriores, self._huellas = self._huellas, huellas
+        if anteriores is None or anteriores["size"] != huellas["size"]:
+            return set(NOMBRES_SECCIONES)
+        return {nombre for nombre in NOMBRES_SECCIONES if anteriores[nombre] != huellas[nombre]}
+
+    def olvidar(self):
+        """El refresco falló: la próxima llamada vuelve a tratar todo como cambiado."""
+        self._huellas = None
+
+
+def _descifrar_cajas(regiones):
+    """
+    (pk, checksum_ok, especie) de todos los slots de las cajas. El bloque ya viene validado por la tabla
+    BlockInfo; un slot que no pasa su checksum (corrupto) solo se descarta, no manda el save al wrapper.
+    """
+    boxes_pk, boxes_ok = descifrar_pk7(regiones["boxes"].reshape(BOX_COUNT * BOX_SLOTS, SIZE_PK7))
+    especie = boxes_pk[:, 0x08].astype(np.uint16) | (boxes_pk[:, 0x09].astype(np.uint16) << 8)
+    return boxes_pk, boxes_ok, especie
+
+
+def _decodificar(ruta_save):
+    """Devuelve (datos, pk_last, last_en_equipo) o lanza SaveNoSoportado."""
+    regiones = _leer_regiones(ruta_save)
+    _, max_species = SAVE_SIZES[regiones["size"]]
+
+    # Entrenador
+    status = regiones["status"]
+    misc = regiones["misc"]
+    tiempo = regiones["time"]
+    trainer = {
+        "Name": _texto(status, 0x38),
+        "TID": _u16(status, 0x00),
+        "SID": _u16(status, 0x02),
+        "Money": _u32(misc, 0x04),
+        "PlayTime": f"{_u16(tiempo, 0)}ː{int(tiempo[2]):02d}ː{int(tiempo[3]):02d}",
+        "GameVersion": GAME_VERSIONS.get(int(status[0x04]), "Invalid"),
+        "Generation": 7,
+    }
+
+    # Pokédex: 1 bit por especie; "visto" es cualquiera de las 4 regiones (macho/hembra/shiny).
+    zukan = regiones["zukan"]
+    if _u32(zukan, 0) != ZUKAN_MAGIC:
+        raise SaveNoSoportado("Bloque de Pokédex no reconocido")
+    # Directo a bitsets (bit i = especie i): el bit 0 del save es la especie 1, de ahí el desplazamiento.
+    mascara = (1 << (max_species + 1)) - 2
+    seen_regiones = zukan[ZUKAN_OFS_SEEN:ZUKAN_OFS_SEEN + 4 * ZUKAN_SEEN_SIZE].reshape(4, ZUKAN_SEEN_SIZE)
+    seen = BitsetEspecies(
+        (int.from_bytes(np.bitwise_or.reduce(seen_regiones, axis=0).tobytes(), "little") << 1) & mascara
+    )
+    caught = BitsetEspecies(
+        (int.from_bytes(zukan[ZUKAN_OFS_CAUGHT:ZUKAN_OFS_CAUGHT + 0x68].tobytes(), "little") << 1) & mascara
+    )
+    pokedex = {
+        "Enabled": True,
+        "Seen": len(seen),
+        "Caught": len(caught),
+        "MaxSpecies": max_species,
+        "SeenPercent": round(len(seen) * 100.0 / max_species, 2),
+        "CaughtPercent": round(len(caught) * 100.0 / max_species, 2),
+        "SeenBits": seen,
+        "CaughtBits": caught,
+    }
+
+    # Equipo
+    party_raw = regiones["party"]
+    party_count = int(party_raw[PARTY_SLOTS * SIZE_PK7_PARTY])
+    if party_count > PARTY_SLOTS:
+        raise SaveNoSoportado("Número de Pokémon en el equipo inválido")
+    party_pk, party_ok = descifrar_pk7(party_raw[:PARTY_SLOTS * SIZE_PK7_PARTY].reshape(PARTY_SLOTS, SIZE_PK7_PARTY))
+
+    party = []
+    candidatos = []
+    for i in range(party_count):
+        pk = party_pk[i]
+        species = _u16(pk, 0x08)
+        if species == 0:
+            continue
+        if not party_ok[i]:
+            raise SaveNoSoportado(f"Checksum inválido en el equipo (slot {i + 1})")
+        met = _fecha(pk[0xD4], pk[0xD5], pk[0xD6])
+        party.append({
+            "SpeciesId": species,
+            "Species": str(species),
+            "Nickname": _texto(pk, 0x40),
+            "MetDate": met.strftime("%Y-%m-%dT00:00:00") if met else None,
+            "Level": int(pk[0xEC]),
+            "OT": _texto(pk, 0xB0),
+            "EncounterType": 0,
+            "MetLocation": _u16(pk, 0xDA),
+            "EggLocation": _u16(pk, 0xD8),
+            "Ball": int(pk[0xDC]),
+            "IsEgg": bool((_u32(pk, 0x74) >> 30) & 1),
+            "Friendship": _amistad(pk),
+        })
+        if met:
+            candidatos.append((met, pk, True))
+
+    # Cajas: solo interesa el Pokémon con la fecha de captura más reciente.
+    boxes_pk, boxes_ok, species_box = _descifrar_cajas(regiones)
+    validos = boxes_ok & (species_box != 0)
+    # Fecha como entero AAMMDD para ordenar sin crear objetos por slot.
+    clave_fecha = (
+        boxes_pk[:, 0xD4].astype(np.int32) * 10000
+        + boxes_pk[:, 0xD5].astype(np.int32) * 100
+        + boxes_pk[:, 0xD6].astype(np.int32)
+    )
+    for idx in np.flatnonzero(validos)[np.argsort(-clave_fecha[validos], kind="stable")]:
+        pk = boxes_pk[idx]
+        met = _fecha(pk[0xD4], pk[0xD5], pk[0xD6])
+        if met:
+            candidatos.append((met, pk, False))
+            break
+
+    if not candidatos:
+        return {}, None, False
+
+    # Igual que el wrapper: gana la fecha mayor y, en empate, el primero recorrido (equipo antes que cajas).
+    met, pk_last, en_equipo = candidatos[0]
+    for cand in candidatos[1:]:
+        if cand[0] > met:
+            met, pk_last, en_equipo = cand
+
+    species = _u16(pk_last, 0x08)
+    last = {
+        "SpeciesId": species,
+        "Species": str(species),
+        "Nickname": _texto(pk_last, 0x40),
+        "MetDate": met.strftime("%Y-%m-%d"),
+        # En cajas no se guarda el nivel (depende de la curva de EXP de la especie).
+        "Level": int(pk_last[0xEC]) if en_equipo else None,
+        "OT": _texto(pk_last, 0xB0),
+        "Friendship": _amistad(pk_last),
+    }
+    datos = {"Trainer": trainer, "Pokedex": pokedex, "Last": last, "Party": party}
+    return datos, pk_last, en_equipo
+
+
+def inventario_cajas(ruta_save, crecimiento=None):
+    """
+    Slots ocupados de todas las cajas, descifrados de una vez. `crecimiento(species_id)` da el ritmo
+    de crecimiento de la especie (p. ej. `pack.growth_rate`); sin él, el nivel queda desconocido.
+    Mote, entrenador y lugar de captura se decodifican solo para las filas que se piden.
+    """
+    boxes_pk, boxes_ok, species_box = _descifrar_cajas(_leer_regiones(ruta_save))
+    filas = np.flatnonzero(boxes_ok & (species_box != 0))
+    pk = boxes_pk[filas]
+    especie = species_box[filas]
+
+    # Nivel = cuántos umbrales de EXP de su ritmo alcanza; un ritmo por especie distinta, no por slot.
+    nivel = np.zeros(len(filas), dtype=np.uint8)
+    if crecimiento is not None and len(filas):
+        unicas, por_fila = np.unique(especie, return_inverse=True)
+        ritmos = np.array(
+            [GROWTH_RATES.index(r) if r in GROWTH_RATES else -1 for r in (crecimiento(int(s)) for s in unicas)],
+            dtype=np.intp,
+        )[por_fila]
+        conocido = ritmos >= 0
+        exp = pk[:, 0x10:0x14].copy().view("<u4").reshape(-1)
+        nivel[conocido] = (exp[conocido, None] >= _EXP_POR_NIVEL[ritmos[conocido]]).sum(axis=1)
+
+    anio, mes, dia = (pk[:, ofs].astype(np.uint32) for ofs in (0xD4, 0xD5, 0xD6))
+    valida = (mes >= 1) & (mes <= 12) & (dia >= 1) & (dia <= 31)
+    fecha = np.where(valida, (2000 + anio) * 10000 + mes * 100 + dia, 0)
+    huevo = (pk[:, 0x74:0x78].copy().view("<u4").reshape(-1) >> 30) & 1
+
+    columnas = {
+        "caja": (filas // BOX_SLOTS + 1).tolist(),
+        "slot": (filas % BOX_SLOTS + 1).tolist(),
+        "especie": especie.tolist(),
+        "nivel": nivel.tolist(),
+        "ball": pk[:, 0xDC].tolist(),
+        "fecha": fecha.tolist(),
+        "huevo": huevo.tolist(),
+    }
+
+    def detalle(i):
+        fila = pk[i]
+        return {
+            "Species": str(int(especie[i])),
+            "Nickname": _texto(fila, 0x40),
+            "OT": _texto(fila, 0xB0),
+            "MetLocation": _u16(fila, 0xDA),
+        }
+
+    return InventarioCajas(columnas, detalle)
+
+
+def leer_cajas(ruta_save, fallback, crecimiento=None):
+    """Como `leer_save`: inventario nativo y, si el save no se reconoce, `fallback(ruta_save)` (registros del wrapper)."""
+    with trazas.tramo("cajas.decodificar") as tramo:
+        try:
+            return inventario_cajas(ruta_save, crecimiento)
+        except (SaveNoSoportado, OSError, ValueError) as ex:
+            # En la traza queda por qué se fue al wrapper.
+            tramo.set(wrapper=str(ex) or type(ex).__name__)
+    return InventarioCajas.desde_registros(fallback(ruta_save))
+
+
+def decodificar_save(ruta_save):
+    """Decodifica el save sin .NET. `Last.Level` es None si el último capturado está en una caja."""
+    return _decodificar(ruta_save)[0]
+
+
+# (EC, EXP, fecha) del último capturado -> "Last" obtenido del wrapper
+_last_wrapper_cache = {}
+
+
+def leer_save(ruta_save, fallback):
+    """
+    Ruta rápida para el HUD: decodifica en Python y solo llama a `fallback(ruta_save)`
+    (el wrapper) para lo que no puede resolver aquí.
+    """
+    with trazas.tramo("save.decodificar") as tramo:
+        try:
+            datos, pk_last, en_equipo = _decodificar(ruta_save)
+        except (SaveNoSoportado, OSError, ValueError) as ex:
+            tramo.set(wrapper=str(ex) or type(ex).__name__)
+            datos = None
+    if datos is None:
+        return fallback(ruta_save)
+
+    last = datos.get("Last")
+    if last and not en_equipo:
+        clave = (_u32(pk_last, 0x00), _u32(pk_last, 0x10), last["MetDate"])
+        last_wrapper = _last_wrapper_cache.get(clave)
+        if last_wrapper is None:
+            try:
+                last_wrapper = (fallback(ruta_save) or {}).get("Last")
+            except Exception:
+                last_wrapper = None
+            if last_wrapper:
+                _last_wrapper_cache.clear()
+                _last_wrapper_cache[clave] = last_wrapper
+        if last_wrapper:
+            datos["Last"] = last_wrapper
+        else:
+            last["Level"] = "?"
+    return datos
@@ -0,0 +1,295 @@
+"""
+Vigilancia de uno o varios archivos de save con backends intercambiables.
+
+- `WatcherInotify` (Linux): inotify sobre los directorios de los saves; reacciona a cierre-tras-escritura
+  y a renombrados (guardado atómico). Sin eventos el hilo queda bloqueado en `select`: 0% CPU en reposo.
+- `WatcherPolling`: `os.stat` periódico; es el respaldo en cualquier otro sistema.
+
+Un solo hilo vigila todas las rutas. Cada ruta agrupa sus ráfagas de escritura en una sola recarga:
+tras el último evento se espera una ventana de calma que se adapta a los huecos observados dentro de
+las ráfagas anteriores de ese mismo save. Los callbacks reciben la ruta y se llaman desde el hilo del watcher.
+"""
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+import trazas
+
+POLL_SECONDS = 1.0
+# Sondeo rápido mientras hay una ráfaga en curso (solo backend de polling).
+POLL_RAFAGA_SECONDS = 0.05
+# Ventana de calma adaptativa: nunca menor que el mínimo ni mayor que el máximo.
+DEBOUNCE_MIN_SECONDS = 0.05
+DEBOUNCE_MAX_SECONDS = 0.6
+# Si el emulador escribe sin parar, se recarga igualmente pasado este tiempo.
+COALESCE_MAX_SECONDS = 2.0
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENTO = struct.Struct("iIII")
+
+
+def firma_archivo(ruta, anterior=None):
+    """
+    (mtime_ns, tamaño) del archivo o None si no existe. Si no se puede consultar por otra causa
+    (permisos, disco de red caído...) devuelve `anterior`: cuenta como que no cambió.
+    """
+    try:
+        st = os.stat(ruta)
+    except FileNotFoundError:
+        return None
+    except OSError:
+        return anterior
+    return (st.st_mtime_ns, st.st_size)
+
+
+def falta_archivo(ruta):
+    """True solo si el archivo no existe; un error al consultarlo no cuenta como falta."""
+    return firma_archivo(ruta, anterior=False) is None
+
+
+class Rafaga:
+    """Estado de agrupación de una ruta."""
+
+    __slots__ = ("ventana", "inicio", "ultimo", "max_hueco")
+
+    def __init__(self):
+        self.ventana = DEBOUNCE_MIN_SECONDS
+        self.inicio = None
+        self.ultimo = None
+        self.max_hueco = 0.0
+
+
+class SaveWatcher:
+    """
+    Base común: hilo, parada y agrupación adaptativa de eventos por ruta. Cada backend define
+    `_bucle()`, que vigila hasta que se pida parar.
+    """
+
+    nombre = "base"
+
+    def __init__(self, rutas, al_cambiar, al_faltar=None, al_error=None):
+        """
+        `rutas`: una ruta o varias; `al_cambiar(ruta)` y `al_faltar(ruta)`. `al_error(ex)` recibe los
+        fallos de cada vuelta del bucle (callbacks, lectura de eventos) sin que el hilo deje de vigilar.
+        """
+        self.rutas = [rutas] if isinstance(rutas, str) else list(dict.fromkeys(rutas))
+        self.al_cambiar = al_cambiar
+        self.al_faltar = al_faltar
+        self.al_error = al_error
+        self.stats = {"eventos": 0, "recargas": 0}
+        self._rafagas = {ruta: Rafaga() for ruta in self.rutas}
+        self._parar = threading.Event()
+        self._hilo = None
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._ejecutar, name=f"save-watcher-{self.nombre}", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._parar.set()
+
+    def _ejecutar(self):
+        try:
+            self._bucle()
+        except Exception as ex:
+            self._reportar(ex)
+
+    def _reportar(self, ex):
+        """Avisa de un fallo por `al_error`; los bucles lo usan por vuelta y siguen vigilando."""
+        if self.al_error is None:
+            return
+        try:
+            self.al_error(ex)
+        except Exception:
+            pass
+
+    def _avisar_faltantes(self):
+        if self.al_faltar is None:
+            return
+        for ruta in self.rutas:
+            if falta_archivo(ruta):
+                self.al_faltar(ruta)
+
+    # --- agrupación de ráfagas ---
+
+    def _registrar_evento(self, ruta, ahora):
+        self.stats["eventos"] += 1
+        r = self._rafagas[ruta]
+        if r.inicio is None:
+            r.inicio = ahora
+            r.max_hueco = 0.0
+        else:
+            r.max_hueco = max(r.max_hueco, ahora - r.ultimo)
+        r.ultimo = ahora
+
+    def _en_rafaga(self):
+        return any(r.inicio is not None for r in self._rafagas.values())
+
+    def _espera_pendiente(self, ahora):
+        """Segundos hasta que toque recargar alguna ruta, o None si no hay ráfagas pendientes."""
+        espera = None
+        for r in self._rafagas.values():
+            if r.inicio is None:
+                continue
+            fin = min(r.ultimo + r.ventana, r.inicio + COALESCE_MAX_SECONDS)
+            espera = fin - ahora if espera is None else min(espera, fin - ahora)
+        return None if espera is None else max(0.0, espera)
+
+    def _disparar_si_toca(self, ahora):
+        for ruta, r in self._rafagas.items():
+            if r.inicio is None or min(r.ultimo + r.ventana, r.inicio + COALESCE_MAX_SECONDS) > ahora:
+                continue
+            # La siguiente ventana se ajusta al mayor hueco visto dentro de esta ráfaga (con margen).
+            objetivo = min(max(r.max_hueco * 2, DEBOUNCE_MIN_SECONDS), DEBOUNCE_MAX_SECONDS)
+            # `rafaga_ms`: desde el primer evento de la ráfaga hasta ahora (lo que añadió la agrupación).
+            rafaga_ms = round((ahora - r.inicio) * 1000, 1)
+            r.ventana = 0.5 * r.ventana + 0.5 * objetivo
+            r.inicio = None
+            r.ultimo = None
+            try:
+                with trazas.tramo("watcher.disparo", backend=self.nombre, ruta=ruta, rafaga_ms=rafaga_ms) as tramo:
+                    if falta_archivo(ruta):
+                        tramo.set(falta=True)
+                        if self.al_faltar is not None:
+                            self.al_faltar(ruta)
+                        continue
+                    self.stats["recargas"] += 1
+                    self.al_cambiar(ruta)
+            except Exception:
+                # La recarga no se pierde: la ráfaga queda armada de nuevo y se reintenta tras la pausa de error.
+                r.inicio = r.ultimo = ahora
+                raise
+
+
+class WatcherPolling(SaveWatcher):
+    nombre = "polling"
+
+    def __init__(self, rutas, al_cambiar, al_faltar=None, al_error=None, intervalo=POLL_SECONDS):
+        super().__init__(rutas, al_cambiar, al_faltar, al_error)
+        self.intervalo = intervalo
+
+    def _bucle(self):
+        firmas = {ruta: firma_archivo(ruta) for ruta in self.rutas}
+        self._avisar_faltantes()
+        espera = self.intervalo
+        while not self._parar.wait(espera):
+            try:
+                ahora = time.monotonic()
+                for ruta, firma in firmas.items():
+                    nueva = firma_archivo(ruta, firma)
+                    if nueva != firma:
+                        firmas[ruta] = nueva
+                        self._registrar_evento(ruta, ahora)
+                self._disparar_si_toca(ahora)
+            except Exception as ex:
+                self._reportar(ex)
+                # Como en inotify: tras un fallo se espera un intervalo normal antes del reintento.
+                espera = self.intervalo
+                continue
+            espera = POLL_RAFAGA_SECONDS if self._en_rafaga() else self.intervalo
+
+
+class WatcherInotify(SaveWatcher):
+    nombre = "inotify"
+
+    def __init__(self, rutas, al_cambiar, al_faltar=None, al_error=None):
+        import ctypes
+
+        super().__init__(rutas, al_cambiar, al_faltar, al_error)
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+        # IN_ATTRIB cubre cambios de mtime sin escritura (p. ej. `touch`), como hacía la firma por `os.stat`.
+        mascara = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+        # Un watch por directorio (varios saves pueden compartirlo): wd -> {nombre de archivo: ruta}.
+        self._por_wd = {}
+        wd_de = {}
+        for ruta in self.rutas:
+            directorio = os.path.dirname(os.path.abspath(ruta))
+            if directorio not in wd_de:
+                wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directorio), mascara)
+                if wd < 0:
+                    err = ctypes.get_errno()
+                    os.close(self._fd)
+                    raise OSError(err, f"inotify_add_watch falló en {directorio}")
+                wd_de[directorio] = wd
+            self._por_wd.setdefault(wd_de[directorio], {})[os.fsencode(os.path.basename(ruta))] = ruta
+        # Tubería para despertar al `select` al detener.
+        self._despertar_r, self._despertar_w = os.pipe()
+
+    def detener(self):
+        super().detener()
+        try:
+            os.write(self._despertar_w, b"x")
+            os.close(self._despertar_w)
+        except OSError:
+            pass
+
+    def _leer_eventos(self):
+        """Rutas vigiladas afectadas por los eventos leídos (todas si la cola se desbordó)."""
+        try:
+            buf = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        rutas = []
+        pos = 0
+        while pos + _EVENTO.size <= len(buf):
+            wd, mascara, _cookie, largo = _EVENTO.unpack_from(buf, pos)
+            nombre = buf[pos + _EVENTO.size : pos + _EVENTO.size + largo].rstrip(b"\0")
+            pos += _EVENTO.size + largo
+            if mascara & IN_Q_OVERFLOW:
+                rutas.extend(self.rutas)
+                continue
+            ruta = self._por_wd.get(wd, {}).get(nombre)
+            if ruta is not None:
+                rutas.append(ruta)
+        return rutas
+
+    def _bucle(self):
+        self._avisar_faltantes()
+        try:
+            while not self._parar.is_set():
+                try:
+                    listos, _, _ = select.select(
+                        [self._fd, self._despertar_r], [], [], self._espera_pendiente(time.monotonic())
+                    )
+                    if self._despertar_r in listos:
+                        break
+                    ahora = time.monotonic()
+                    if self._fd in listos:
+                        # Un borrado seguido del renombrado del guardado atómico cae en la misma ráfaga.
+                        for ruta in self._leer_eventos():
+                            self._registrar_evento(ruta, ahora)
+                    self._disparar_si_toca(ahora)
+                except Exception as ex:
+                    self._reportar(ex)
+                    # Sin esta pausa un fallo persistente (p. ej. del propio `select`) giraría sin parar.
+                    self._parar.wait(POLL_SECONDS)
+        finally:
+            for fd in (self._fd, self._despertar_r):
+                os.close(fd)
+
+
+def crear_watcher(rutas, al_cambiar, al_faltar=None, al_error=None):
+    """inotify si el sistema lo permite; si no, polling por `os.stat`. Un solo hilo para todas las rutas."""
+    if sys.platform.startswith("linux"):
+        try:
+            return WatcherInotify(rutas, al_cambiar, al_faltar, al_error)
+        except (OSError, AttributeError):
+            pass
+    return WatcherPolling(rutas, al_cambiar, al_faltar, al_error)
@@ -0,0 +1,198 @@
+"""
+Servicio local de cache: un proceso mantiene un `CompanionEngine` caliente (JSON de PokeAPI en
+memoria + cache en disco + una sola sesión HTTP) y lo comparten el HUD, la consola y cualquier otra
+entrada que corra en la misma máquina.
+
+    python servicio_cache.py [--puerto 8765]
+
+Solo escucha en 127.0.0.1:
+- `GET /estado`: identificación del servicio y contadores;
+- `GET /json?url=<URL de PokeAPI>`: el JSON, desde la memoria del servicio, su cache o la red.
+
+Los clientes usan `FuenteServicio` (ver `companion_engine.crear_motor`); si el servicio deja de
+responder vuelven a su fuente local sin que el usuario note nada. `HUD_SERVICIO=off` lo desactiva
+y `HUD_SERVICIO=http://host:puerto` apunta a otro puerto.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import trazas
+from companion_engine import CompanionEngine, FuenteLocal, crear_session
+from sprite_cache import LRU
+
+SERVICIO_ID = "hud-companion"
+SERVICIO_VERSION = 1
+PUERTO_SERVICIO = 8765
+PREFIJO_PERMITIDO = "https://pokeapi.co/"
+# Sondeo al arrancar: con el puerto cerrado la conexión se rechaza al instante.
+TIMEOUT_SONDEO = 0.3
+# Tras un fallo de conexión no se vuelve a probar el servicio hasta pasado este tiempo.
+REINTENTO_SERVICIO_SECONDS = 30.0
+# Cuerpos ya serializados por URL: las respuestas calientes no se vuelven a convertir a JSON.
+MAX_CUERPOS_MEMORIA = 1024
+
+
+def url_servicio():
+    """URL base configurada o None si el servicio está desactivado."""
+    valor = os.environ.get("HUD_SERVICIO", "").strip()
+    if valor.lower() in ("off", "0", "no"):
+        return None
+    return valor.rstrip("/") or f"http://127.0.0.1:{PUERTO_SERVICIO}"
+
+
+class FuenteServicio:
+    """Fuente de `CompanionEngine` que pide los JSON al servicio; `respaldo` si no responde."""
+
+    nombre = "servicio"
+
+    def __init__(self, base, respaldo=None):
+        self.base = base
+        self.respaldo = respaldo or FuenteLocal()
+        self.session = self.respaldo.session
+        self._cliente = crear_session()
+        self._caido_hasta = 0.0
+
+    def get_json(self, url, timeout=12, retries=3, log=False, log_tag="api"):
+        import requests
+
+        if time.monotonic() >= self._caido_hasta:
+            try:
+                with trazas.tramo("servicio.get", url=url) as tramo:
+                    # El servicio ya hace sus reintentos: se le da tiempo para todos ellos.
+                    r = self._cliente.get(f"{self.base}/json", params={"url": url}, timeout=timeout * retries + 5)
+                    tramo.set(status=r.status_code)
+            except (requests.ConnectionError, requests.Timeout):
+                self._caido_hasta = time.monotonic() + REINTENTO_SERVICIO_SECONDS
+            else:
+                if r.status_code == 200:
+                    return r.json()
+                # El servicio ya intentó la red: repetirlo aquí solo duplicaría la espera.
+                raise RuntimeError(f"Servicio de cache: HTTP {r.status_code} -> {url}")
+        return self.respaldo.get_json(url, timeout=timeout, retries=retries, log=log, log_tag=log_tag)
+
+
+def conectar_servicio(base=None):
+    """`FuenteServicio` si hay un servicio escuchando en `base` (o en el configurado); si no, None."""
+    base = base or url_servicio()
+    if base is None:
+        return None
+    try:
+        import requests
+
+        r = requests.get(f"{base}/estado", timeout=TIMEOUT_SONDEO)
+        if r.status_code != 200 or r.json().get("servicio") != SERVICIO_ID:
+            return None
+    except Exception:
+        return None
+    return FuenteServicio(base)
+
+
+class ServicioCache:
+    """Servidor HTTP en un hilo por petición delante de un `CompanionEngine` con fuente local."""
+
+    def __init__(self, motor, puerto=PUERTO_SERVICIO, host="127.0.0.1"):
+        self.motor = motor
+        self.stats = {"peticiones": 0, "errores": 0}
+        self._cuerpos = LRU(MAX_CUERPOS_MEMORIA)
+        self._stats_lock = threading.Lock()
+        self._inicio = time.time()
+        servicio = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                servicio._atender(self)
+
+        self._httpd = ThreadingHTTPServer((host, puerto), Handler)
+        self._httpd.daemon_threads = True
+        self.base = f"http://{host}:{self._httpd.server_address[1]}"
+
+    def servir(self):
+        self._httpd.serve_forever()
+
+    def iniciar(self):
+        threading.Thread(target=self.servir, name="servicio-cache", daemon=True).start()
+        return self
+
+    def detener(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _contar(self, clave):
+        with self._stats_lock:
+            self.stats[clave] += 1
+
+    def _atender(self, h):
+        self._contar("peticiones")
+        partes = urlsplit(h.path)
+        if partes.path == "/estado":
+            self._responder(h, 200, {
+                "servicio": SERVICIO_ID,
+                "version": SERVICIO_VERSION,
+                "pid": os.getpid(),
+                "activo_desde": self._inicio,
+                "stats": dict(self.stats),
+                "motor": self.motor.resumen(),
+            })
+            return
+        if partes.path != "/json":
+            self._responder(h, 404, {"error": "ruta desconocida"})
+            return
+        url = (parse_qs(partes.query).get("url") or [""])[0]
+        if not url.startswith(PREFIJO_PERMITIDO):
+            self._responder(h, 400, {"error": f"solo se sirven URLs de {PREFIJO_PERMITIDO}"})
+            return
+        cuerpo = self._cuerpos.get(url)
+        if cuerpo is None:
+            try:
+                data = self.motor.api_get_json(url, log_tag="servicio")
+            except Exception as ex:
+                self._contar("errores")
+                self._responder(h, 502, {"error": str(ex)})
+                return
+            cuerpo = _serializar(data)
+            self._cuerpos.put(url, cuerpo)
+        self._enviar(h, 200, cuerpo)
+
+    def _responder(self, h, estado, data):
+        self._enviar(h, estado, _serializar(data))
+
+    def _enviar(self, h, estado, cuerpo):
+        h.send_response(estado)
+        h.send_header("Content-Type", "application/json; charset=utf-8")
+        h.send_header("Content-Length", str(len(cuerpo)))
+        h.end_headers()
+        h.wfile.write(cuerpo)
+
+
+def _serializar(data):
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio local de cache de PokeAPI para el HUD y la consola")
+    parser.add_argument("--puerto", type=int, default=PUERTO_SERVICIO)
+    parser.add_argument("--log", action="store_true", help="Mostrar las consultas a PokeAPI")
+    args = parser.parse_args()
+
+    # El motor del servicio siempre usa la fuente local (nunca se conecta a sí mismo).
+    motor = CompanionEngine(fuente=FuenteLocal(), log=args.log)
+    servicio = ServicioCache(motor, puerto=args.puerto)
+    print(f"Servicio de cache en {servicio.base} (Ctrl+C para salir)", flush=True)
+    try:
+        servicio.servir()
+    except KeyboardInterrupt:
+        servicio.detener()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,492 @@
+"""
+Servidor de overlay sin pantalla (para una fuente de navegador de OBS): el mismo flujo
+watcher → `DetectorCambios` → `CompanionEngine.leer_save` que el HUD, pero sin Tk.
+
+    python servidor_overlay.py [--puerto 8766] [--host 127.0.0.1] [save1 save2 ...]
+
+Rutas (`?save=N` elige el save cuando se vigila más de uno; por defecto el primero):
+- `GET /`: overlay HTML mínimo que se actualiza solo;
+- `GET /estado`: estado actual en JSON, con ETag fuerte (`If-None-Match` → 304);
+- `GET /eventos`: Server-Sent Events; un evento `estado` al conectar y otro solo cuando cambia;
+- `GET /sprite/<id>`: PNG de la especie desde la cache de sprites del motor.
+
+Todo corre en un único bucle asyncio: un cliente SSE en reposo es una tarea esperando un
+`asyncio.Event`, sin hilo propio. El parseo sigue en `ColaParseo` y publica con
+`call_soon_threadsafe`; cada estado se serializa una vez y se comparte con todos los clientes.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import threading
+from urllib.parse import parse_qs, urlsplit
+
+import trazas
+from companion_engine import PARSE_WORKERS, RUTA_PROYECTO, RUTA_SAVE, ColaParseo, crear_motor, etiquetas_saves
+from gamedata_pack import cargar_pack
+from save_watcher import crear_watcher
+
+try:
+    from save_gen7 import DetectorCambios
+except ImportError:
+    # Sin NumPy cada cambio del archivo se vuelve a leer entero (el ETag evita empujes repetidos).
+    DetectorCambios = None
+
+PUERTO_OVERLAY = 8766
+# Comentario SSE cada tantos segundos: mantiene viva la conexión a través de proxies y detecta clientes idos.
+KEEPALIVE_SECONDS = 15.0
+# Conexiones keep-alive sin petición nueva se cierran pasado este tiempo.
+INACTIVIDAD_SECONDS = 60.0
+# Espera sugerida al navegador antes de reconectar el EventSource (ms).
+REINTENTO_SSE_MS = 2000
+MAX_CABECERAS = 100
+
+RAZONES = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    431: "Request Header Fields Too Large",
+    502: "Bad Gateway",
+}
+
+OVERLAY_HTML = """<!doctype html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>HUD PokeCompanion</title>
+<style>
+  body { margin: 0; background: transparent; font: 600 16px/1.2 "Segoe UI", sans-serif; color: #fff;
+         text-shadow: 0 1px 2px #000; }
+  #equipo { display: flex; gap: 8px; padding: 8px; }
+  .mon { width: 112px; text-align: center; background: rgba(20, 24, 32, .72); border-radius: 10px; padding: 6px; }
+  .mon img { width: 96px; height: 96px; image-rendering: pixelated; }
+  .nivel, #pie { font-weight: 400; font-size: 13px; opacity: .85; }
+  #pie { padding: 0 8px; }
+</style>
+</head>
+<body>
+<div id="equipo"></div>
+<div id="pie"></div>
+<script>
+  const equipo = document.getElementById("equipo");
+  const pie = document.getElementById("pie");
+  const fuente = new EventSource("eventos" + location.search);
+
+  function tarjeta(mon) {
+    const div = document.createElement("div");
+    div.className = "mon";
+    const img = document.createElement("img");
+    img.src = mon.sprite;
+    img.alt = mon.nombre;
+    const nombre = document.createElement("div");
+    nombre.textContent = mon.apodo || mon.nombre;
+    const nivel = document.createElement("div");
+    nivel.className = "nivel";
+    nivel.textContent = "Nv. " + (mon.nivel ?? "?");
+    div.append(img, nombre, nivel);
+    return div;
+  }
+
+  fuente.addEventListener("estado", (ev) => {
+    const estado = JSON.parse(ev.data);
+    if (estado.estado !== "ok") {
+      pie.textContent = estado.mensaje || "";
+      return;
+    }
+    equipo.replaceChildren(...estado.equipo.map(tarjeta));
+    const dex = estado.pokedex;
+    pie.textContent = dex ? `Pokédex ${dex.capturados}/${dex.total} capturados` : "";
+  });
+</script>
+</body>
+</html>
+"""
+
+
+def _nombre_rapido(motor, species_id):
+    """Nombre sin ir a la red: pack offline o índice persistente; si no, el provisional."""
+    if motor.pack is not None and motor.pack.tiene(species_id):
+        return motor.datos_pokemon(species_id)[0]
+    return motor.indice_nombres.nombre(species_id) or f"Species {species_id}"
+
+
+def _tipos(motor, species_id, completo):
+    if not completo:
+        return motor.tipos_en_memoria(species_id)
+    try:
+        return motor.tipos(species_id)
+    except Exception:
+        return None
+
+
+def construir_estado(motor, datos, etiqueta, completo=True):
+    """
+    Estado del overlay a partir del dict del save. Con `completo=False` no se toca la red
+    (nombres y tipos de lo que haya en memoria); sin marcas de tiempo, para que el ETag solo
+    cambie cuando cambia algo visible.
+    """
+    trainer = datos.get("Trainer") or {}
+    dex = datos.get("Pokedex") or {}
+    last = datos.get("Last") or {}
+
+    def nombre(species_id):
+        return motor.datos_pokemon(species_id)[0] if completo else _nombre_rapido(motor, species_id)
+
+    equipo = []
+    for slot, mon in enumerate(datos.get("Party") or []):
+        species_id = mon["SpeciesId"]
+        equipo.append({
+            "slot": slot,
+            "species_id": species_id,
+            "nombre": nombre(species_id),
+            "apodo": mon.get("Nickname") or "",
+            "nivel": mon.get("Level"),
+            "amistad": mon.get("Friendship"),
+            "tipos": _tipos(motor, species_id, completo),
+            "sprite": f"sprite/{species_id}",
+        })
+    estado = {
+        "save": etiqueta,
+        "estado": "ok",
+        "entrenador": {
+            "nombre": trainer.get("Name"),
+            "tid": trainer.get("TID"),
+            "dinero": trainer.get("Money"),
+            "tiempo": trainer.get("PlayTime"),
+            "version": trainer.get("GameVersion"),
+        },
+        "pokedex": None,
+        "equipo": equipo,
+        "ultimo": None,
+    }
+    if dex.get("Enabled"):
+        estado["pokedex"] = {
+            "vistos": dex.get("Seen", 0),
+            "capturados": dex.get("Caught", 0),
+            "total": dex.get("MaxSpecies", 0),
+        }
+    if last.get("SpeciesId"):
+        estado["ultimo"] = {
+            "species_id": last["SpeciesId"],
+            "nombre": nombre(last["SpeciesId"]),
+            "apodo": last.get("Nickname") or "",
+            "nivel": last.get("Level"),
+            "sprite": f"sprite/{last['SpeciesId']}",
+        }
+    return estado
+
+
+class Canal:
+    """Un save vigilado: su último estado serializado, el ETag y el aviso a los clientes SSE."""
+
+    def __init__(self, ruta, etiqueta):
+        self.ruta = ruta
+        self.etiqueta = etiqueta
+        self.detector = DetectorCambios() if DetectorCambios is not None else None
+        self.encargo = None
+        self.cuerpo = None
+        self.etag = None
+        self.clientes = 0
+        # Se crea dentro del bucle; se dispara y se reemplaza en cada estado nuevo.
+        self.cambio = None
+
+
+class ServidorOverlay:
+    """Servidor HTTP asyncio (sin dependencias) que empuja el estado de los saves a los overlays."""
+
+    def __init__(self, motor, rutas, puerto=PUERTO_OVERLAY, host="127.0.0.1"):
+        self.motor = motor
+        self.host = host
+        self.puerto = puerto
+        self.canales = [Canal(ruta, etiqueta) for ruta, etiqueta in zip(rutas, etiquetas_saves(rutas))]
+        self._por_ruta = {canal.ruta: canal for canal in self.canales}
+        self.stats = {"peticiones": 0, "no_modificado": 0, "empujes": 0, "publicados": 0}
+        self.base = None
+        self._loop = None
+        self._server = None
+        self._listo = threading.Event()
+        # Los saves con overlays conectados se parsean primero.
+        self._cola = ColaParseo(
+            self._parsear,
+            prioridad=lambda ruta: 0 if self._por_ruta[ruta].clientes else 1,
+            workers=min(PARSE_WORKERS, len(rutas)),
+        )
+        self._watcher = crear_watcher(
+            rutas,
+            al_cambiar=self._encargar,
+            al_faltar=lambda ruta: self._publicar(
+                self._por_ruta[ruta], {"estado": "sin_save", "mensaje": "Archivo save no encontrado."}
+            ),
+        )
+
+    # --- flujo del save (hilos del watcher y de `ColaParseo`) ---
+
+    def _encargar(self, ruta, encargo=None):
+        self._por_ruta[ruta].encargo = encargo or trazas.enlace()
+        self._cola.encargar(ruta)
+
+    def _parsear(self, ruta):
+        canal = self._por_ruta[ruta]
+        encargo, canal.encargo = canal.encargo, None
+        with trazas.tramo("overlay.refresco", padre=encargo, ruta=ruta) as tramo:
+            try:
+                with trazas.tramo("save.cambios"):
+                    secciones = canal.detector.cambios(ruta) if canal.detector is not None else None
+                if secciones is not None and not secciones:
+                    tramo.set(omitido=True)
+                    return
+                with trazas.tramo("save.leer"):
+                    datos = self.motor.leer_save(ruta)
+            except Exception as ex:
+                if canal.detector is not None:
+                    canal.detector.olvidar()
+                self._publicar(canal, {"estado": "error", "mensaje": f"No se pudo leer el save: {ex}"})
+                return
+            # Primero lo que ya está en memoria; los nombres y tipos que falten llegan en un segundo empuje.
+            self._publicar(canal, construir_estado(self.motor, datos, canal.etiqueta, completo=False))
+            self._publicar(canal, construir_estado(self.motor, datos, canal.etiqueta))
+
+    def _publicar(self, canal, estado):
+        estado.setdefault("save", canal.etiqueta)
+        with trazas.tramo("overlay.publicar"):
+            cuerpo, etag = _serializar(estado)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._aplicar, canal, cuerpo, etag)
+
+    def _aplicar(self, canal, cuerpo, etag):
+        """Hilo del bucle: solo se avisa a los clientes si el estado cambió de verdad."""
+        if etag == canal.etag:
+            return
+        canal.cuerpo, canal.etag = cuerpo, etag
+        self.stats["publicados"] += 1
+        canal.cambio.set()
+        canal.cambio = asyncio.Event()
+
+    # --- ciclo de vida ---
+
+    async def servir(self):
+        self._loop = asyncio.get_running_loop()
+        for canal in self.canales:
+            canal.cambio = asyncio.Event()
+            inicial = {"save": canal.etiqueta, "estado": "cargando", "mensaje": "Cargando save..."}
+            self._aplicar(canal, *_serializar(inicial))
+        self._server = await asyncio.start_server(self._atender, self.host, self.puerto)
+        self.base = f"http://{self.host}:{self._server.sockets[0].getsockname()[1]}"
+        for canal in self.canales:
+            self._encargar(canal.ruta, encargo=None)
+        self._watcher.iniciar()
+        self._listo.set()
+        try:
+            await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            # Sin `wait_closed`: los flujos SSE abiertos no terminan solos y lo bloquearían.
+            self._server.close()
+            self._watcher.detener()
+            self._cola.detener()
+
+    def iniciar(self):
+        """Arranca el bucle en un hilo propio (bench, pruebas); vuelve cuando ya escucha."""
+        threading.Thread(target=lambda: asyncio.run(self.servir()), name="servidor-overlay", daemon=True).start()
+        self._listo.wait()
+        return self
+
+    def detener(self):
+        if self._loop is not None and self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+
+    # --- HTTP ---
+
+    async def _atender(self, reader, writer):
+        try:
+            while True:
+                peticion = await asyncio.wait_for(_leer_peticion(reader), INACTIVIDAD_SECONDS)
+                if peticion is None:
+                    break
+                seguir = await self._responder(*peticion, writer)
+                if not seguir or peticion[2].get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # Cierre del servidor con flujos SSE abiertos: la conexión termina aquí sin más.
+            pass
+        finally:
+            writer.close()
+
+    async def _responder(self, metodo, objetivo, cabeceras, writer):
+        """Atiende una petición. Devuelve False si la conexión no debe reutilizarse."""
+        self.stats["peticiones"] += 1
+        if metodo not in ("GET", "HEAD"):
+            _escribir(writer, 405, {"Allow": "GET, HEAD"}, _json_error("método no permitido"))
+            return False
+        solo_cabeceras = metodo == "HEAD"
+        partes = urlsplit(objetivo)
+        canal = self._canal(partes.query)
+        if canal is None:
+            _escribir(writer, 404, {}, _json_error("save desconocido"), solo_cabeceras)
+        elif partes.path == "/":
+            cuerpo = OVERLAY_HTML.encode("utf-8")
+            _escribir(writer, 200, {"Content-Type": "text/html; charset=utf-8"}, cuerpo, solo_cabeceras)
+        elif partes.path == "/estado":
+            self._responder_estado(canal, cabeceras, writer, solo_cabeceras)
+        elif partes.path == "/eventos":
+            if solo_cabeceras:
+                _escribir(writer, 200, {"Content-Type": "text/event-stream"}, b"", True)
+            else:
+                await self._eventos(canal, cabeceras, writer)
+                return False
+        elif partes.path.startswith("/sprite/"):
+            await self._sprite(partes.path[len("/sprite/"):], cabeceras, writer, solo_cabeceras)
+        else:
+            _escribir(writer, 404, {}, _json_error("ruta desconocida"), solo_cabeceras)
+        await writer.drain()
+        return True
+
+    def _canal(self, query):
+        valor = (parse_qs(query).get("save") or ["0"])[0]
+        try:
+            indice = int(valor)
+        except ValueError:
+            return None
+        return self.canales[indice] if 0 <= indice < len(self.canales) else None
+
+    def _responder_estado(self, canal, cabeceras, writer, solo_cabeceras):
+        etag = f'"{canal.etag}"'
+        extra = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _coincide_etag(cabeceras.get("if-none-match"), etag):
+            self.stats["no_modificado"] += 1
+            _escribir(writer, 304, extra, b"", True)
+            return
+        extra["Content-Type"] = "application/json; charset=utf-8"
+        _escribir(writer, 200, extra, canal.cuerpo, solo_cabeceras)
+
+    async def _eventos(self, canal, cabeceras, writer):
+        """
+        Flujo SSE. Siempre se manda el último estado, nunca una cola de intermedios: un cliente lento
+        se salta los estados viejos en vez de acumular memoria. `Last-Event-ID` evita repetir el
+        estado al reconectar si no cambió mientras tanto.
+        """
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream; charset=utf-8\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Connection: keep-alive\r\n"
+            b"X-Accel-Buffering: no\r\n\r\n"
+            + f"retry: {REINTENTO_SSE_MS}\n\n".encode("ascii")
+        )
+        await writer.drain()
+        enviado = cabeceras.get("last-event-id")
+        canal.clientes += 1
+        try:
+            while True:
+                if canal.etag != enviado:
+                    enviado = canal.etag
+                    writer.write(b"event: estado\nid: " + enviado.encode("ascii") + b"\ndata: " + canal.cuerpo + b"\n\n")
+                    self.stats["empujes"] += 1
+                    await writer.drain()
+                    continue
+                try:
+                    await asyncio.wait_for(canal.cambio.wait(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    writer.write(b": ping\n\n")
+                    await writer.drain()
+        finally:
+            canal.clientes -= 1
+
+    async def _sprite(self, valor, cabeceras, writer, solo_cabeceras):
+        try:
+            species_id = int(valor)
+        except ValueError:
+            _escribir(writer, 404, {}, _json_error("especie desconocida"), solo_cabeceras)
+            return
+        etag = f'"sprite-{species_id}"'
+        # Los sprites no cambian: el navegador los guarda y solo revalida tras una semana.
+        extra = {"ETag": etag, "Cache-Control": "public, max-age=604800"}
+        if _coincide_etag(cabeceras.get("if-none-match"), etag):
+            _escribir(writer, 304, extra, b"", True)
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            url = (await loop.run_in_executor(None, self.motor.datos_pokemon, species_id))[1]
+            datos = await loop.run_in_executor(None, self.motor.sprites.bytes_sprite, url) if url else None
+        except Exception as ex:
+            _escribir(writer, 502, {}, _json_error(str(ex)), solo_cabeceras)
+            return
+        if not datos:
+            _escribir(writer, 404, {}, _json_error("sprite no disponible"), solo_cabeceras)
+            return
+        extra["Content-Type"] = "image/png"
+        _escribir(writer, 200, extra, datos, solo_cabeceras)
+
+
+async def _leer_peticion(reader):
+    """(método, objetivo, cabeceras en minúsculas) o None si el cliente cerró la conexión."""
+    linea = await reader.readline()
+    if not linea:
+        return None
+    partes = linea.decode("latin-1").split()
+    if len(partes) != 3:
+        raise ValueError("línea de petición inválida")
+    cabeceras = {}
+    while True:
+        linea = await reader.readline()
+        if linea in (b"\r\n", b"\n", b""):
+            break
+        if len(cabeceras) >= MAX_CABECERAS:
+            raise ValueError("demasiadas cabeceras")
+        nombre, _, valor = linea.decode("latin-1").partition(":")
+        cabeceras[nombre.strip().lower()] = valor.strip()
+    return partes[0].upper(), partes[1], cabeceras
+
+
+def _serializar(estado):
+    """(cuerpo JSON, ETag): el ETag es el hash del cuerpo, así que estados iguales no se reenvían."""
+    cuerpo = json.dumps(estado, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return cuerpo, hashlib.blake2b(cuerpo, digest_size=12).hexdigest()
+
+
+def _coincide_etag(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidatos = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidatos or any(c.removeprefix("W/") == etag for c in candidatos)
+
+
+def _json_error(mensaje):
+    return json.dumps({"error": mensaje}, ensure_ascii=False).encode("utf-8")
+
+
+def _escribir(writer, estado, cabeceras, cuerpo, solo_cabeceras=False):
+    lineas = [f"HTTP/1.1 {estado} {RAZONES.get(estado, '')}"]
+    cabeceras = dict(cabeceras)
+    if estado != 304:
+        cabeceras.setdefault("Content-Type", "application/json; charset=utf-8")
+        cabeceras["Content-Length"] = str(len(cuerpo))
+    lineas += [f"{nombre}: {valor}" for nombre, valor in cabeceras.items()]
+    writer.write(("\r\n".join(lineas) + "\r\n\r\n").encode("latin-1"))
+    if not solo_cabeceras and estado != 304:
+        writer.write(cuerpo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Overlay del HUD para OBS (sin pantalla, actualizaciones por SSE)")
+    parser.add_argument("saves", nargs="*", help=f"Saves a vigilar (por defecto {RUTA_SAVE})")
+    parser.add_argument("--puerto", type=int, default=PUERTO_OVERLAY)
+    parser.add_argument("--host", default="127.0.0.1", help="0.0.0.0 para servir a OBS en otra máquina")
+    args = parser.parse_args()
+
+    motor = crear_motor(pack=cargar_pack(), ruta_proyecto=RUTA_PROYECTO)
+    servidor = ServidorOverlay(motor, args.saves or [RUTA_SAVE], puerto=args.puerto, host=args.host)
+    print(f"Overlay en http://{args.host}:{args.puerto}/ (Ctrl+C para salir)", flush=True)
+    try:
+        asyncio.run(servidor.servir())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Cache de sprites en dos niveles:
+
+- disco: bytes PNG originales por URL en `.cache/sprites/` (sobreviven entre ejecuciones);
+- memoria: LRU acotada de imágenes Pillow ya redimensionadas por (url, tamaño).
+
+`SpriteCache.imagen` es segura entre hilos y está pensada para llamarse fuera del hilo de Tk.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import trazas
+from api_cache import CACHE_DIR
+
+DIR_SPRITES = os.path.join(CACHE_DIR, "sprites")
+MAX_SPRITES_MEMORIA = 256
+
+
+class LRU:
+    """Diccionario acotado que descarta el elemento usado hace más tiempo."""
+
+    def __init__(self, max_items):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            valor = self._items.get(key)
+            if valor is not None:
+                self._items.move_to_end(key)
+            return valor
+
+    def put(self, key, valor):
+        with self._lock:
+            self._items[key] = valor
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class SpriteCache:
+    def __init__(self, directorio=DIR_SPRITES, max_memoria=MAX_SPRITES_MEMORIA, timeout=10):
+        self.directorio = directorio
+        self.timeout = timeout
+        self.memoria = LRU(max_memoria)
+        self.stats = {"memoria": 0, "disco": 0, "red": 0, "errores": 0}
+        self._session = None
+        self._session_lock = threading.Lock()
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta(self, url):
+        return os.path.join(self.directorio, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".png")
+
+    def _descargar(self, url):
+        import requests
+
+        with self._session_lock:
+            if self._session is None:
+                self._session = requests.Session()
+                self._session.headers.update({"User-Agent": "HUD-PokeCompanion/1.0"})
+        r = self._session.get(url, timeout=self.timeout)
+        r.raise_for_status()
+        return r.content
+
+    def bytes_sprite(self, url):
+        """PNG original: primero disco, luego red (y se guarda en disco)."""
+        ruta = self._ruta(url)
+        with trazas.tramo("sprite.bytes", url=url) as tramo:
+            try:
+                with open(ruta, "rb") as fh:
+                    data = fh.read()
+                self.stats["disco"] += 1
+                tramo.set(origen="disco")
+                return data
+            except FileNotFoundError:
+                pass
+            data = self._descargar(url)
+            self.stats["red"] += 1
+            tramo.set(origen="red")
+            tmp = f"{ruta}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, ruta)
+            return data
+
+    def imagen(self, url, size):
+        """Imagen RGBA de `size` x `size` o None si no se pudo obtener."""
+        if not url:
+            return None
+        key = (url, size)
+        with trazas.tramo("sprite.imagen", url=url, size=size) as tramo:
+            img = self.memoria.get(key)
+            if img is not None:
+                self.stats["memoria"] += 1
+                tramo.set(origen="memoria")
+                return img
+            try:
+                from PIL import Image
+
+                data = self.bytes_sprite(url)
+                with trazas.tramo("sprite.decodificar", bytes=len(data)):
+                    img = Image.open(BytesIO(data)).convert("RGBA")
+                with trazas.tramo("sprite.redimensionar"):
+                    img = img.resize((size, size), Image.Resampling.LANCZOS)
+            except Exception:
+                self.stats["errores"] += 1
+                tramo.set(origen="error")
+                return None
+            tramo.set(origen="decodificada")
+            self.memoria.put(key, img)
+            return img
@@ -0,0 +1,43 @@
+"""`CompanionEngine`: el wrapper inyectado se usa también para las cajas; el overlay no carga el HUD de Tk."""
+import os
+import subprocess
+import sys
+
+import companion_engine
+from companion_engine import CompanionEngine, etiquetas_saves
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_cajas_usan_el_wrapper_inyectado(tmp_path, monkeypatch):
+    ruta = str(tmp_path / "main")
+    (tmp_path / "main").write_bytes(b"no es un save")
+    pedidas = []
+
+    def cajas_dotnet(r):
+        pedidas.append(r)
+        return [{"Box": 2, "Slot": 3, "SpeciesId": 25, "Nickname": "Pika", "Level": 5}]
+
+    def sin_daemon(ruta_proyecto):
+        raise AssertionError("no debía arrancar el daemon")
+
+    monkeypatch.setattr(companion_engine, "obtener_daemon", sin_daemon)
+    motor = CompanionEngine(
+        fuente=object(), sprites=object(), indice_nombres=object(), evoluciones={}, leer_cajas_dotnet=cajas_dotnet
+    )
+    inventario = motor.leer_cajas(ruta)
+    assert pedidas == [ruta]
+    assert len(inventario) == 1
+
+
+def test_overlay_no_importa_el_hud_de_tk():
+    codigo = "import sys, servidor_overlay; print('ui_equipo' in sys.modules, 'tkinter' in sys.modules)"
+    salida = subprocess.run(
+        [sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True, timeout=60
+    ).stdout
+    assert salida.split() == ["False", "False"]
+
+
+def test_etiquetas_saves_distinguen_por_las_ultimas_carpetas():
+    rutas = [os.path.join("a", "x", "main"), os.path.join("b", "x", "main"), os.path.join("b", "y", "main")]
+    assert etiquetas_saves(rutas) == ["a/x", "b/x", "b/y"]
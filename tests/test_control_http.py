@@ -0,0 +1,128 @@
+"""Disyuntor y limitador de `control_http`, solos y a través de `api_cache.api_get_json`."""
+import threading
+
+import pytest
+
+import api_cache
+import control_http
+from control_http import CircuitoAbierto, CuboTokens, Disyuntor
+
+
+class RespuestaFalsa:
+    def __init__(self, status_code=200, data=None):
+        self.status_code = status_code
+        self.headers = {}
+        self._data = data if data is not None else {"ok": True}
+        self.content = b"{}"
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._data
+
+
+class SesionFalsa:
+    def __init__(self):
+        self.llamadas = 0
+
+    def get(self, url, timeout=None, headers=None):
+        self.llamadas += 1
+        return RespuestaFalsa()
+
+
+def abrir(disyuntor):
+    for _ in range(disyuntor.fallos_apertura):
+        disyuntor.fallo()
+
+
+def test_disyuntor_se_abre_y_deja_pasar_una_sola_prueba():
+    d = Disyuntor(fallos_apertura=3, enfriamiento=0)
+    abrir(d)
+    assert d.abierto()
+    assert d.permitir()
+    assert not d.permitir()
+    d.exito()
+    assert not d.abierto()
+    assert d.permitir()
+
+
+def test_disyuntor_prueba_fallida_vuelve_a_abrir():
+    d = Disyuntor(fallos_apertura=3, enfriamiento=60)
+    abrir(d)
+    assert not d.permitir()
+    d._abierto_hasta = 0.0
+    assert d.permitir()
+    d.fallo()
+    assert d.abierto()
+    assert not d.permitir()
+
+
+def test_disyuntor_cancelar_libera_la_prueba():
+    d = Disyuntor(fallos_apertura=1, enfriamiento=0)
+    abrir(d)
+    assert d.permitir()
+    assert not d.permitir()
+    d.cancelar()
+    assert d.permitir()
+
+
+def test_disyuntor_cancelar_de_otro_hilo_no_libera_la_prueba():
+    d = Disyuntor(fallos_apertura=1, enfriamiento=0)
+    abrir(d)
+    assert d.permitir()
+    otro = threading.Thread(target=d.cancelar)
+    otro.start()
+    otro.join()
+    assert not d.permitir()
+
+
+def test_cubo_no_consume_si_la_espera_pasa_del_maximo():
+    cubo = CuboTokens(tasa=10, capacidad=1)
+    cubo.pausar(60)
+    assert cubo.tomar(max_espera=12) is None
+    cubo._pausa_hasta = 0.0
+    assert cubo.tomar(max_espera=12) == 0.0
+    # El único token ya se gastó: el siguiente espera su turno.
+    assert cubo.tomar(max_espera=0) is None
+
+
+@pytest.fixture
+def control(tmp_path):
+    url = "http://disyuntor.prueba/api/v2/pokemon/25"
+    control = control_http.control_para(url)
+    control.disyuntor = Disyuntor(fallos_apertura=1, enfriamiento=0)
+    control.cubo = CuboTokens()
+    cache = api_cache.ApiCache(ruta=str(tmp_path / "pokeapi.sqlite3"))
+    yield url, control, cache
+    cache.cerrar()
+
+
+def test_prueba_frenada_por_el_limitador_no_deja_el_circuito_abierto(control):
+    url, control, cache = control
+    sesion = SesionFalsa()
+    abrir(control.disyuntor)
+    # `Retry-After` más largo que el timeout: el intento de prueba no llega a la red.
+    control.cubo.pausar(60)
+    with pytest.raises(CircuitoAbierto):
+        api_cache.api_get_json(sesion, url, timeout=12, cache=cache)
+    assert sesion.llamadas == 0
+    assert not control.disyuntor._probando
+
+    control.cubo._pausa_hasta = 0.0
+    assert api_cache.api_get_json(sesion, url, timeout=12, cache=cache) == {"ok": True}
+    assert sesion.llamadas == 1
+    assert not control.disyuntor.abierto()
+
+
+def test_error_local_en_la_prueba_libera_el_disyuntor(control):
+    url, control, cache = control
+
+    class SesionRota(SesionFalsa):
+        def get(self, url, timeout=None, headers=None):
+            raise ValueError("sesión mal configurada")
+
+    abrir(control.disyuntor)
+    with pytest.raises(ValueError):
+        api_cache.api_get_json(SesionRota(), url, cache=cache)
+    assert control.disyuntor.permitir()
@@ -0,0 +1,28 @@
+"""Modo lote de `mostrar_equipo`: un proceso del pool que muere no tumba el informe."""
+import io
+import json
+import os
+
+import mostrar_equipo
+
+
+def _leer_o_morir(ruta):
+    """Como `_leer_para_lote`, pero el save "rompe" mata su proceso (p. ej. un crash del wrapper)."""
+    if os.path.basename(ruta) == "rompe":
+        os._exit(1)
+    return ruta, {"Trainer": {"Name": os.path.basename(ruta)}, "Pokedex": {}, "Party": [], "Last": {}}, None
+
+
+def test_solo_falla_el_save_que_tumba_el_proceso(tmp_path, monkeypatch):
+    # Más saves que la ventana del pool, con el que lo tumba en medio: hay saves sanos en vuelo al caer.
+    sanos = [str(tmp_path / f"s{i}") for i in range(3 * mostrar_equipo.VENTANA_POR_PROCESO)]
+    rutas = sanos[:2] + [str(tmp_path / "rompe")] + sanos[2:]
+    monkeypatch.setattr(mostrar_equipo, "_leer_para_lote", _leer_o_morir)
+    salida = io.StringIO()
+    total, errores = mostrar_equipo.procesar_lote(rutas, salida, procesos=2, hilos=1)
+    registros = {r["ruta"]: r for r in map(json.loads, salida.getvalue().splitlines())}
+    assert (total, errores) == (len(rutas), 1)
+    assert sorted(registros) == sorted(rutas)
+    assert registros[rutas[2]]["ok"] is False
+    assert all(registros[ruta]["ok"] is True for ruta in sanos)
+    assert all(registros[ruta]["entrenador"]["nombre"] == os.path.basename(ruta) for ruta in sanos)
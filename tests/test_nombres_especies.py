@@ -0,0 +1,23 @@
+"""Refresco de `IndiceNombres`: reintentos y cache en disco que no se puede escribir."""
+import nombres_especies
+from nombres_especies import IndiceNombres
+
+LISTA = {"results": [{"name": "bulbasaur", "url": "https://pokeapi.co/api/v2/pokemon-species/1/"}]}
+
+
+def test_refresco_sin_poder_guardar_sigue_valiendo(tmp_path, monkeypatch):
+    # Un archivo donde debería ir el directorio de la cache: `_guardar` lanza OSError.
+    (tmp_path / "bloqueo").write_text("")
+    indice = IndiceNombres(ruta=str(tmp_path / "bloqueo" / "species_names.json"))
+    monkeypatch.setattr(nombres_especies, "api_get_json", lambda *a, **k: LISTA)
+    assert indice.refrescar(session=None) is True
+    assert indice.nombre(1) == "Bulbasaur"
+
+
+def test_sin_espera_tras_el_ultimo_intento(tmp_path, monkeypatch):
+    esperas = []
+    indice = IndiceNombres(ruta=str(tmp_path / "species_names.json"))
+    monkeypatch.setattr(nombres_especies, "api_get_json", lambda *a, **k: {})
+    monkeypatch.setattr(nombres_especies.time, "sleep", esperas.append)
+    assert indice.refrescar(session=None, reintentos=3) is False
+    assert esperas == [nombres_especies.ESPERA_BASE_SECONDS, nombres_especies.ESPERA_BASE_SECONDS * 2]
@@ -0,0 +1,203 @@
+"""Layout de bloques y lectura nativa de `save_gen7` (saves SM y USUM)."""
+import json
+import os
+import shutil
+import struct
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bench"))
+
+import save_gen7  # noqa: E402
+from fixtures import cifrar_pk7, escribir_save  # noqa: E402
+from indice_pokedex import BitsetEspecies  # noqa: E402
+from save_gen7 import SAVE_SIZES, SaveNoSoportado  # noqa: E402
+
+DIR_PROYECTO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "PokeLastCatch")
+
+# Bloques 00-16 de PKHeX (SaveBlockAccessor7SM / SaveBlockAccessor7USUM): (offset, tamaño).
+PKHEX_SM = (
+    (0x00000, 0x00DE0), (0x00E00, 0x0007C), (0x01000, 0x00014), (0x01200, 0x000C0),  # 00-03 ... MyStatus
+    (0x01400, 0x0061C), (0x01C00, 0x00E00), (0x02A00, 0x00F78), (0x03A00, 0x00228),  # 04 PokePartySave, 06 ZukanData
+    (0x03E00, 0x00104), (0x04000, 0x00200), (0x04200, 0x00020), (0x04400, 0x00004),  # 09 Misc
+    (0x04600, 0x00058), (0x04800, 0x005E6), (0x04E00, 0x36600), (0x3B400, 0x0572C),  # 14 BoxPokemon
+    (0x40C00, 0x00008),  # 16 PlayTime
+)
+PKHEX_USUM = (
+    (0x00000, 0x00E28), (0x01000, 0x0007C), (0x01200, 0x00014), (0x01400, 0x000C0),
+    (0x01600, 0x0061C), (0x01E00, 0x00E00), (0x02C00, 0x00F78), (0x03C00, 0x00228),
+    (0x04000, 0x0030C), (0x04400, 0x00200), (0x04600, 0x0007C), (0x04800, 0x00004),
+    (0x04A00, 0x00058), (0x04C00, 0x005E6), (0x05200, 0x36600), (0x3B800, 0x0572C),
+    (0x41000, 0x00008),
+)
+PKHEX = {"SM": PKHEX_SM, "USUM": PKHEX_USUM}
+
+
+def _info_bloques(size, tabla):
+    """Últimos 0x1F0 bytes de un save con la tabla BlockInfo de `tabla` (magia "BEEF" + entradas)."""
+    sav = bytearray(size)
+    inicio = size - 0x1F0
+    struct.pack_into("<I", sav, inicio, 0x42454546)
+    for i, (_, largo) in enumerate(tabla):
+        struct.pack_into("<IHH", sav, inicio + 4 + 8 * i, largo, i, 0)
+    return sav
+
+
+def _save_a_mano(ruta, juego):
+    """Save armado solo con la tabla PKHeX de este test: nada sale de `save_gen7` ni de `fixtures`."""
+    size = {"SM": 0x6BE00, "USUM": 0x6CC00}[juego]
+    tabla = PKHEX[juego]
+    sav = _info_bloques(size, tabla)
+    status, party, zukan, misc, boxes, tiempo = (tabla[i][0] for i in (3, 4, 6, 9, 14, 16))
+    struct.pack_into("<HHB", sav, status, 111, 222, 30 if juego == "SM" else 32)
+    sav[status + 0x38:status + 0x38 + 8] = "Real".encode("utf-16-le")
+    struct.pack_into("<I", sav, misc + 4, 987654)
+    struct.pack_into("<HBB", sav, tiempo, 7, 8, 9)
+    struct.pack_into("<I", sav, zukan, 0x2F120F17)
+    sav[zukan + 0xF0] = 0b101  # vistos: especies 1 y 3
+    sav[zukan + 0x88] = 0b1  # capturados: especie 1
+    for destino, fecha in ((party, (23, 5, 1)), (boxes + 0xE8, (24, 6, 2))):
+        pk = bytearray(0xE8)
+        struct.pack_into("<IxxxxH", pk, 0, 0x1234567, 25)
+        pk[0xD4:0xD7] = bytes(fecha)
+        sav[destino:destino + 0xE8] = cifrar_pk7(pk)
+    sav[party + 6 * 0x104] = 1
+    with open(ruta, "wb") as fh:
+        fh.write(sav)
+
+
+@pytest.mark.parametrize("juego", ["SM", "USUM"])
+def test_tabla_pkhex_contigua(juego):
+    # Cada bloque empieza en el primer múltiplo de 0x200 tras el anterior (así los coloca el juego).
+    tabla = PKHEX[juego]
+    for (ofs, largo), (siguiente, _) in zip(tabla, tabla[1:]):
+        assert siguiente == -(-(ofs + largo) // 0x200) * 0x200
+
+
+@pytest.mark.parametrize("juego", ["SM", "USUM"])
+def test_offsets_desde_la_tabla_del_save(tmp_path, juego):
+    ruta = str(tmp_path / "main")
+    _save_a_mano(ruta, juego)
+    with open(ruta, "rb") as fh:
+        info = fh.read()[-0x1F0:]
+    esperado = {nombre: PKHEX[juego][i] for nombre, i in save_gen7.NUM_BLOQUES.items()}
+    assert save_gen7.bloques_save(info, os.path.getsize(ruta)) == esperado
+    datos = save_gen7.decodificar_save(ruta)
+    assert datos["Trainer"]["Name"] == "Real"
+    assert (datos["Trainer"]["TID"], datos["Trainer"]["SID"]) == (111, 222)
+    assert datos["Trainer"]["Money"] == 987654
+    assert datos["Trainer"]["PlayTime"] == "7ː08ː09"
+    assert datos["Trainer"]["GameVersion"] == ("SN" if juego == "SM" else "US")
+    assert (datos["Pokedex"]["Seen"], datos["Pokedex"]["Caught"]) == (2, 1)
+    assert [mon["SpeciesId"] for mon in datos["Party"]] == [25]
+    # El último capturado está en la caja 1, slot 2: el bloque de cajas se lee en su sitio.
+    assert datos["Last"]["MetDate"] == "2024-06-02"
+    inventario = save_gen7.inventario_cajas(ruta)
+    assert (list(inventario.columnas["caja"]), list(inventario.columnas["slot"])) == ([1], [2])
+
+
+@pytest.mark.parametrize("juego", ["SM", "USUM"])
+def test_fixtures_del_bench_siguen_a_pkhex(tmp_path, juego):
+    ruta = str(tmp_path / "main")
+    escribir_save(ruta, n_party=3, cajas_llenas=2, juego=juego, tiempo=(101, 2, 3))
+    with open(ruta, "rb") as fh:
+        info = fh.read()[-0x1F0:]
+    size = os.path.getsize(ruta)
+    assert save_gen7.bloques_save(info, size) == {n: PKHEX[juego][i] for n, i in save_gen7.NUM_BLOQUES.items()}
+    datos = save_gen7.decodificar_save(ruta)
+    max_species = {j: m for j, m in SAVE_SIZES.values()}[juego]
+    assert datos["Trainer"]["Name"] == "Bench"
+    assert datos["Trainer"]["Money"] == 123456
+    assert datos["Trainer"]["PlayTime"] == "101ː02ː03"
+    assert datos["Trainer"]["GameVersion"] == ("UM" if juego == "USUM" else "MN")
+    assert datos["Pokedex"]["MaxSpecies"] == max_species
+    assert datos["Pokedex"]["Seen"] == max_species
+    assert [mon["SpeciesId"] for mon in datos["Party"]] == [1, 4, 7]
+
+
+def test_layout_de_otro_juego_cae_al_wrapper(tmp_path):
+    # Bloques de SM en un archivo del tamaño de USUM: el lector nativo no debe inventar datos.
+    ruta = str(tmp_path / "main")
+    escribir_save(ruta, juego="SM")
+    with open(ruta, "ab") as fh:
+        fh.write(bytes(0x6CC00 - 0x6BE00))
+    with pytest.raises(SaveNoSoportado):
+        save_gen7.decodificar_save(ruta)
+    assert save_gen7.leer_save(ruta, lambda r: {"wrapper": True}) == {"wrapper": True}
+
+
+def _saves_pkhex():
+    rutas = [r for r in os.environ.get("HUD_SAVES_PKHEX", "").split(os.pathsep) if r]
+    return rutas or [pytest.param(None, marks=pytest.mark.skip(reason="sin HUD_SAVES_PKHEX (saves reales)"))]
+
+
+@pytest.mark.parametrize("ruta", _saves_pkhex())
+def test_coincide_con_pkhex(ruta):
+    """Saves reales (`HUD_SAVES_PKHEX=ruta1:ruta2`): el lector nativo da lo mismo que el wrapper de PKHeX."""
+    if shutil.which("dotnet") is None:
+        pytest.skip("dotnet no disponible")
+    salida = subprocess.run(
+        ["dotnet", "run", "--project", DIR_PROYECTO, "--", ruta, "--bits"],
+        capture_output=True, text=True, check=True, timeout=300,
+    ).stdout
+    pkhex = json.loads(salida.strip().splitlines()[-1])
+    nativo = save_gen7.decodificar_save(ruta)
+    for campo in ("Name", "TID", "SID", "Money", "PlayTime", "GameVersion"):
+        assert nativo["Trainer"][campo] == pkhex["Trainer"][campo], campo
+    for campo in ("Seen", "Caught", "MaxSpecies"):
+        assert nativo["Pokedex"][campo] == pkhex["Pokedex"][campo], campo
+    for campo in ("SeenBits", "CaughtBits"):
+        assert nativo["Pokedex"][campo] == BitsetEspecies.desde_base64(pkhex["Pokedex"][campo]), campo
+    campos_equipo = ("SpeciesId", "Nickname", "Level", "OT", "Ball")
+    assert [{c: m[c] for c in campos_equipo} for m in nativo["Party"]] == [
+        {c: m[c] for c in campos_equipo} for m in pkhex["Party"]
+    ]
+
+
+@pytest.mark.parametrize("juego", ["SM", "USUM"])
+def test_detector_vigila_los_bloques_del_save(tmp_path, juego):
+    ruta = str(tmp_path / "main")
+    _save_a_mano(ruta, juego)
+    detector = save_gen7.DetectorCambios()
+    assert detector.cambios(ruta) == set(save_gen7.NOMBRES_SECCIONES)
+    assert detector.cambios(ruta) == set()
+    # Un byte dentro de lo que lee el HUD de cada bloque (offsets de PKHeX) solo mueve su sección.
+    for bloque, seccion, ofs in ((3, "trainer", 0x38), (9, "trainer", 0x04), (16, "time", 0), (4, "party", 0x10),
+                                 (6, "dex", 0xF0), (14, "boxes", 0x10)):
+        with open(ruta, "r+b") as fh:
+            fh.seek(PKHEX[juego][bloque][0] + ofs)
+            byte = fh.read(1)[0]
+            fh.seek(-1, os.SEEK_CUR)
+            fh.write(bytes([byte ^ 0xFF]))
+        assert detector.cambios(ruta) == {seccion}, bloque
+
+
+def test_slots_corruptos_no_mandan_las_cajas_al_wrapper(tmp_path):
+    ruta = str(tmp_path / "main")
+    escribir_save(ruta, cajas_llenas=0)
+    # Datos en el bloque de cajas que no pasan ningún checksum: slots corruptos, se descartan.
+    with open(ruta, "r+b") as fh:
+        fh.seek(PKHEX_USUM[14][0])
+        fh.write(bytes(range(256)) * (save_gen7.REGIONES["boxes"] // 256))
+
+    def sin_wrapper(r):
+        raise AssertionError("no debía usarse el wrapper")
+
+    assert len(save_gen7.leer_cajas(ruta, sin_wrapper)) == 0
+
+
+def test_tabla_de_bloques_no_valida_cae_al_wrapper(tmp_path):
+    ruta = str(tmp_path / "main")
+    escribir_save(ruta, cajas_llenas=2)
+    # Entrada del bloque 14 (BoxPokemon) más corta que las 32 cajas: el layout no es el esperado.
+    with open(ruta, "r+b") as fh:
+        fh.seek(0x6CC00 - 0x1F0 + 4 + 8 * 14)
+        fh.write(struct.pack("<I", 0x100))
+    with pytest.raises(SaveNoSoportado):
+        save_gen7.inventario_cajas(ruta)
+    registros = [{"Box": 1, "Slot": 1, "SpeciesId": 25, "Nickname": "Pika", "Level": 5}]
+    assert len(save_gen7.leer_cajas(ruta, lambda r: registros)) == 1
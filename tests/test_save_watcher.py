@@ -0,0 +1,60 @@
+"""Bucle de `save_watcher`: fallos por vuelta y errores al consultar el archivo."""
+import os
+import threading
+
+import save_watcher
+from save_watcher import WatcherPolling, crear_watcher, firma_archivo
+
+
+def _tocar(ruta, contenido):
+    with open(ruta, "wb") as fh:
+        fh.write(contenido)
+
+
+def test_firma_de_archivo_inaccesible_no_cuenta_como_cambio(tmp_path, monkeypatch):
+    ruta = str(tmp_path / "main")
+    _tocar(ruta, b"x")
+    firma = firma_archivo(ruta)
+    assert firma is not None
+    assert firma_archivo(str(tmp_path / "no-existe"), firma) is None
+
+    def stat_denegado(_ruta):
+        raise PermissionError(13, "Permission denied")
+
+    monkeypatch.setattr(save_watcher.os, "stat", stat_denegado)
+    assert firma_archivo(ruta, firma) == firma
+    assert not save_watcher.falta_archivo(ruta)
+
+
+def _vigila_tras_un_fallo(watcher_para, tmp_path):
+    ruta = str(tmp_path / "main")
+    _tocar(ruta, b"a")
+    llamadas, errores = [], []
+    segunda = threading.Event()
+
+    def al_cambiar(r):
+        llamadas.append(r)
+        if len(llamadas) == 1:
+            raise RuntimeError("fallo en el callback")
+        segunda.set()
+
+    watcher = watcher_para(ruta, al_cambiar, errores.append).iniciar()
+    try:
+        # Una sola escritura: la recarga que falló se reintenta sin esperar a otro cambio del archivo.
+        threading.Event().wait(0.2)
+        _tocar(ruta, b"bb")
+        os.utime(ruta, ns=(2 * 10**9, 2 * 10**9))
+        assert segunda.wait(3)
+        threading.Event().wait(0.3)
+    finally:
+        watcher.detener()
+    assert [type(ex) for ex in errores] == [RuntimeError]
+    assert llamadas == [ruta, ruta]
+
+
+def test_polling_reintenta_tras_un_fallo(tmp_path):
+    _vigila_tras_un_fallo(lambda r, c, e: WatcherPolling(r, c, al_error=e, intervalo=0.02), tmp_path)
+
+
+def test_watcher_por_defecto_reintenta_tras_un_fallo(tmp_path):
+    _vigila_tras_un_fallo(lambda r, c, e: crear_watcher(r, c, al_error=e), tmp_path)
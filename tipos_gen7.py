@@ -0,0 +1,97 @@
+"""
+Tabla de efectividad de tipos de Gen 7 (18 x 18) incluida con la app y análisis de tipos del equipo.
+
+La tabla no necesita red ni el pack de datos: se carga al importar como un array de NumPy
+[atacante][defensor] en el orden de `TYPES`. El análisis del equipo se calcula en una sola pasada
+vectorizada sobre la rejilla equipo x tipo atacante.
+"""
+import numpy as np
+
+from pokeapi_parse import TYPE_INDEX, TYPES
+
+# Multiplicador x2 por fila (atacante) y columna (defensor): 0 inmune, 1 = x0.5, 2 = x1, 4 = x2.
+# Columnas: nor fig fly poi gro roc bug gho ste fir wat gra ele psy ice dra dar fai
+_TABLA = (
+    "2 2 2 2 2 1 2 0 1 2 2 2 2 2 2 2 2 2",  # normal
+    "4 2 1 1 2 4 1 0 4 2 2 2 2 1 4 2 4 1",  # fighting
+    "2 4 2 2 2 1 4 2 1 2 2 4 1 2 2 2 2 2",  # flying
+    "2 2 2 1 1 1 2 1 0 2 2 4 2 2 2 2 2 4",  # poison
+    "2 2 0 4 2 4 1 2 4 4 2 1 4 2 2 2 2 2",  # ground
+    "2 1 4 2 1 2 4 2 1 4 2 2 2 2 4 2 2 2",  # rock
+    "2 1 1 1 2 2 2 1 1 1 2 4 2 4 2 2 4 1",  # bug
+    "0 2 2 2 2 2 2 4 2 2 2 2 2 4 2 2 1 2",  # ghost
+    "2 2 2 2 2 4 2 2 1 1 1 2 1 2 4 2 2 4",  # steel
+    "2 2 2 2 2 1 4 2 4 1 1 4 2 2 4 1 2 2",  # fire
+    "2 2 2 2 4 4 2 2 2 4 1 1 2 2 2 1 2 2",  # water
+    "2 2 1 1 4 4 1 2 1 1 4 1 2 2 2 1 2 2",  # grass
+    "2 2 4 2 0 2 2 2 2 2 4 1 1 2 2 1 2 2",  # electric
+    "2 4 2 4 2 2 2 2 1 2 2 2 2 1 2 2 0 2",  # psychic
+    "2 2 4 2 4 2 2 2 1 1 1 4 2 2 1 4 2 2",  # ice
+    "2 2 2 2 2 2 2 2 1 2 2 2 2 2 2 4 2 0",  # dragon
+    "2 1 2 2 2 2 2 4 2 2 2 2 2 4 2 2 1 1",  # dark
+    "2 4 2 1 2 2 2 2 1 1 2 2 2 2 2 4 4 2",  # fairy
+)
+MATRIZ = np.array([fila.split() for fila in _TABLA], dtype=np.float32) / 2
+MATRIZ.setflags(write=False)
+
+# Columna extra de unos: el "segundo tipo" de un Pokémon de un solo tipo.
+_SIN_TIPO = len(TYPES)
+_MATRIZ_EXT = np.hstack([MATRIZ, np.ones((len(TYPES), 1), dtype=np.float32)])
+
+
+def _indices(tipos):
+    """(tipo1, tipo2) como índices de `_MATRIZ_EXT`; acepta nombres de PokeAPI en cualquier capitalización."""
+    idx = [TYPE_INDEX[t.lower()] for t in tipos[:2] if t.lower() in TYPE_INDEX]
+    idx += [_SIN_TIPO] * (2 - len(idx))
+    return idx
+
+
+def multiplicadores_defensa(tipos):
+    """Vector (18,) con el multiplicador que recibe un Pokémon de `tipos` de cada tipo atacante."""
+    t1, t2 = _indices(tipos)
+    return _MATRIZ_EXT[:, t1] * _MATRIZ_EXT[:, t2]
+
+
+def relaciones_de_tipos(tipos):
+    """Debilidades, resistencias e inmunidades con el mismo formato que `pokeapi_parse.relaciones_de_dano`."""
+    mult = multiplicadores_defensa(tipos)
+    return {
+        "weaknesses": [TYPES[i].capitalize() for i in np.flatnonzero(mult > 1)],
+        "resistances": [TYPES[i].capitalize() for i in np.flatnonzero((mult > 0) & (mult < 1))],
+        "immunities": [TYPES[i].capitalize() for i in np.flatnonzero(mult == 0)],
+    }
+
+
+def analisis_equipo(tipos_equipo):
+    """
+    `tipos_equipo`: lista con los tipos de cada miembro del equipo.
+
+    Devuelve la rejilla (miembros x tipo atacante) y, a partir de ella:
+    - debilidades_compartidas: [(tipo, débiles, resisten)] para tipos que golpean x2 a 2+ miembros;
+    - sin_resistencia: tipos atacantes que ningún miembro resiste ni bloquea;
+    - cobertura / sin_cobertura: tipos defensores a los que el equipo pega x2 (o no) con sus propios tipos.
+    """
+    if not tipos_equipo:
+        return None
+    idx = np.array([_indices(tipos) for tipos in tipos_equipo])
+    rejilla = _MATRIZ_EXT[:, idx[:, 0]].T * _MATRIZ_EXT[:, idx[:, 1]].T
+
+    debiles = (rejilla > 1).sum(axis=0)
+    resisten = (rejilla < 1).sum(axis=0)
+    orden = np.argsort(-debiles, kind="stable")
+    compartidas = [
+        (TYPES[i].capitalize(), int(debiles[i]), int(resisten[i]))
+        for i in orden
+        if debiles[i] >= 2
+    ]
+
+    # Ofensiva: mejor multiplicador de cualquiera de los tipos del equipo contra cada tipo defensor.
+    atacantes = np.unique(idx[idx != _SIN_TIPO])
+    mejor = MATRIZ[atacantes].max(axis=0) if atacantes.size else np.ones(len(TYPES), dtype=np.float32)
+    return {
+        "rejilla": rejilla,
+        "debilidades_compartidas": compartidas,
+        "sin_resistencia": [TYPES[i].capitalize() for i in np.flatnonzero(resisten == 0)],
+        "cobertura": [TYPES[i].capitalize() for i in np.flatnonzero(mejor > 1)],
+        "sin_cobertura": [TYPES[i].capitalize() for i in np.flatnonzero(mejor <= 1)],
+    }
@@ -0,0 +1,207 @@
+"""
+Trazas por tramos del flujo save → parse → PokeAPI → render.
+
+Un tramo mide un bloque `with` y se anida solo con el tramo abierto en el mismo hilo. Para seguir
+el trabajo entre hilos (watcher → hilo de Tk → pool → hilo de Tk) se captura `enlace()` donde se
+encarga el trabajo y se pasa como `padre=` al tramo del otro hilo; en la exportación queda como
+una flecha de flujo.
+
+Desactivadas por defecto: `tramo()` devuelve entonces un objeto nulo compartido y no se registra
+nada. Se activan con `activar()` o con la variable de entorno `HUD_TRAZAS=ruta.json` (se exporta
+a esa ruta al salir). `exportar_chrome` escribe el formato trace-event de Chrome, que abren
+`chrome://tracing` y https://ui.perfetto.dev.
+"""
+import atexit
+import itertools
+import json
+import os
+import statistics
+import threading
+import time
+from collections import deque
+
+# Eventos que se guardan como máximo; los más antiguos se descartan.
+MAX_TRAMOS = 200_000
+RUTA_ENTORNO = os.environ.get("HUD_TRAZAS") or None
+
+_activas = False
+_tramos = deque(maxlen=MAX_TRAMOS)
+_hilos = {}
+_ids = itertools.count(1)
+_local = threading.local()
+
+
+def _pila():
+    pila = getattr(_local, "pila", None)
+    if pila is None:
+        pila = _local.pila = []
+        hilo = threading.current_thread()
+        _hilos[hilo.ident] = hilo.name
+    return pila
+
+
+class Tramo:
+    __slots__ = ("nombre", "id", "padre", "enlace_ns", "atributos", "hilo", "inicio_ns", "fin_ns")
+
+    def __init__(self, nombre, padre, atributos):
+        self.nombre = nombre
+        self.id = next(_ids)
+        self.padre = None
+        self.enlace_ns = None
+        if isinstance(padre, tuple):
+            self.padre, self.enlace_ns = padre
+        self.atributos = atributos
+        self.hilo = None
+        self.inicio_ns = None
+        self.fin_ns = None
+
+    def set(self, **atributos):
+        self.atributos.update(atributos)
+        return self
+
+    def __enter__(self):
+        pila = _pila()
+        if self.padre is None and pila:
+            self.padre = pila[-1]
+        pila.append(self)
+        self.hilo = threading.get_ident()
+        self.inicio_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, tipo, valor, tb):
+        self.fin_ns = time.perf_counter_ns()
+        pila = _pila()
+        if pila and pila[-1] is self:
+            pila.pop()
+        if tipo is not None:
+            self.atributos["error"] = tipo.__name__
+        _tramos.append(self)
+        return False
+
+
+class _TramoNulo:
+    __slots__ = ()
+
+    def set(self, **atributos):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, tb):
+        return False
+
+
+_NULO = _TramoNulo()
+
+
+def tramo(nombre, padre=None, **atributos):
+    """Context manager que mide el bloque; `padre` es un `enlace()` capturado en otro hilo."""
+    if not _activas:
+        return _NULO
+    return Tramo(nombre, padre, atributos)
+
+
+def registrar(nombre, inicio_ns, fin_ns=None, **atributos):
+    """Tramo ya medido (p. ej. desde el arranque del proceso) en el hilo actual; `fin_ns` None = ahora."""
+    if not _activas:
+        return
+    t = Tramo(nombre, None, atributos)
+    _pila()
+    t.hilo = threading.get_ident()
+    t.inicio_ns = inicio_ns
+    t.fin_ns = time.perf_counter_ns() if fin_ns is None else fin_ns
+    _tramos.append(t)
+
+
+def enlace():
+    """Tramo abierto en este hilo y el instante actual, para `tramo(..., padre=enlace)` en otro hilo."""
+    if not _activas:
+        return None
+    pila = _pila()
+    return (pila[-1], time.perf_counter_ns()) if pila else None
+
+
+def activas():
+    return _activas
+
+
+def activar():
+    global _activas
+    _activas = True
+
+
+def desactivar():
+    global _activas
+    _activas = False
+
+
+def limpiar():
+    _tramos.clear()
+
+
+def resumen():
+    """{nombre: {n, total_ms, mediana_ms, max_ms}} de los tramos registrados, por tiempo total."""
+    duraciones = {}
+    for t in list(_tramos):
+        duraciones.setdefault(t.nombre, []).append((t.fin_ns - t.inicio_ns) / 1e6)
+    salida = {}
+    for nombre, ms in sorted(duraciones.items(), key=lambda kv: -sum(kv[1])):
+        salida[nombre] = {
+            "n": len(ms),
+            "total_ms": round(sum(ms), 3),
+            "mediana_ms": round(statistics.median(ms), 3),
+            "max_ms": round(max(ms), 3),
+        }
+    return salida
+
+
+def eventos_chrome():
+    """Lista de eventos trace-event: un "X" por tramo y un par "s"/"f" por cada salto entre hilos."""
+    pid = os.getpid()
+    tramos = list(_tramos)
+    origen = min((t.inicio_ns for t in tramos), default=0)
+
+    def us(ns):
+        return (ns - origen) / 1000.0
+
+    eventos = [
+        {"ph": "M", "name": "thread_name", "pid": pid, "tid": tid, "args": {"name": nombre}}
+        for tid, nombre in list(_hilos.items())
+    ]
+    for t in tramos:
+        args = dict(t.atributos, id=t.id)
+        if t.padre is not None:
+            args["padre"] = t.padre.id
+        eventos.append({
+            "name": t.nombre,
+            "cat": t.nombre.split(".", 1)[0],
+            "ph": "X",
+            "ts": us(t.inicio_ns),
+            "dur": (t.fin_ns - t.inicio_ns) / 1000.0,
+            "pid": pid,
+            "tid": t.hilo,
+            "args": args,
+        })
+        if t.enlace_ns is not None and t.padre is not None and t.padre.hilo != t.hilo:
+            comun = {"name": "encargo", "cat": "flujo", "id": t.id, "pid": pid}
+            eventos.append(dict(comun, ph="s", ts=us(t.enlace_ns), tid=t.padre.hilo))
+            eventos.append(dict(comun, ph="f", bp="e", ts=us(t.inicio_ns), tid=t.hilo))
+    return eventos
+
+
+def exportar_chrome(ruta):
+    """Escribe las trazas registradas (JSON trace-event). Devuelve cuántos tramos se exportaron."""
+    eventos = eventos_chrome()
+    carpeta = os.path.dirname(os.path.abspath(ruta))
+    os.makedirs(carpeta, exist_ok=True)
+    tmp = f"{ruta}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"traceEvents": eventos, "displayTimeUnit": "ms"}, fh, ensure_ascii=False, default=str)
+    os.replace(tmp, ruta)
+    return sum(1 for e in eventos if e["ph"] == "X")
+
+
+if RUTA_ENTORNO:
+    activar()
+    atexit.register(lambda: exportar_chrome(RUTA_ENTORNO))
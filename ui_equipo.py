@@ -1,456 +1,171 @@
 """
 UI que muestra el equipo del save con sprites y datos (wrapper + PokeAPI).
 Al hacer clic en un Pokémon se abre la info de Pokédex.
+
+Arranque en caliente: la ventana pinta la instantánea de la sesión anterior (`instantanea.py`) y la
+lectura fresca del save la reconcilia en segundo plano. NumPy (lector nativo, análisis de tipos) y
+Pillow se importan al primer uso, fuera del camino hasta el primer cuadro.
 """
-import json
+import functools
+import importlib.util
 import os
-import subprocess
+import queue
 import sys
-import threading
 import time
-from io import BytesIO
-
-RUTA_PROYECTO = r"C:\Users\danie\Documents\HUD-PokeCompanion\PokeLastCatch"
-RUTA_SAVE = r"C:\Users\danie\AppData\Roaming\Azahar\sdmc\Nintendo 3DS\00000000000000000000000000000000\00000000000000000000000000000000\title\00040000\001b5100\data\00000001\main"
+from concurrent.futures import ThreadPoolExecutor
+
+import trazas
+from companion_engine import PARSE_WORKERS, RUTA_PROYECTO, RUTA_SAVE, ColaParseo, crear_motor, etiquetas_saves
+from gamedata_pack import MAX_SPECIES_GEN7, cargar_pack
+from historial_progreso import historial_para
+from indice_pokedex import FILTROS, IndicePokedex, bitsets_pokedex
+from instantanea import cargar_instantanea, guardar_instantanea
+from inventario_cajas import SLOTS_POR_CAJA, fecha_a_entero, nombre_ball
+from sprite_cache import LRU, MAX_SPRITES_MEMORIA, SpriteCache
+from save_watcher import crear_watcher
+from wrapper_daemon import obtener_daemon
+
+# Inicio del arranque (módulo ya importado); el primer cuadro y la primera lectura se miden desde aquí.
+INICIO_NS = time.perf_counter_ns()
 
 # Tamaño del sprite en la UI
 SPRITE_SIZE = 96
 SPRITE_POKEDEX = 128
-POLL_SECONDS = 1.0
-SAVE_DEBOUNCE_SECONDS = 0.6
+# Hilos para las consultas de PokeAPI/sprites de las tarjetas (acotado para no saturar la API).
+FETCH_WORKERS = 6
 LOG_EVO_API = True
-
-
-def leer_wrapper(ruta_save: str = RUTA_SAVE):
-    proc = subprocess.run(
-        ["dotnet", "run", "--project", RUTA_PROYECTO, "--", ruta_save],
-        capture_output=True,
-        text=True,
-        cwd=RUTA_PROYECTO,
-    )
-    if proc.returncode != 0:
-        raise RuntimeError(proc.stderr or proc.stdout or "Error al ejecutar wrapper")
-    return json.loads(proc.stdout)
-
-
-def main():
+# Pokédex completa: alto fijo de fila (para saber cuántas caben) y espera tras la última tecla.
+DEX_ROW_HEIGHT = 22
+DEX_HEADER_HEIGHT = 26
+SEARCH_DEBOUNCE_MS = 120
+# Cada cuánto el hilo de Tk recoge lo que le dejan los hilos de fondo (parseo, watcher, pool).
+COLA_TK_MS = 15
+# Historial de progreso: etiqueta -> columna del historial, y periodos (segundos; None = todo).
+METRICAS_HISTORIAL = {
+    "Capturados": "capturados",
+    "Vistos": "vistos",
+    "Dinero": "dinero",
+    "Nivel medio del equipo": "nivel_medio",
+    "Nivel máximo del equipo": "nivel_max",
+}
+PERIODOS_HISTORIAL = {"Última hora": 3600, "Últimas 24 h": 86400, "Últimos 7 días": 7 * 86400, "Todo": None}
+
+
+def crear_detector():
+    """`save_gen7.DetectorCambios` (importa NumPy; se llama desde el pool) o None sin NumPy."""
     try:
-        import requests
-        from PIL import Image, ImageTk
-        import tkinter as tk
-        from tkinter import ttk, messagebox
-    except ImportError as e:
-        print("Dependencias necesarias: pip install requests Pillow")
-        sys.exit(1)
+        from save_gen7 import DetectorCambios
+    except ImportError:
+        # Sin NumPy se usa siempre el wrapper .NET y cada cambio del archivo se recarga entero.
+        return None
+    return DetectorCambios()
 
-    session = requests.Session()
-    session.headers.update({"User-Agent": "HUD-PokeCompanion/1.0"})
 
-    species_names_cache = {}
-    pokemon_data_cache = {}
-    species_data_cache = {}
-    evolution_info_cache = {}
+@functools.lru_cache(maxsize=None)
+def analisis_equipo():
+    """`tipos_gen7.analisis_equipo`, o None sin NumPy (no hay panel de análisis del equipo)."""
+    try:
+        from tipos_gen7 import analisis_equipo as analizar
+    except ImportError:
+        return None
+    return analizar
 
-    def api_get_json(url, timeout=12, retries=3, log=False, log_tag="api"):
-        last_error = None
-        for attempt in range(retries):
-            t0 = time.perf_counter()
-            try:
-                r = session.get(url, timeout=timeout)
-                r.raise_for_status()
-                if log and LOG_EVO_API:
-                    ms = int((time.perf_counter() - t0) * 1000)
-                    print(f"[{log_tag}] OK intento {attempt + 1}/{retries} [{r.status_code}] {ms}ms -> {url}", flush=True)
-                return r.json()
-            except requests.RequestException as ex:
-                last_error = ex
-                if log and LOG_EVO_API:
-                    ms = int((time.perf_counter() - t0) * 1000)
-                    status = "-"
-                    if getattr(ex, "response", None) is not None:
-                        status = str(ex.response.status_code)
-                    print(f"[{log_tag}] ERROR intento {attempt + 1}/{retries} [HTTP {status}] {ms}ms -> {url} | {ex}", flush=True)
-                # Backoff simple para absorber fallos temporales / rate limit.
-                time.sleep(0.35 * (attempt + 1))
-        if log and LOG_EVO_API:
-            print(f"[{log_tag}] FALLO FINAL tras {retries} intentos -> {url}", flush=True)
-        raise last_error if last_error else RuntimeError("Error consultando API")
-
-    def cargar_sprite(url, size=SPRITE_SIZE):
-        if not url:
-            return None
-        try:
-            r = requests.get(url, timeout=10)
-            r.raise_for_status()
-            img = Image.open(BytesIO(r.content)).convert("RGBA")
-            img = img.resize((size, size), Image.Resampling.LANCZOS)
-            return ImageTk.PhotoImage(img)
-        except Exception:
-            return None
 
-    def obtener_datos_pokeapi(species_id):
-        if species_id in pokemon_data_cache:
-            pj = pokemon_data_cache[species_id]
-            nombre = pj["name"].capitalize()
-            sprite_url = (
-                pj["sprites"].get("front_default")
-                or pj["sprites"].get("front_female")
-                or ""
-            )
-            return nombre, sprite_url
-        try:
-            r = requests.get(
-                f"https://pokeapi.co/api/v2/pokemon/{species_id}",
-                timeout=10,
-            )
-            r.raise_for_status()
-            pj = r.json()
-            pokemon_data_cache[species_id] = pj
-            nombre = pj["name"].capitalize()
-            sprite_url = (
-                pj["sprites"].get("front_default")
-                or pj["sprites"].get("front_female")
-                or ""
-            )
-            return nombre, sprite_url
-        except Exception:
-            return f"Species {species_id}", ""
+def leer_wrapper_dotnet(ruta_save: str = RUTA_SAVE):
+    # El wrapper corre en modo persistente (`--server`): solo el primer refresco paga el arranque de .NET.
+    return obtener_daemon(RUTA_PROYECTO).parse(ruta_save)
 
-    def _extract_id_from_url(url):
-        try:
-            return int(url.rstrip("/").split("/")[-1])
-        except Exception:
-            return None
 
-    def _get_species_json(species_id):
-        if species_id in species_data_cache:
-            return species_data_cache[species_id]
-        data = api_get_json(
-            f"https://pokeapi.co/api/v2/pokemon-species/{species_id}",
-            timeout=12,
-            retries=4,
-            log=True,
-            log_tag=f"evo-species-{species_id}",
-        )
-        species_data_cache[species_id] = data
-        return data
-
-    def _get_pokemon_json(pokemon_id):
-        if pokemon_id in pokemon_data_cache:
-            return pokemon_data_cache[pokemon_id]
-        data = api_get_json(
-            f"https://pokeapi.co/api/v2/pokemon/{pokemon_id}",
-            timeout=12,
-            retries=4,
-            log=True,
-            log_tag=f"evo-pokemon-{pokemon_id}",
-        )
-        pokemon_data_cache[pokemon_id] = data
-        return data
-
-    def _format_evolution_condition(details):
-        """Normaliza evolution_details de PokeAPI a un texto legible."""
-        if not details:
-            return "Condicion especial"
-
-        # Helpers para nombres legibles
-        def norm_name(node, fallback=""):
-            if not node:
-                return fallback
-            return str(node.get("name", fallback)).replace("-", " ").title()
-
-        min_level = details.get("min_level")
-        item_name = norm_name(details.get("item"))
-        held_item = norm_name(details.get("held_item"))
-        trigger = norm_name(details.get("trigger"), "Especial")
-        min_happiness = details.get("min_happiness")
-        min_affection = details.get("min_affection")
-        min_beauty = details.get("min_beauty")
-        time_of_day = details.get("time_of_day", "")
-        known_move = norm_name(details.get("known_move"))
-        known_move_type = norm_name(details.get("known_move_type"))
-        location = norm_name(details.get("location"))
-        trade_species = norm_name(details.get("trade_species"))
-
-        # Prioridad de condiciones frecuentes
-        if min_level is not None:
-            extra = []
-            if time_of_day:
-                extra.append(f"de {time_of_day}")
-            if known_move:
-                extra.append(f"con {known_move}")
-            if location:
-                extra.append(f"en {location}")
-            return "Nivel " + str(min_level) + (f" ({', '.join(extra)})" if extra else "")
-
-        if item_name:
-            return f"Usar {item_name}"
-
-        if trigger == "Trade":
-            if held_item:
-                return f"Intercambio con {held_item}"
-            if trade_species:
-                return f"Intercambio por {trade_species}"
-            return "Intercambio"
-
-        if min_happiness is not None:
-            return f"Amistad {min_happiness}+"
-        if min_affection is not None:
-            return f"Afecto {min_affection}+"
-        if min_beauty is not None:
-            return f"Belleza {min_beauty}+"
-        if known_move:
-            return f"Conoce {known_move}"
-        if known_move_type:
-            return f"Conoce movimiento tipo {known_move_type}"
-        if location:
-            return f"Subir nivel en {location}"
-
-        return trigger
-
-    def obtener_siguiente_evolucion(species_id):
-        """
-        Devuelve:
-        {
-            "status": "ok" | "no_evolution" | "error",
-            "next": [{"id", "name", "min_level", "condition", "sprite_url"}, ...]
-        }
-        """
-        try:
-            species_id = int(species_id)
-        except Exception:
-            return {"status": "error", "next": []}
+def cajas_wrapper_dotnet(ruta_save: str = RUTA_SAVE):
+    # Registros de las cajas por el mismo daemon; solo se usa si el lector nativo no reconoce el save.
+    return obtener_daemon(RUTA_PROYECTO).cajas(ruta_save)
 
-        if species_id in evolution_info_cache:
-            return evolution_info_cache[species_id]
 
-        try:
-            species_json = _get_species_json(species_id)
-            chain_url = species_json.get("evolution_chain", {}).get("url", "")
-            if not chain_url:
-                result = {"status": "no_evolution", "next": []}
-                evolution_info_cache[species_id] = result
-                return result
-
-            chain_json = api_get_json(
-                chain_url,
-                timeout=12,
-                retries=4,
-                log=True,
-                log_tag=f"evo-chain-{species_id}",
-            ).get("chain", {})
-
-            # Buscar nodo actual en el árbol de evolución
-            def find_node(node):
-                node_id = _extract_id_from_url(node.get("species", {}).get("url", ""))
-                if node_id == species_id:
-                    return node
-                for child in node.get("evolves_to", []):
-                    found = find_node(child)
-                    if found is not None:
-                        return found
+def main(al_iniciar=None, rutas=None):
+    """
+    `rutas`: saves a vigilar (por defecto, `RUTA_SAVE`); con varios, una pestaña por save.
+    `al_iniciar(hud)`: opcional, recibe las piezas internas antes del mainloop (lo usa bench/bench_hud.py).
+    """
+    rutas = list(dict.fromkeys(rutas or [RUTA_SAVE]))
+    # requests y Pillow solo se comprueban: se importan al primer uso (red, primer sprite).
+    if importlib.util.find_spec("requests") is None or importlib.util.find_spec("PIL") is None:
+        print("Dependencias necesarias: pip install requests Pillow")
+        sys.exit(1)
+    import tkinter as tk
+    from tkinter import ttk, messagebox
+
+    # Datos (PokeAPI, pack offline, sprites, nombres, save) en el motor compartido (companion_engine.py):
+    # usa el servicio local de cache si está levantado y, si no, la cache en disco de este proceso.
+    motor = crear_motor(
+        pack=cargar_pack(),
+        sprites=SpriteCache(),
+        ruta_proyecto=RUTA_PROYECTO,
+        leer_dotnet=leer_wrapper_dotnet,
+        leer_cajas_dotnet=cajas_wrapper_dotnet,
+        log=LOG_EVO_API,
+    )
+    obtener_datos_pokeapi = motor.datos_pokemon
+    obtener_siguiente_evolucion = motor.siguiente_evolucion
+    obtener_tipos = motor.tipos
+    obtener_info_pokedex = motor.info_pokedex
+    # Ventanas de la Pokédex completa que esperan el refresco del índice de nombres.
+    esperando_nombres = []
+
+    # PhotoImage por (url, tamaño); solo se usa desde el hilo de Tk.
+    fotos = LRU(MAX_SPRITES_MEMORIA)
+
+    def descargar_imagen(url, size=SPRITE_SIZE):
+        """Sprite redimensionado desde la cache de sprites (seguro fuera del hilo de Tk)."""
+        return motor.imagen(url, size)
+
+    def foto(url, size=SPRITE_SIZE, img=None):
+        """PhotoImage cacheada; `img` es la imagen ya preparada en segundo plano, si se tiene."""
+        if not url:
+            return None
+        photo = fotos.get((url, size))
+        if photo is None:
+            if img is None:
+                img = motor.imagen(url, size)
+            if img is None:
                 return None
+            from PIL import ImageTk
 
-            current_node = find_node(chain_json)
-            if not current_node:
-                result = {"status": "error", "next": []}
-                return result
-
-            next_entries = []
-            for evo in current_node.get("evolves_to", []):
-                evo_species_id = _extract_id_from_url(evo.get("species", {}).get("url", ""))
-                evo_name = evo.get("species", {}).get("name", "").replace("-", " ").title()
-                details = (evo.get("evolution_details") or [{}])[0]
-                min_level = details.get("min_level")
-                condition = _format_evolution_condition(details)
-
-                sprite_url = ""
-                if evo_species_id is not None:
-                    try:
-                        evo_pok = _get_pokemon_json(evo_species_id)
-                        sprite_url = (
-                            evo_pok.get("sprites", {}).get("front_default")
-                            or evo_pok.get("sprites", {}).get("front_female")
-                            or ""
-                        )
-                    except Exception:
-                        sprite_url = ""
-
-                next_entries.append(
-                    {
-                        "id": evo_species_id,
-                        "name": evo_name or (f"Species {evo_species_id}" if evo_species_id else "Desconocido"),
-                        "min_level": min_level,
-                        "condition": condition,
-                        "sprite_url": sprite_url,
-                    }
-                )
-
-            result = {
-                "status": "ok" if next_entries else "no_evolution",
-                "next": next_entries,
-            }
-            evolution_info_cache[species_id] = result
-            return result
-        except Exception as ex:
-            # No cacheamos fallos de red/timeout para permitir reintentos.
-            if LOG_EVO_API:
-                print(f"[evo-{species_id}] ERROR resolviendo cadena evolutiva: {ex}", flush=True)
-            return {"status": "error", "next": []}
+            with trazas.tramo("sprite.photoimage", size=size):
+                photo = ImageTk.PhotoImage(img)
+            fotos.put((url, size), photo)
+        return photo
 
     def obtener_nombres_especies(max_species):
-        """Obtiene nombres de especies por ID usando pokemon-species."""
-        if max_species in species_names_cache:
-            return species_names_cache[max_species]
+        """Nombres de especies por ID sin esperar a la red; si faltan, se piden en segundo plano."""
+        nombres = motor.nombres_especies(max_species)
+        if not motor.nombres_completos(max_species):
+            pedir_nombres(max_species)
+        return nombres
 
-        mapping = {}
-        try:
-            r = requests.get(
-                f"https://pokeapi.co/api/v2/pokemon-species?limit={max_species}",
-                timeout=20,
-            )
-            r.raise_for_status()
-            data = r.json()
-            for item in data.get("results", []):
-                name = item.get("name", "")
-                url = item.get("url", "")
-                if not url:
-                    continue
-                try:
-                    species_id = int(url.rstrip("/").split("/")[-1])
-                except Exception:
-                    continue
-                mapping[species_id] = name.replace("-", " ").title()
-        except Exception:
-            # Fallback silencioso: dejamos IDs sin nombre.
-            pass
+    def pedir_nombres(max_species=MAX_SPECIES_GEN7):
+        motor.pedir_nombres(max_species, al_terminar=nombres_refrescados)
+
+    def nombres_refrescados(ok):
+        if not ok:
+            return
 
-        species_names_cache[max_species] = mapping
-        return mapping
+        def avisar():
+            while esperando_nombres:
+                esperando_nombres.pop()()
 
-    def obtener_info_pokedex(species_id):
-        """Obtiene datos completos de pokemon, species y types para la ventana Pokédex."""
-        try:
-            r_pok = requests.get(
-                f"https://pokeapi.co/api/v2/pokemon/{species_id}",
-                timeout=10,
-            )
-            r_pok.raise_for_status()
-            pok = r_pok.json()
-            r_sp = requests.get(
-                f"https://pokeapi.co/api/v2/pokemon-species/{species_id}",
-                timeout=10,
-            )
-            r_sp.raise_for_status()
-            sp = r_sp.json()
-
-            types = [t["type"]["name"] for t in pok.get("types", [])]
-            type_names = [t.capitalize() for t in types]
-
-            # Debilidades, resistencias e inmunidades (agregando todos los tipos)
-            damage_mult = {}
-            for t in types:
-                r_ty = requests.get(f"https://pokeapi.co/api/v2/type/{t}", timeout=10)
-                r_ty.raise_for_status()
-                ty = r_ty.json()
-                dr = ty.get("damage_relations", {})
-                for weak in dr.get("double_damage_from", []):
-                    n = weak["name"]
-                    damage_mult[n] = damage_mult.get(n, 1) * 2
-                for res in dr.get("half_damage_from", []):
-                    n = res["name"]
-                    damage_mult[n] = damage_mult.get(n, 1) * 0.5
-                for imm in dr.get("no_damage_from", []):
-                    damage_mult[imm["name"]] = 0
-            weaknesses = [name.capitalize() for name, mult in damage_mult.items() if mult > 1]
-            resistances = [name.capitalize() for name, mult in damage_mult.items() if 0 < mult < 1]
-            immunities = [name.capitalize() for name, mult in damage_mult.items() if mult == 0]
-
-            # Stats base
-            stat_names_es = {"hp": "PS", "attack": "Ataque", "defense": "Defensa",
-                            "special-attack": "At. Esp.", "special-defense": "Def. Esp.", "speed": "Velocidad"}
-            stats = []
-            for s in pok.get("stats", []):
-                name = s["stat"]["name"]
-                stats.append((stat_names_es.get(name, name), s["base_stat"]))
-
-            # Habilidades
-            abilities = []
-            for a in pok.get("abilities", []):
-                name = a["ability"]["name"].replace("-", " ").title()
-                if a.get("is_hidden"):
-                    name += " (oculta)"
-                abilities.append(name)
-
-            # Movimientos que puede aprender (Gen 7: ultra-sun-ultra-moon o sun-moon)
-            moves_level = []
-            moves_tm = []
-            moves_egg = []
-            moves_tutor = []
-            for m in pok.get("moves", []):
-                move_name = m["move"]["name"].replace("-", " ").title()
-                for vg in m.get("version_group_details", []):
-                    if vg.get("version_group", {}).get("name") in ("ultra-sun-ultra-moon", "sun-moon"):
-                        method = vg.get("move_learn_method", {}).get("name", "")
-                        level = vg.get("level_learned_at", 0)
-                        if method == "level-up":
-                            moves_level.append((level, move_name))
-                        elif method == "machine":
-                            moves_tm.append(move_name)
-                        elif method == "egg":
-                            moves_egg.append(move_name)
-                        elif method == "tutor":
-                            moves_tutor.append(move_name)
-                        break
-            moves_level.sort(key=lambda x: x[0])
-            moves_tm = list(dict.fromkeys(moves_tm))
-            moves_egg = list(dict.fromkeys(moves_egg))
-            moves_tutor = list(dict.fromkeys(moves_tutor))
-
-            # Descripción y género en español
-            flavor = ""
-            for e in sp.get("flavor_text_entries", []):
-                if e.get("language", {}).get("name") == "es":
-                    flavor = e.get("flavor_text", "").replace("\n", " ")
-                    break
-            if not flavor and sp.get("flavor_text_entries"):
-                flavor = sp["flavor_text_entries"][0].get("flavor_text", "").replace("\n", " ")
-            genus = ""
-            for g in sp.get("genera", []):
-                if g.get("language", {}).get("name") == "es":
-                    genus = g.get("genus", "")
-                    break
-            if not genus and sp.get("genera"):
-                genus = sp["genera"][0].get("genus", "")
-
-            return {
-                "name": pok["name"].capitalize(),
-                "sprite_url": pok["sprites"].get("front_default") or pok["sprites"].get("front_female") or "",
-                "types": type_names,
-                "height": pok.get("height", 0) / 10.0,
-                "weight": pok.get("weight", 0) / 10.0,
-                "flavor_text": flavor,
-                "genus": genus,
-                "stats": stats,
-                "abilities": abilities,
-                "weaknesses": weaknesses,
-                "resistances": resistances,
-                "immunities": immunities,
-                "moves_level": moves_level,
-                "moves_tm": moves_tm,
-                "moves_egg": moves_egg,
-                "moves_tutor": moves_tutor,
-            }
-        except Exception:
-            return None
+        en_hilo_tk(avisar)
 
-    def abrir_pokedex(species_id, nickname="", level=""):
+    def cargar_ficha(species_id):
+        """Trabajo en segundo plano de la ficha: datos + sprite ya redimensionado (y la cadena evolutiva indexada)."""
         info = obtener_info_pokedex(species_id)
-        if not info:
-            messagebox.showerror("Error", "No se pudo cargar la información de la Pokédex.")
-            return
+        motor.linea_evolutiva(species_id)
+        img = descargar_imagen(info.sprite_url, size=SPRITE_POKEDEX) if info is not None else None
+        return info, img
+
+    def abrir_pokedex(species_id, nickname="", level=""):
+        """Abre la ventana al instante; si la ficha no está memorizada se rellena al llegar los datos."""
         win = tk.Toplevel(root)
-        win.title(f"Pokédex — {info['name']}")
+        win.title("Pokédex — Cargando...")
         win.geometry("420x560")
         win.resizable(True, True)
 
@@ -476,75 +191,115 @@ def main():
         canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
+        def completar(resultado):
+            if not win.winfo_exists():
+                return
+            info, img = resultado if not isinstance(resultado, Exception) else (None, None)
+            if info is None:
+                _on_close()
+                messagebox.showerror("Error", "No se pudo cargar la información de la Pokédex.")
+                return
+            for child in f.winfo_children():
+                child.destroy()
+            rellenar_ficha(win, f, species_id, info, foto(info.sprite_url, SPRITE_POKEDEX, img), nickname, level)
+
+        info = motor.info_en_memoria(species_id)
+        photo = fotos.get((info.sprite_url, SPRITE_POKEDEX)) if info is not None else None
+        if photo is not None:
+            # Segunda apertura: ficha memorizada y PhotoImage ya creada, sin pasar por el pool.
+            rellenar_ficha(win, f, species_id, info, photo, nickname, level)
+            return
+        ttk.Label(f, text="Cargando ficha...", style="Subtle.TLabel").pack(pady=20)
+        en_segundo_plano(cargar_ficha, completar, species_id)
+
+    def rellenar_ficha(win, f, species_id, info, photo, nickname, level):
+        win.title(f"Pokédex — {info.name}")
+
         # Sprite y título
-        photo = cargar_sprite(info["sprite_url"], size=SPRITE_POKEDEX)
         if photo:
-            ttk.Label(f, image=photo).image = photo
-            ttk.Label(f, image=photo).pack(pady=(0, 6))
-        titulo = info["name"]
+            sprite_lbl = ttk.Label(f, image=photo)
+            sprite_lbl.image = photo
+            sprite_lbl.pack(pady=(0, 6))
+        titulo = info.name
         if nickname and nickname.strip():
-            titulo = f"{nickname} ({info['name']})"
+            titulo = f"{nickname} ({info.name})"
         if level not in ("", "?"):
             titulo += f" — Nivel {level}"
         ttk.Label(f, text=titulo, font=("Segoe UI", 12, "bold")).pack()
-        if info.get("genus"):
-            ttk.Label(f, text=info["genus"], font=("Segoe UI", 10)).pack()
-        if info.get("types"):
-            ttk.Label(f, text="Tipo(s): " + ", ".join(info["types"]), font=("Segoe UI", 10)).pack()
-        ttk.Label(f, text=f"Altura: {info['height']:.1f} m  |  Peso: {info['weight']:.1f} kg", font=("Segoe UI", 10)).pack(pady=(2, 8))
-        if info.get("flavor_text"):
-            ttk.Label(f, text=info["flavor_text"], font=("Segoe UI", 9), wraplength=360, justify=tk.LEFT).pack(anchor=tk.W, pady=(0, 10))
+        if info.genus:
+            ttk.Label(f, text=info.genus, font=("Segoe UI", 10)).pack()
+        if info.types:
+            ttk.Label(f, text="Tipo(s): " + ", ".join(info.types), font=("Segoe UI", 10)).pack()
+        ttk.Label(f, text=f"Altura: {info.height:.1f} m  |  Peso: {info.weight:.1f} kg", font=("Segoe UI", 10)).pack(pady=(2, 8))
+        if info.flavor_text:
+            ttk.Label(f, text=info.flavor_text, font=("Segoe UI", 9), wraplength=360, justify=tk.LEFT).pack(anchor=tk.W, pady=(0, 10))
 
         def sep(title):
             ttk.Separator(f, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=(8, 4))
             ttk.Label(f, text=title, font=("Segoe UI", 10, "bold")).pack(anchor=tk.W)
 
+        # Línea evolutiva: consultas O(1) al índice de cadenas, que `cargar_ficha` ya dejó cargado.
+        linea = motor.linea_evolutiva(species_id, red=False)
+        if len(linea) > 1:
+            sep("Línea evolutiva")
+            etapas = {}
+            for etapa in linea:
+                etapas.setdefault(etapa["stage"], []).append(etapa["name"])
+            lines = [" → ".join(" / ".join(nombres) for _, nombres in sorted(etapas.items()))]
+            anterior = motor.evolucion_anterior(species_id, red=False)
+            if anterior is not None:
+                lines.append(f"Etapa anterior: {anterior['name']}")
+            finales = [e["name"] for e in motor.evoluciones_finales(species_id, red=False) if e["id"] != species_id]
+            if finales:
+                lines.append(f"Etapa final: {' / '.join(finales)}")
+            ttk.Label(f, text="\n".join(lines), font=("Segoe UI", 9), wraplength=360, justify=tk.LEFT).pack(anchor=tk.W)
+
         # Estadísticas base
         sep("Estadísticas base")
-        stats_text = "  |  ".join(f"{n}: {v}" for n, v in info.get("stats", []))
+        stats_text = "  |  ".join(f"{n}: {v}" for n, v in info.stats)
         ttk.Label(f, text=stats_text, font=("Segoe UI", 9), wraplength=360).pack(anchor=tk.W)
 
         # Habilidades
-        if info.get("abilities"):
+        if info.abilities:
             sep("Habilidades")
-            ttk.Label(f, text=", ".join(info["abilities"]), font=("Segoe UI", 9), wraplength=360).pack(anchor=tk.W)
+            ttk.Label(f, text=", ".join(info.abilities), font=("Segoe UI", 9), wraplength=360).pack(anchor=tk.W)
 
         # Debilidades / Resistencias / Inmunidades
         sep("Daño por tipo")
         parts = []
-        if info.get("weaknesses"):
-            parts.append("Debilidades: " + ", ".join(info["weaknesses"]))
-        if info.get("resistances"):
-            parts.append("Resistencias: " + ", ".join(info["resistances"]))
-        if info.get("immunities"):
-            parts.append("Inmunidades: " + ", ".join(info["immunities"]))
+        if info.weaknesses:
+            parts.append("Debilidades: " + ", ".join(info.weaknesses))
+        if info.resistances:
+            parts.append("Resistencias: " + ", ".join(info.resistances))
+        if info.immunities:
+            parts.append("Inmunidades: " + ", ".join(info.immunities))
         if parts:
             ttk.Label(f, text="\n".join(parts), font=("Segoe UI", 9), wraplength=360).pack(anchor=tk.W)
         else:
             ttk.Label(f, text="—", font=("Segoe UI", 9)).pack(anchor=tk.W)
 
         # Movimientos por nivel
-        if info.get("moves_level"):
+        if info.moves_level:
             sep("Movimientos por nivel (Sube de nivel)")
-            lines = [f"Nivel {lv}: {name}" for lv, name in info["moves_level"][:40]]
-            if len(info["moves_level"]) > 40:
-                lines.append(f"... y {len(info['moves_level']) - 40} más")
+            lines = [f"Nivel {lv}: {name}" for lv, name in info.moves_level[:40]]
+            if len(info.moves_level) > 40:
+                lines.append(f"... y {len(info.moves_level) - 40} más")
             ttk.Label(f, text="\n".join(lines), font=("Segoe UI", 9), wraplength=360, justify=tk.LEFT).pack(anchor=tk.W)
 
         # Movimientos por MT
-        if info.get("moves_tm"):
+        if info.moves_tm:
             sep("Movimientos por MT")
-            ttk.Label(f, text=", ".join(info["moves_tm"][:30]) + ("..." if len(info["moves_tm"]) > 30 else ""), font=("Segoe UI", 9), wraplength=360).pack(anchor=tk.W)
+            ttk.Label(f, text=", ".join(info.moves_tm[:30]) + ("..." if len(info.moves_tm) > 30 else ""), font=("Segoe UI", 9), wraplength=360).pack(anchor=tk.W)
 
         # Movimientos por huevo
-        if info.get("moves_egg"):
+        if info.moves_egg:
             sep("Movimientos por huevo")
-            ttk.Label(f, text=", ".join(info["moves_egg"][:25]) + ("..." if len(info["moves_egg"]) > 25 else ""), font=("Segoe UI", 9), wraplength=360).pack(anchor=tk.W)
+            ttk.Label(f, text=", ".join(info.moves_egg[:25]) + ("..." if len(info.moves_egg) > 25 else ""), font=("Segoe UI", 9), wraplength=360).pack(anchor=tk.W)
 
         # Movimientos por tutor
-        if info.get("moves_tutor"):
+        if info.moves_tutor:
             sep("Movimientos por tutor")
-            ttk.Label(f, text=", ".join(info["moves_tutor"][:25]) + ("..." if len(info["moves_tutor"]) > 25 else ""), font=("Segoe UI", 9), wraplength=360).pack(anchor=tk.W)
+            ttk.Label(f, text=", ".join(info.moves_tutor[:25]) + ("..." if len(info.moves_tutor) > 25 else ""), font=("Segoe UI", 9), wraplength=360).pack(anchor=tk.W)
 
     def abrir_pokedex_completa(dex_info):
         if not dex_info or not dex_info.get("Enabled"):
@@ -556,9 +311,20 @@ def main():
             messagebox.showinfo("Pokédex", "No hay especies disponibles para mostrar.")
             return
 
-        seen_set = set(int(x) for x in (dex_info.get("SeenSpecies") or []))
-        caught_set = set(int(x) for x in (dex_info.get("CaughtSpecies") or []))
-        species_names = obtener_nombres_especies(max_species)
+        # Bitsets tal cual llegan del save: el índice los usa sin pasar por listas de IDs.
+        vistos, capturados = bitsets_pokedex(dex_info)
+
+        def crear_indice():
+            # Índice construido una vez por ventana: búsqueda y filtros son intersecciones de bitmaps.
+            species_names = obtener_nombres_especies(max_species)
+            indice = IndicePokedex(
+                {sid: species_names.get(sid, f"Species {sid}") for sid in range(1, max_species + 1)},
+                vistos,
+                capturados,
+            )
+            return indice, len(species_names) >= max_species
+
+        indice, nombres_completos = crear_indice()
 
         win = tk.Toplevel(root)
         win.title("Pokédex completa")
@@ -583,21 +349,28 @@ def main():
             textvariable=filter_var,
             state="readonly",
             width=14,
-            values=("Todos", "Vistos", "Capturados", "No vistos"),
+            values=FILTROS,
         )
         filter_box.pack(side=tk.LEFT, padx=(6, 0))
+        count_lbl = ttk.Label(controls, style="Subtle.TLabel")
+        count_lbl.pack(side=tk.RIGHT)
 
         table_frame = ttk.Frame(outer)
         table_frame.pack(fill=tk.BOTH, expand=True)
-        tree = ttk.Treeview(table_frame, columns=("id", "name", "status"), show="headings")
+        tree = ttk.Treeview(
+            table_frame,
+            columns=("id", "name", "status"),
+            show="headings",
+            style="Dex.Treeview",
+            selectmode="browse",
+        )
         tree.heading("id", text="ID")
         tree.heading("name", text="Especie")
         tree.heading("status", text="Estado")
         tree.column("id", width=80, anchor=tk.CENTER)
         tree.column("name", width=360, anchor=tk.W)
         tree.column("status", width=140, anchor=tk.CENTER)
-        yscroll = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=tree.yview)
-        tree.configure(yscrollcommand=yscroll.set)
+        yscroll = ttk.Scrollbar(table_frame, orient=tk.VERTICAL)
         tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         yscroll.pack(side=tk.RIGHT, fill=tk.Y)
 
@@ -608,56 +381,418 @@ def main():
         )
         info_lbl.pack(anchor=tk.W, pady=(8, 0))
 
-        def status_for_species(species_id):
-            if species_id in caught_set:
-                return "Capturado"
-            if species_id in seen_set:
-                return "Visto"
-            return "No visto"
-
-        def include_by_filter(status_text):
-            mode = filter_var.get()
-            if mode == "Vistos":
-                return status_text in ("Visto", "Capturado")
-            if mode == "Capturados":
-                return status_text == "Capturado"
-            if mode == "No vistos":
-                return status_text == "No visto"
-            return True
+        # Lista virtualizada: el Treeview solo contiene las filas visibles y el scroll mueve `inicio`.
+        tabla = {"ids": [], "inicio": 0, "filas": 20, "seleccion": None, "busqueda": None}
+
+        def pintar_filas():
+            ids = tabla["ids"]
+            tabla["inicio"] = max(0, min(tabla["inicio"], len(ids) - tabla["filas"]))
+            visibles = ids[tabla["inicio"]:tabla["inicio"] + tabla["filas"]]
+            items = list(tree.get_children())
+            if len(items) > len(visibles):
+                tree.delete(*items[len(visibles):])
+                del items[len(visibles):]
+            while len(items) < len(visibles):
+                items.append(tree.insert("", tk.END))
+            seleccionado = None
+            for iid, species_id in zip(items, visibles):
+                tree.item(iid, values=(species_id, indice.nombres[species_id], indice.estado(species_id)))
+                if species_id == tabla["seleccion"]:
+                    seleccionado = iid
+            if seleccionado:
+                tree.selection_set(seleccionado)
+            elif tree.selection():
+                tree.selection_remove(tree.selection())
+            if ids:
+                yscroll.set(tabla["inicio"] / len(ids), (tabla["inicio"] + len(visibles)) / len(ids))
+            else:
+                yscroll.set(0.0, 1.0)
+
+        def desplazar(delta):
+            tabla["inicio"] += delta
+            pintar_filas()
+
+        def on_scrollbar(accion, cantidad, unidad=None):
+            if accion == "moveto":
+                tabla["inicio"] = int(float(cantidad) * len(tabla["ids"]))
+                pintar_filas()
+            elif accion == "scroll":
+                paso = tabla["filas"] if unidad == "pages" else 1
+                desplazar(int(cantidad) * paso)
+
+        def on_wheel(event):
+            if getattr(event, "num", None) in (4, 5):
+                desplazar(-3 if event.num == 4 else 3)
+            else:
+                desplazar(-3 if event.delta > 0 else 3)
+            return "break"
 
-        def refresh_table(*_):
-            query = search_var.get().strip().lower()
-            tree.delete(*tree.get_children())
-            for species_id in range(1, max_species + 1):
-                status_text = status_for_species(species_id)
-                if not include_by_filter(status_text):
-                    continue
+        def on_resize(event):
+            filas = max(1, (event.height - DEX_HEADER_HEIGHT) // DEX_ROW_HEIGHT)
+            if filas != tabla["filas"]:
+                tabla["filas"] = filas
+                pintar_filas()
+
+        def on_select(*_):
+            selection = tree.selection()
+            if selection:
+                values = tree.item(selection[0]).get("values") or []
+                if values:
+                    tabla["seleccion"] = int(values[0])
+
+        def mover_seleccion(delta):
+            ids = tabla["ids"]
+            if not ids:
+                return "break"
+            try:
+                pos = ids.index(tabla["seleccion"]) + delta
+            except ValueError:
+                pos = tabla["inicio"]
+            pos = max(0, min(pos, len(ids) - 1))
+            tabla["seleccion"] = ids[pos]
+            if pos < tabla["inicio"]:
+                tabla["inicio"] = pos
+            elif pos >= tabla["inicio"] + tabla["filas"]:
+                tabla["inicio"] = pos - tabla["filas"] + 1
+            pintar_filas()
+            return "break"
 
-                species_name = species_names.get(species_id, f"Species {species_id}")
-                if query:
-                    if query not in species_name.lower() and query not in str(species_id):
-                        continue
-                tree.insert("", tk.END, values=(species_id, species_name, status_text))
+        def refresh_table(*_):
+            tabla["busqueda"] = None
+            tabla["ids"] = indice.filtrar(search_var.get(), filter_var.get())
+            tabla["inicio"] = 0
+            count_lbl.configure(text=f"{len(tabla['ids'])} especies")
+            pintar_filas()
+
+        def programar_refresh(*_):
+            # Debounce: solo se filtra cuando se deja de teclear un momento.
+            if tabla["busqueda"] is not None:
+                win.after_cancel(tabla["busqueda"])
+            tabla["busqueda"] = win.after(SEARCH_DEBOUNCE_MS, refresh_table)
 
         def open_selected(*_):
-            selection = tree.selection()
-            if not selection:
-                return
-            item = tree.item(selection[0])
-            values = item.get("values") or []
-            if not values:
+            if tabla["seleccion"] is None:
                 return
-            species_id = int(values[0])
-            species_name = str(values[1])
-            abrir_pokedex(species_id, species_name, "")
+            species_id = tabla["seleccion"]
+            abrir_pokedex(species_id, indice.nombres[species_id], "")
 
-        search_var.trace_add("write", refresh_table)
+        yscroll.configure(command=on_scrollbar)
+        search_var.trace_add("write", programar_refresh)
         filter_box.bind("<<ComboboxSelected>>", refresh_table)
+        tree.bind("<<TreeviewSelect>>", on_select)
+        tree.bind("<Configure>", on_resize)
+        tree.bind("<MouseWheel>", on_wheel)
+        tree.bind("<Button-4>", on_wheel)
+        tree.bind("<Button-5>", on_wheel)
+        tree.bind("<Up>", lambda e: mover_seleccion(-1))
+        tree.bind("<Down>", lambda e: mover_seleccion(1))
+        tree.bind("<Prior>", lambda e: mover_seleccion(-tabla["filas"]))
+        tree.bind("<Next>", lambda e: mover_seleccion(tabla["filas"]))
         tree.bind("<Double-1>", open_selected)
         tree.bind("<Return>", open_selected)
         search_entry.focus_set()
         refresh_table()
 
+        def nombres_listos():
+            # Llegó el índice de nombres mientras la ventana estaba abierta: se rehace sin cerrarla.
+            nonlocal indice
+            if win.winfo_exists():
+                indice, _ = crear_indice()
+                refresh_table()
+
+        if not nombres_completos:
+            esperando_nombres.append(nombres_listos)
+
+    def abrir_cajas(ruta):
+        """
+        Ventana de cajas: el inventario (índice columnar) se lee en segundo plano y se ve por páginas.
+        Sin filtros, una página es una caja; con filtros, 30 resultados. El Treeview solo tiene las
+        filas de la página y el mote/entrenador de cada slot se decodifica al pintarlo.
+        """
+        win = tk.Toplevel(root)
+        win.title("Cajas del PC")
+        win.geometry("820x600")
+        win.resizable(True, True)
+
+        outer = ttk.Frame(win, padding=12)
+        outer.pack(fill=tk.BOTH, expand=True)
+
+        controls = ttk.Frame(outer)
+        controls.pack(fill=tk.X, pady=(0, 8))
+        especie_var = tk.StringVar()
+        nivel_min_var = tk.StringVar()
+        nivel_max_var = tk.StringVar()
+        ball_var = tk.StringVar(value="Todas")
+        fecha_var = tk.StringVar()
+        ttk.Label(controls, text="Especie:").pack(side=tk.LEFT)
+        especie_entry = ttk.Entry(controls, textvariable=especie_var, width=16)
+        especie_entry.pack(side=tk.LEFT, padx=(6, 12))
+        ttk.Label(controls, text="Nivel:").pack(side=tk.LEFT)
+        ttk.Spinbox(controls, from_=1, to=100, textvariable=nivel_min_var, width=4).pack(side=tk.LEFT, padx=(6, 2))
+        ttk.Label(controls, text="a").pack(side=tk.LEFT)
+        ttk.Spinbox(controls, from_=1, to=100, textvariable=nivel_max_var, width=4).pack(side=tk.LEFT, padx=(2, 12))
+        ttk.Label(controls, text="Ball:").pack(side=tk.LEFT)
+        ball_box = ttk.Combobox(controls, textvariable=ball_var, state="readonly", width=14, values=("Todas",))
+        ball_box.pack(side=tk.LEFT, padx=(6, 12))
+        ttk.Label(controls, text="Desde:").pack(side=tk.LEFT)
+        ttk.Entry(controls, textvariable=fecha_var, width=11).pack(side=tk.LEFT, padx=(6, 0))
+        count_lbl = ttk.Label(controls, style="Subtle.TLabel")
+        count_lbl.pack(side=tk.RIGHT)
+
+        table_frame = ttk.Frame(outer)
+        table_frame.pack(fill=tk.BOTH, expand=True)
+        columnas = (("caja", "Caja", 60), ("slot", "Slot", 60), ("especie", "Especie", 170), ("mote", "Mote", 150),
+                    ("nivel", "Nv.", 60), ("ball", "Ball", 130), ("fecha", "Captura", 110))
+        tree = ttk.Treeview(
+            table_frame,
+            columns=[c[0] for c in columnas],
+            show="headings",
+            style="Dex.Treeview",
+            selectmode="browse",
+        )
+        for clave, titulo_col, ancho in columnas:
+            tree.heading(clave, text=titulo_col)
+            tree.column(clave, width=ancho, anchor=tk.W if clave in ("especie", "mote") else tk.CENTER)
+        yscroll = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=yscroll.set)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        yscroll.pack(side=tk.RIGHT, fill=tk.Y)
+
+        nav = ttk.Frame(outer)
+        nav.pack(fill=tk.X, pady=(8, 0))
+        anterior_btn = ttk.Button(nav, text="◀", width=3, command=lambda: cambiar_pagina(-1))
+        anterior_btn.pack(side=tk.LEFT)
+        pagina_lbl = ttk.Label(nav, width=22, anchor=tk.CENTER)
+        pagina_lbl.pack(side=tk.LEFT, padx=6)
+        siguiente_btn = ttk.Button(nav, text="▶", width=3, command=lambda: cambiar_pagina(1))
+        siguiente_btn.pack(side=tk.LEFT)
+        info_lbl = ttk.Label(nav, text="Cargando cajas...", font=("Segoe UI", 9))
+        info_lbl.pack(side=tk.RIGHT)
+
+        # `filas` es None sin filtros (página = caja); con filtros, las filas que pasan.
+        vista_cajas = {"inventario": None, "filas": None, "pagina": 0, "busqueda": None, "por_iid": {}}
+        nombres = obtener_nombres_especies(MAX_SPECIES_GEN7)
+
+        def nombre_especie(species_id):
+            return nombres.get(species_id) or f"Species {species_id}"
+
+        def leer_filtros():
+            inventario = vista_cajas["inventario"]
+            filtros = {}
+            consulta = especie_var.get().strip().lower()
+            if consulta:
+                filtros["especies"] = (
+                    [int(consulta)] if consulta.isdigit() else
+                    [sid for sid in inventario.valores("especie") if consulta in nombre_especie(sid).lower()]
+                )
+            niveles = [int(v) if v.strip().isdigit() else None for v in (nivel_min_var.get(), nivel_max_var.get())]
+            if niveles != [None, None]:
+                filtros["nivel"] = tuple(niveles)
+            if ball_var.get() != "Todas":
+                filtros["balls"] = [b for b in inventario.valores("ball") if nombre_ball(b) == ball_var.get()]
+            desde = fecha_var.get().strip()
+            if len(desde) == 10 and fecha_a_entero(desde):
+                filtros["fecha"] = (desde, None)
+            return filtros
+
+        def paginas():
+            filas = vista_cajas["filas"]
+            if filas is None:
+                return vista_cajas["inventario"].cajas()
+            return max(1, -(-len(filas) // SLOTS_POR_CAJA))
+
+        def filas_pagina():
+            pagina, filas = vista_cajas["pagina"], vista_cajas["filas"]
+            if filas is None:
+                return vista_cajas["inventario"].caja(pagina + 1)
+            return filas[pagina * SLOTS_POR_CAJA:(pagina + 1) * SLOTS_POR_CAJA]
+
+        def pintar_pagina():
+            inventario = vista_cajas["inventario"]
+            visibles = filas_pagina()
+            items = list(tree.get_children())
+            if len(items) > len(visibles):
+                tree.delete(*items[len(visibles):])
+                del items[len(visibles):]
+            while len(items) < len(visibles):
+                items.append(tree.insert("", tk.END))
+            vista_cajas["por_iid"] = {}
+            for iid, fila in zip(items, visibles):
+                registro = inventario.fila(fila)
+                vista_cajas["por_iid"][iid] = registro
+                tree.item(iid, values=(
+                    registro["Box"],
+                    registro["Slot"],
+                    nombre_especie(registro["SpeciesId"]),
+                    "Huevo" if registro["IsEgg"] else registro["Nickname"],
+                    registro["Level"] or "?",
+                    nombre_ball(registro["Ball"]),
+                    registro["MetDate"] or "—",
+                ))
+            if items:
+                tree.yview_moveto(0)
+            total = paginas()
+            if vista_cajas["filas"] is None:
+                pagina_lbl.configure(text=f"Caja {vista_cajas['pagina'] + 1} / {total}" + ("" if visibles else " (vacía)"))
+            else:
+                pagina_lbl.configure(text=f"Página {vista_cajas['pagina'] + 1} / {total}")
+            anterior_btn.state(["!disabled"] if vista_cajas["pagina"] > 0 else ["disabled"])
+            siguiente_btn.state(["!disabled"] if vista_cajas["pagina"] < total - 1 else ["disabled"])
+
+        def cambiar_pagina(delta):
+            if vista_cajas["inventario"] is None:
+                return "break"
+            pagina = max(0, min(paginas() - 1, vista_cajas["pagina"] + delta))
+            if pagina != vista_cajas["pagina"]:
+                vista_cajas["pagina"] = pagina
+                pintar_pagina()
+            return "break"
+
+        def refrescar(*_):
+            vista_cajas["busqueda"] = None
+            inventario = vista_cajas["inventario"]
+            if inventario is None:
+                return
+            filtros = leer_filtros()
+            vista_cajas["filas"] = inventario.filtrar(**filtros) if filtros else None
+            vista_cajas["pagina"] = 0
+            encontrados = len(inventario) if vista_cajas["filas"] is None else len(vista_cajas["filas"])
+            count_lbl.configure(text=f"{encontrados} de {len(inventario)} Pokémon")
+            pintar_pagina()
+
+        def programar_refrescar(*_):
+            if vista_cajas["busqueda"] is not None:
+                win.after_cancel(vista_cajas["busqueda"])
+            vista_cajas["busqueda"] = win.after(SEARCH_DEBOUNCE_MS, refrescar)
+
+        def abrir_seleccion(*_):
+            seleccion = tree.selection()
+            registro = vista_cajas["por_iid"].get(seleccion[0]) if seleccion else None
+            if registro is not None:
+                abrir_pokedex(registro["SpeciesId"], registro["Nickname"], str(registro["Level"] or "?"))
+
+        def completar(resultado):
+            if not win.winfo_exists():
+                return
+            if isinstance(resultado, Exception):
+                info_lbl.configure(text=f"No se pudieron leer las cajas: {resultado}")
+                return
+            vista_cajas["inventario"] = resultado
+            ball_box.configure(values=["Todas"] + [nombre_ball(b) for b in resultado.valores("ball")])
+            info_lbl.configure(text="Doble clic o Enter para abrir la ficha. Re Pág/Av Pág cambian de página.")
+            refrescar()
+
+        for var in (especie_var, nivel_min_var, nivel_max_var, fecha_var):
+            var.trace_add("write", programar_refrescar)
+        ball_box.bind("<<ComboboxSelected>>", refrescar)
+        tree.bind("<Double-1>", abrir_seleccion)
+        tree.bind("<Return>", abrir_seleccion)
+        win.bind("<Prior>", lambda e: cambiar_pagina(-1))
+        win.bind("<Next>", lambda e: cambiar_pagina(1))
+        anterior_btn.state(["disabled"])
+        siguiente_btn.state(["disabled"])
+        especie_entry.focus_set()
+        en_segundo_plano(motor.leer_cajas, completar, ruta)
+
+    def abrir_historial(ruta):
+        """Gráfica del progreso del save por horas de juego; solo lee la métrica y el nivel de detalle que dibuja."""
+        win = tk.Toplevel(root)
+        win.title("Historial de progreso")
+        win.geometry("760x440")
+        win.resizable(True, True)
+
+        outer = ttk.Frame(win, padding=12)
+        outer.pack(fill=tk.BOTH, expand=True)
+        controls = ttk.Frame(outer)
+        controls.pack(fill=tk.X, pady=(0, 8))
+        metrica_var = tk.StringVar(value=next(iter(METRICAS_HISTORIAL)))
+        periodo_var = tk.StringVar(value="Todo")
+        ttk.Label(controls, text="Métrica:").pack(side=tk.LEFT)
+        metrica_box = ttk.Combobox(
+            controls, textvariable=metrica_var, state="readonly", width=24, values=tuple(METRICAS_HISTORIAL)
+        )
+        metrica_box.pack(side=tk.LEFT, padx=(6, 12))
+        ttk.Label(controls, text="Periodo:").pack(side=tk.LEFT)
+        periodo_box = ttk.Combobox(
+            controls, textvariable=periodo_var, state="readonly", width=16, values=tuple(PERIODOS_HISTORIAL)
+        )
+        periodo_box.pack(side=tk.LEFT, padx=(6, 12))
+        ttk.Button(controls, text="Actualizar", command=lambda: pedir()).pack(side=tk.LEFT)
+        info_lbl = ttk.Label(controls, style="Subtle.TLabel")
+        info_lbl.pack(side=tk.RIGHT)
+        canvas = tk.Canvas(outer, bg="#1a1a2e", highlightthickness=0)
+        canvas.pack(fill=tk.BOTH, expand=True)
+
+        grafica = {"nivel": None, "serie": None, "metrica": None}
+        # El historial se abre en el pool (lee y repara sus columnas en disco); hasta entonces no se pide nada.
+        historial = {"abierto": None}
+
+        def abierto(resultado):
+            if not win.winfo_exists():
+                return
+            if isinstance(resultado, Exception):
+                info_lbl.configure(text=f"No se pudo abrir el historial: {resultado}")
+                return
+            historial["abierto"] = resultado
+            pedir()
+
+        def pedir(*_):
+            if historial["abierto"] is None:
+                return
+            metrica = METRICAS_HISTORIAL[metrica_var.get()]
+            segundos = PERIODOS_HISTORIAL[periodo_var.get()]
+            desde = time.time() - segundos if segundos else None
+            # Un punto por píxel basta: el historial elige el nivel (crudo, minuto, hora) que da eso.
+            puntos = max(100, canvas.winfo_width())
+            en_segundo_plano(historial["abierto"].leer_serie, completar, ["juego", metrica], desde, puntos)
+
+        def completar(resultado):
+            if not win.winfo_exists():
+                return
+            if isinstance(resultado, Exception):
+                info_lbl.configure(text=f"No se pudo leer el historial: {resultado}")
+                return
+            grafica["nivel"], grafica["serie"] = resultado
+            grafica["metrica"] = METRICAS_HISTORIAL[metrica_var.get()]
+            dibujar()
+
+        def dibujar(*_):
+            canvas.delete("all")
+            ancho, alto = canvas.winfo_width(), canvas.winfo_height()
+            serie = grafica["serie"]
+            if not serie or not serie["t"]:
+                canvas.create_text(ancho // 2, alto // 2, text="Sin datos todavía.", fill="#cccccc")
+                info_lbl.configure(text="")
+                return
+            xs = [j / 3600 for j in serie["juego"]]
+            ys = serie[grafica["metrica"]]
+            x0, x1 = min(xs), max(xs)
+            y0, y1 = min(ys), max(ys)
+            dx, dy = (x1 - x0) or 1.0, (y1 - y0) or 1.0
+            izq, der, arriba, abajo = 64, 16, 16, 32
+            puntos = []
+            for x, y in zip(xs, ys):
+                puntos.append(izq + (x - x0) / dx * (ancho - izq - der))
+                puntos.append(alto - abajo - (y - y0) / dy * (alto - arriba - abajo))
+            canvas.create_line(izq, arriba, izq, alto - abajo, ancho - der, alto - abajo, fill="#555577")
+            # Toda la serie es un solo ítem del canvas, no uno por punto.
+            if len(puntos) >= 4:
+                canvas.create_line(*puntos, fill="#4fc3f7", width=2)
+            else:
+                canvas.create_oval(puntos[0] - 3, puntos[1] - 3, puntos[0] + 3, puntos[1] + 3, fill="#4fc3f7")
+            formato = "{:,.1f}" if grafica["metrica"] == "nivel_medio" else "{:,.0f}"
+            canvas.create_text(izq - 6, arriba, text=formato.format(y1), anchor=tk.NE, fill="#cccccc")
+            canvas.create_text(izq - 6, alto - abajo, text=formato.format(y0), anchor=tk.E, fill="#cccccc")
+            canvas.create_text(izq, alto - abajo + 6, text=f"{x0:.1f} h", anchor=tk.NW, fill="#cccccc")
+            canvas.create_text(ancho - der, alto - abajo + 6, text=f"{x1:.1f} h de juego", anchor=tk.NE, fill="#cccccc")
+            info_lbl.configure(text=f"{len(xs)} puntos ({grafica['nivel']})")
+
+        metrica_box.bind("<<ComboboxSelected>>", pedir)
+        periodo_box.bind("<<ComboboxSelected>>", pedir)
+        canvas.bind("<Configure>", dibujar)
+        info_lbl.configure(text="Cargando historial...")
+        en_segundo_plano(historial_para, abierto, ruta)
+
     root = tk.Tk()
     root.title("HUD PokeCompanion — Equipo")
     root.resizable(True, True)
@@ -670,6 +805,30 @@ def main():
     style.configure("Card.TLabelframe", padding=10)
     style.configure("CardTitle.TLabel", font=("Segoe UI", 11, "bold"))
     style.configure("Subtle.TLabel", font=("Segoe UI", 9))
+    style.configure("Dex.Treeview", rowheight=DEX_ROW_HEIGHT)
+
+    # Tk no es seguro entre hilos (ni siquiera `root.after`): los hilos de fondo dejan aquí lo que hay
+    # que hacer en la UI y el hilo de Tk lo recoge con un sondeo propio.
+    cola_tk = queue.Queue()
+
+    def en_hilo_tk(fn):
+        """Ejecuta `fn()` en el hilo de Tk; se puede llamar desde cualquier hilo."""
+        cola_tk.put(fn)
+
+    def drenar_cola_tk():
+        while True:
+            try:
+                fn = cola_tk.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                fn()
+            except Exception:
+                # Como un callback de Tk: se informa y el sondeo sigue vivo.
+                root.report_callback_exception(*sys.exc_info())
+        root.after(COLA_TK_MS, drenar_cola_tk)
+
+    drenar_cola_tk()
 
     # Marco principal con padding
     main = ttk.Frame(root, padding=16)
@@ -687,19 +846,59 @@ def main():
     content = ttk.Frame(main)
     content.pack(fill=tk.BOTH, expand=True)
 
-    def render_data(datos):
-        for child in content.winfo_children():
-            child.destroy()
+    # Pool acotado para las consultas de las tarjetas; la UI pinta primero y rellena al llegar los datos.
+    fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="hud-fetch")
 
-        trainer = datos.get("Trainer") or {}
-        dex = datos.get("Pokedex") or {}
-        party = datos.get("Party") or []
-        last = datos.get("Last") or {}
+    # Trabajos enviados al pool cuyo resultado aún no se aplicó en la UI.
+    trabajos = {"pendientes": 0}
 
-        # Resumen superior: entrenador + progreso de Pokédex
-        summary = ttk.Frame(content)
+    def en_segundo_plano(trabajo, al_terminar, *args):
+        """Ejecuta `trabajo(*args)` en el pool y entrega el resultado (o la excepción) en el hilo de Tk."""
+        nombre = getattr(trabajo, "__name__", "trabajo")
+        encargo = trazas.enlace()
+
+        def ejecutar():
+            # El enlace de vuelta une el tramo del pool con el que aplica el resultado en Tk.
+            with trazas.tramo(f"pool.{nombre}", padre=encargo, args=args):
+                return trabajo(*args), trazas.enlace()
+
+        def entregar(future):
+            def aplicar():
+                vuelta = None
+                try:
+                    resultado, vuelta = future.result()
+                except Exception as ex:
+                    resultado = ex
+                try:
+                    with trazas.tramo(f"aplicar.{nombre}", padre=vuelta):
+                        al_terminar(resultado)
+                finally:
+                    trabajos["pendientes"] -= 1
+            # Callback del Future: corre en el hilo del pool (o en este si ya había terminado).
+            en_hilo_tk(aplicar)
+        trabajos["pendientes"] += 1
+        fetch_pool.submit(ejecutar).add_done_callback(entregar)
+
+    def set_text(lbl, texto):
+        """Solo toca el widget si el texto cambió."""
+        if getattr(lbl, "_hud_text", None) != texto:
+            lbl.configure(text=texto)
+            lbl._hud_text = texto
+
+    def crear_panel(contenedor, ruta, status_var):
+        """Vista de un save dentro de `contenedor`; los datos (motor, fotos, pool) se comparten entre saves."""
+        # Modelo de vista: los widgets se crean una vez y cada refresco solo reconcilia lo que cambió.
+        # Las tarjetas se indexan por slot del equipo y solo se recrean si cambia la especie del slot.
+        summary = ttk.Frame(contenedor)
         summary.pack(fill=tk.X, pady=(0, 10))
+        party_area = ttk.Frame(contenedor)
+        party_area.pack(fill=tk.BOTH, expand=True)
+        team_area = ttk.Frame(contenedor)
+        team_area.pack(fill=tk.X)
+        last_area = ttk.Frame(contenedor)
+        last_area.pack(fill=tk.X)
 
+        # Resumen superior: entrenador + progreso de Pokédex
         trainer_frame = ttk.LabelFrame(summary, text="Entrenador", padding=10)
         trainer_frame.grid(row=0, column=0, padx=(0, 8), sticky="nsew")
         dex_frame = ttk.LabelFrame(summary, text="Pokédex", padding=10)
@@ -707,210 +906,602 @@ def main():
         summary.columnconfigure(0, weight=1)
         summary.columnconfigure(1, weight=1)
 
-        trainer_name = trainer.get("Name") or "—"
-        trainer_tid = trainer.get("TID")
-        trainer_sid = trainer.get("SID")
-        trainer_money = trainer.get("Money")
-        trainer_play = trainer.get("PlayTime") or "—"
-        game_version = trainer.get("GameVersion") or "—"
-
-        money_txt = f"${trainer_money:,}" if isinstance(trainer_money, int) else "—"
-        tid_txt = f"{trainer_tid:05d}" if isinstance(trainer_tid, int) and trainer_tid >= 0 else "—"
-        sid_txt = f"{trainer_sid:04d}" if isinstance(trainer_sid, int) and trainer_sid >= 0 else "—"
-
-        ttk.Label(trainer_frame, text=f"Nombre: {trainer_name}", font=("Segoe UI", 10, "bold")).pack(anchor=tk.W)
-        ttk.Label(trainer_frame, text=f"TID/SID: {tid_txt} / {sid_txt}", font=("Segoe UI", 9)).pack(anchor=tk.W)
-        ttk.Label(trainer_frame, text=f"Dinero: {money_txt}", font=("Segoe UI", 9)).pack(anchor=tk.W)
-        ttk.Label(trainer_frame, text=f"Tiempo jugado: {trainer_play}", font=("Segoe UI", 9)).pack(anchor=tk.W)
-        ttk.Label(trainer_frame, text=f"Versión: {game_version}", font=("Segoe UI", 9)).pack(anchor=tk.W)
-
-        dex_enabled = bool(dex.get("Enabled"))
-        if dex_enabled:
-            seen = dex.get("Seen", 0)
-            caught = dex.get("Caught", 0)
-            max_species = dex.get("MaxSpecies", 0)
-            seen_pct = dex.get("SeenPercent", 0)
-            caught_pct = dex.get("CaughtPercent", 0)
-            ttk.Label(dex_frame, text=f"Vistos: {seen} / {max_species}", font=("Segoe UI", 10, "bold")).pack(anchor=tk.W)
-            ttk.Label(dex_frame, text=f"Capturados: {caught} / {max_species}", font=("Segoe UI", 10, "bold")).pack(anchor=tk.W)
-            ttk.Label(dex_frame, text=f"Vistos (%): {seen_pct}%", font=("Segoe UI", 9)).pack(anchor=tk.W, pady=(4, 0))
-            ttk.Label(dex_frame, text=f"Capturados (%): {caught_pct}%", font=("Segoe UI", 9)).pack(anchor=tk.W)
-            ttk.Button(
-                dex_frame,
-                text="Abrir Pokédex completa",
-                command=lambda d=dex: abrir_pokedex_completa(d),
-            ).pack(anchor=tk.W, pady=(8, 0))
-        else:
-            ttk.Label(dex_frame, text="Pokédex no disponible en este save.", font=("Segoe UI", 9)).pack(anchor=tk.W)
+        trainer_lbls = {
+            "name": ttk.Label(trainer_frame, font=("Segoe UI", 10, "bold")),
+            "ids": ttk.Label(trainer_frame, font=("Segoe UI", 9)),
+            "money": ttk.Label(trainer_frame, font=("Segoe UI", 9)),
+            "play": ttk.Label(trainer_frame, font=("Segoe UI", 9)),
+            "version": ttk.Label(trainer_frame, font=("Segoe UI", 9)),
+        }
+        for lbl in trainer_lbls.values():
+            lbl.pack(anchor=tk.W)
+        acciones = ttk.Frame(trainer_frame)
+        acciones.pack(anchor=tk.W, pady=(8, 0))
+        ttk.Button(acciones, text="Ver cajas", command=lambda: abrir_cajas(ruta)).pack(side=tk.LEFT)
+        ttk.Button(acciones, text="Historial", command=lambda: abrir_historial(ruta)).pack(side=tk.LEFT, padx=(6, 0))
+
+        dex_on = ttk.Frame(dex_frame)
+        dex_lbls = {
+            "seen": ttk.Label(dex_on, font=("Segoe UI", 10, "bold")),
+            "caught": ttk.Label(dex_on, font=("Segoe UI", 10, "bold")),
+            "seen_pct": ttk.Label(dex_on, font=("Segoe UI", 9)),
+            "caught_pct": ttk.Label(dex_on, font=("Segoe UI", 9)),
+        }
+        dex_lbls["seen"].pack(anchor=tk.W)
+        dex_lbls["caught"].pack(anchor=tk.W)
+        dex_lbls["seen_pct"].pack(anchor=tk.W, pady=(4, 0))
+        dex_lbls["caught_pct"].pack(anchor=tk.W)
+        ttk.Button(
+            dex_on,
+            text="Abrir Pokédex completa",
+            command=lambda: abrir_pokedex_completa(vista["dex"]),
+        ).pack(anchor=tk.W, pady=(8, 0))
+        dex_off = ttk.Label(dex_frame, text="Pokédex no disponible en este save.", font=("Segoe UI", 9))
+
+        frame_party = ttk.Frame(party_area)
+        empty_party_lbl = ttk.Label(party_area, text="No hay Pokémon en el equipo.")
+        cards_per_row = 3
 
-        if not party:
-            ttk.Label(content, text="No hay Pokémon en el equipo.").pack(pady=20)
-            return
+        # Análisis de tipos del equipo (tabla de tipos local; se recalcula en cada cambio del equipo).
+        team_frame = ttk.LabelFrame(team_area, text="Análisis del equipo", padding=10)
+        team_lbls = {
+            key: ttk.Label(team_frame, style="Subtle.TLabel", wraplength=760, justify=tk.LEFT)
+            for key in ("compartidas", "sin_resistencia", "cobertura", "sin_cobertura")
+        }
+        for lbl in team_lbls.values():
+            lbl.pack(anchor=tk.W)
+
+        vista = {"dex": {}, "dex_enabled": None, "party_visible": None, "cards": {}, "last": None, "team_ids": None}
+
+        def render_data(datos, secciones=None):
+            """`secciones`: las del save que cambiaron (None = todas); solo se reconcilian los paneles afectados."""
+            trainer = datos.get("Trainer") or {}
+            dex = datos.get("Pokedex") or {}
+            party = datos.get("Party") or []
+            last = datos.get("Last") or {}
+
+            with trazas.tramo("render", secciones=sorted(secciones) if secciones is not None else "todas"):
+                if secciones is None or secciones & {"trainer", "time", "dex"}:
+                    with trazas.tramo("render.resumen"):
+                        reconciliar_resumen(trainer, dex)
+                if secciones is None or "party" in secciones:
+                    with trazas.tramo("render.equipo", tarjetas=len(party)):
+                        reconciliar_equipo(party)
+                    with trazas.tramo("render.analisis"):
+                        reconciliar_analisis(party)
+                # El último capturado puede estar en el equipo o en una caja.
+                if secciones is None or secciones & {"party", "boxes"}:
+                    with trazas.tramo("render.last"):
+                        reconciliar_last(last)
+
+        def reconciliar_resumen(trainer, dex):
+            trainer_name = trainer.get("Name") or "—"
+            trainer_tid = trainer.get("TID")
+            trainer_sid = trainer.get("SID")
+            trainer_money = trainer.get("Money")
+            trainer_play = trainer.get("PlayTime") or "—"
+            game_version = trainer.get("GameVersion") or "—"
+
+            money_txt = f"${trainer_money:,}" if isinstance(trainer_money, int) else "—"
+            tid_txt = f"{trainer_tid:05d}" if isinstance(trainer_tid, int) and trainer_tid >= 0 else "—"
+            sid_txt = f"{trainer_sid:04d}" if isinstance(trainer_sid, int) and trainer_sid >= 0 else "—"
+
+            set_text(trainer_lbls["name"], f"Nombre: {trainer_name}")
+            set_text(trainer_lbls["ids"], f"TID/SID: {tid_txt} / {sid_txt}")
+            set_text(trainer_lbls["money"], f"Dinero: {money_txt}")
+            set_text(trainer_lbls["play"], f"Tiempo jugado: {trainer_play}")
+            set_text(trainer_lbls["version"], f"Versión: {game_version}")
+
+            vista["dex"] = dex
+            dex_enabled = bool(dex.get("Enabled"))
+            if dex_enabled != vista["dex_enabled"]:
+                vista["dex_enabled"] = dex_enabled
+                if dex_enabled:
+                    dex_off.pack_forget()
+                    dex_on.pack(fill=tk.X)
+                else:
+                    dex_on.pack_forget()
+                    dex_off.pack(anchor=tk.W)
+            if dex_enabled:
+                max_species = dex.get("MaxSpecies", 0)
+                set_text(dex_lbls["seen"], f"Vistos: {dex.get('Seen', 0)} / {max_species}")
+                set_text(dex_lbls["caught"], f"Capturados: {dex.get('Caught', 0)} / {max_species}")
+                set_text(dex_lbls["seen_pct"], f"Vistos (%): {dex.get('SeenPercent', 0)}%")
+                set_text(dex_lbls["caught_pct"], f"Capturados (%): {dex.get('CaughtPercent', 0)}%")
+
+        def reconciliar_equipo(party):
+            party_visible = bool(party)
+            if party_visible != vista["party_visible"]:
+                vista["party_visible"] = party_visible
+                if party_visible:
+                    empty_party_lbl.pack_forget()
+                    frame_party.pack(fill=tk.BOTH, expand=True)
+                else:
+                    frame_party.pack_forget()
+                    empty_party_lbl.pack(pady=20)
+
+            cards = vista["cards"]
+            for i, mon in enumerate(party):
+                card = cards.get(i)
+                if card is not None and card["species_id"] == mon["SpeciesId"]:
+                    actualizar_tarjeta(card, mon)
+                    continue
+                if card is not None:
+                    card["widget"].destroy()
+                frame_party.columnconfigure(i % cards_per_row, weight=1)
+                cards[i] = crear_tarjeta(frame_party, i // cards_per_row, i % cards_per_row, mon)
+            for i in [slot for slot in cards if slot >= len(party)]:
+                cards.pop(i)["widget"].destroy()
+
+        def reconciliar_analisis(party):
+            ids = tuple(mon["SpeciesId"] for mon in party)
+            if ids == vista["team_ids"]:
+                return
+            vista["team_ids"] = ids
+            if not ids:
+                team_frame.pack_forget()
+                return
+            faltan = [sid for sid in set(ids) if motor.tipos_en_memoria(sid) is None]
+            # La primera vez tipos_gen7 (NumPy) se importa en el pool, no en el hilo de Tk.
+            if not faltan and "tipos_gen7" in sys.modules:
+                pintar_analisis(ids)
+                return
 
-        # Contenedor de fichas (grid)
-        frame_party = ttk.Frame(content)
-        frame_party.pack(fill=tk.BOTH, expand=True)
-        cards_per_row = 3
+            def completar(resultado):
+                # Solo si el equipo no cambió mientras se consultaban los tipos.
+                if vista["team_ids"] != ids or isinstance(resultado, Exception) or analisis_equipo() is None:
+                    return
+                pintar_analisis(ids)
 
-        for i, mon in enumerate(party):
-            species_id = mon["SpeciesId"]
-            nickname = mon.get("Nickname") or ""
-            level = mon.get("Level", "?")
-            friendship = mon.get("Friendship", -1)
+            def cargar_tipos():
+                analisis_equipo()
+                return [obtener_tipos(sid) for sid in faltan]
+
+            en_segundo_plano(cargar_tipos, completar)
+
+        def pintar_analisis(ids):
+            analisis = analisis_equipo()([motor.tipos_en_memoria(sid) for sid in ids])
+            compartidas = ", ".join(
+                f"{tipo} ×{debiles}" + (f" ({resisten} resiste{'n' if resisten > 1 else ''})" if resisten else "")
+                for tipo, debiles, resisten in analisis["debilidades_compartidas"]
+            )
+            set_text(team_lbls["compartidas"], f"Debilidades compartidas: {compartidas or 'ninguna'}")
+            set_text(team_lbls["sin_resistencia"], f"Nadie resiste: {', '.join(analisis['sin_resistencia']) or '—'}")
+            set_text(
+                team_lbls["cobertura"],
+                f"Cobertura ofensiva (tipos del equipo): {len(analisis['cobertura'])}/18 tipos reciben x2",
+            )
+            set_text(team_lbls["sin_cobertura"], f"Sin cobertura x2: {', '.join(analisis['sin_cobertura']) or '—'}")
+            team_frame.pack(fill=tk.X, pady=(16, 0))
 
+        def cargar_datos_tarjeta(species_id):
+            """Trabajo en segundo plano de una tarjeta: datos de PokeAPI, evolución y sprites ya redimensionados."""
             nombre_api, sprite_url = obtener_datos_pokeapi(species_id)
-            photo = cargar_sprite(sprite_url)
+            img = descargar_imagen(sprite_url)
+            evo_result = obtener_siguiente_evolucion(species_id)
+            evo_imgs = [descargar_imagen(evo.get("sprite_url", ""), size=52) for evo in evo_result.get("next", [])[:2]]
+            return nombre_api, sprite_url, img, evo_result, evo_imgs
 
-            row = i // cards_per_row
-            col = i % cards_per_row
-            frame_party.columnconfigure(col, weight=1)
+        def crear_tarjeta(frame_party, row, col, mon):
+            """Crea la tarjeta con los datos del save al instante y la completa cuando llega PokeAPI."""
+            species_id = mon["SpeciesId"]
+            card = {"species_id": species_id, "nombre_api": f"Species {species_id}"}
 
             # Ficha por Pokémon (clic para abrir Pokédex)
-            card = ttk.LabelFrame(frame_party, text="", style="Card.TLabelframe")
-            card.grid(row=row, column=col, padx=10, pady=10, sticky="nsew")
-
-            # Capturar valores por iteración para que cada tarjeta abra su propio Pokémon.
-            def on_click(e, _sid=species_id, _nick=nickname, _lvl=level):
-                abrir_pokedex(_sid, _nick, str(_lvl))
-
-            if photo:
-                lbl_sprite = ttk.Label(card, image=photo, cursor="hand2")
-                lbl_sprite.image = photo  # mantener referencia
-                lbl_sprite.pack(pady=(0, 6))
-                lbl_sprite.bind("<Button-1>", on_click)
-
-            nombre_mostrar = nickname if nickname.strip() else nombre_api
-            l1 = ttk.Label(card, text=nombre_mostrar, style="CardTitle.TLabel", cursor="hand2")
-            l1.pack()
-            l1.bind("<Button-1>", on_click)
-            l2 = ttk.Label(card, text=nombre_api if nickname.strip() else "", style="Subtle.TLabel", cursor="hand2")
-            l2.pack()
-            l2.bind("<Button-1>", on_click)
-            l3 = ttk.Label(card, text=f"Nivel {level}", font=("Segoe UI", 10), cursor="hand2")
-            l3.pack()
-            l3.bind("<Button-1>", on_click)
-            if isinstance(friendship, int) and friendship >= 0:
-                l4 = ttk.Label(card, text=f"Amistad: {friendship}/255", style="Subtle.TLabel", cursor="hand2")
-                l4.pack()
-                l4.bind("<Button-1>", on_click)
-            card.bind("<Button-1>", on_click)
-
-            # Información de evolución: siguiente(s) evolución(es), condición y sprite.
-            evo_result = obtener_siguiente_evolucion(species_id)
-            next_evos = evo_result.get("next", [])
-            evo_status = evo_result.get("status", "error")
-            # Resumen visible y rápido (siempre encima del bloque visual de evolución).
-            if next_evos:
-                first_evo = next_evos[0]
-                cond = first_evo.get("condition", "") or "condición especial"
-                evo_summary = f"Evoluciona a {first_evo.get('name', '—')} ({cond})"
-                ttk.Label(card, text=evo_summary, font=("Segoe UI", 9, "bold")).pack(pady=(6, 0))
-            elif evo_status == "error":
-                ttk.Label(card, text="Evolución: no disponible (error de red/API)", style="Subtle.TLabel").pack(pady=(6, 0))
-            else:
-                ttk.Label(card, text="Sin evolución posterior", style="Subtle.TLabel").pack(pady=(6, 0))
-
-            sep = ttk.Separator(card, orient=tk.HORIZONTAL)
-            sep.pack(fill=tk.X, pady=(8, 6))
-            if next_evos:
-                ttk.Label(card, text="Próxima evolución", style="Subtle.TLabel").pack()
-                evo_wrap = ttk.Frame(card)
-                evo_wrap.pack(pady=(2, 0))
-                for evo in next_evos[:2]:
-                    evo_col = ttk.Frame(evo_wrap)
-                    evo_col.pack(side=tk.LEFT, padx=6)
-                    evo_photo = cargar_sprite(evo.get("sprite_url", ""), size=52)
-                    if evo_photo:
-                        evo_lbl = ttk.Label(evo_col, image=evo_photo, cursor="hand2")
-                        evo_lbl.image = evo_photo
-                        evo_lbl.pack()
-                        if evo.get("id"):
-                            evo_lbl.bind("<Button-1>", lambda e, sid=evo["id"], n=evo["name"]: abrir_pokedex(sid, n, ""))
-                    evo_name_lbl = ttk.Label(evo_col, text=evo.get("name", "—"), style="Subtle.TLabel")
-                    evo_name_lbl.pack()
-                    cond = evo.get("condition", "") or "Método desconocido"
-                    evo_cond_lbl = ttk.Label(evo_col, text=cond, style="Subtle.TLabel")
-                    evo_cond_lbl.pack()
-            elif evo_status == "error":
-                ttk.Label(card, text="No se pudo consultar la cadena evolutiva ahora.", style="Subtle.TLabel").pack()
-
-            ttk.Button(card, text="Ver ficha", command=lambda sid=species_id, n=nombre_mostrar, lv=level: abrir_pokedex(sid, n, str(lv))).pack(pady=(8, 0))
-
-        # Último capturado (clic para abrir Pokédex)
-        if last:
-            last_frame = ttk.LabelFrame(content, text="Último capturado", padding=10)
-            last_frame.pack(fill=tk.X, pady=(16, 0))
+            widget = ttk.LabelFrame(frame_party, text="", style="Card.TLabelframe")
+            widget.grid(row=row, column=col, padx=10, pady=10, sticky="nsew")
+            card["widget"] = widget
+
+            # Se leen los valores actuales de la tarjeta (pueden cambiar en refrescos posteriores).
+            def on_click(e=None):
+                abrir_pokedex(card["species_id"], card["nickname"], str(card["level"]))
+
+            lbl_sprite = ttk.Label(widget, text="Cargando...", style="Subtle.TLabel", cursor="hand2")
+            lbl_sprite.pack(pady=(0, 6))
+            lbl_sprite.bind("<Button-1>", on_click)
+
+            card["l1"] = ttk.Label(widget, style="CardTitle.TLabel", cursor="hand2")
+            card["l2"] = ttk.Label(widget, style="Subtle.TLabel", cursor="hand2")
+            card["l3"] = ttk.Label(widget, font=("Segoe UI", 10), cursor="hand2")
+            card["l4"] = ttk.Label(widget, style="Subtle.TLabel", cursor="hand2")
+            for key in ("l1", "l2", "l3", "l4"):
+                card[key].pack()
+                card[key].bind("<Button-1>", on_click)
+            widget.bind("<Button-1>", on_click)
+
+            # Bloque de evolución: se rellena cuando terminan las consultas.
+            evo_frame = ttk.Frame(widget)
+            evo_frame.pack(fill=tk.X)
+            card["evo_frame"] = evo_frame
+            ttk.Label(evo_frame, text="Cargando evolución...", style="Subtle.TLabel").pack(pady=(6, 0))
+
+            ttk.Button(widget, text="Ver ficha", command=lambda: abrir_pokedex(card["species_id"], card["l1"].cget("text"), str(card["level"]))).pack(pady=(8, 0))
+
+            card["nickname"] = None
+            card["level"] = None
+            card["friendship"] = None
+            actualizar_tarjeta(card, mon)
+
+            def completar(resultado):
+                if not widget.winfo_exists():
+                    return
+                if isinstance(resultado, Exception):
+                    resultado = (f"Species {species_id}", "", None, {"status": "error", "next": []}, [])
+                nombre_api, sprite_url, img, evo_result, evo_imgs = resultado
+
+                photo = foto(sprite_url, SPRITE_SIZE, img)
+                if photo:
+                    lbl_sprite.configure(image=photo, text="")
+                    lbl_sprite.image = photo  # mantener referencia
+                else:
+                    lbl_sprite.pack_forget()
+                card["nombre_api"] = nombre_api
+                actualizar_nombres(card)
+
+                for child in evo_frame.winfo_children():
+                    child.destroy()
+
+                # Información de evolución: siguiente(s) evolución(es), condición y sprite.
+                next_evos = evo_result.get("next", [])
+                evo_status = evo_result.get("status", "error")
+                # Resumen visible y rápido (siempre encima del bloque visual de evolución).
+                if next_evos:
+                    first_evo = next_evos[0]
+                    cond = first_evo.get("condition", "") or "condición especial"
+                    evo_summary = f"Evoluciona a {first_evo.get('name', '—')} ({cond})"
+                    ttk.Label(evo_frame, text=evo_summary, font=("Segoe UI", 9, "bold")).pack(pady=(6, 0))
+                elif evo_status == "error":
+                    ttk.Label(evo_frame, text="Evolución: no disponible (error de red/API)", style="Subtle.TLabel").pack(pady=(6, 0))
+                else:
+                    ttk.Label(evo_frame, text="Sin evolución posterior", style="Subtle.TLabel").pack(pady=(6, 0))
+
+                sep = ttk.Separator(evo_frame, orient=tk.HORIZONTAL)
+                sep.pack(fill=tk.X, pady=(8, 6))
+                if next_evos:
+                    ttk.Label(evo_frame, text="Próxima evolución", style="Subtle.TLabel").pack()
+                    evo_wrap = ttk.Frame(evo_frame)
+                    evo_wrap.pack(pady=(2, 0))
+                    for evo, evo_img in zip(next_evos[:2], evo_imgs):
+                        evo_col = ttk.Frame(evo_wrap)
+                        evo_col.pack(side=tk.LEFT, padx=6)
+                        evo_photo = foto(evo.get("sprite_url", ""), 52, evo_img)
+                        if evo_photo:
+                            evo_lbl = ttk.Label(evo_col, image=evo_photo, cursor="hand2")
+                            evo_lbl.image = evo_photo
+                            evo_lbl.pack()
+                            if evo.get("id"):
+                                evo_lbl.bind("<Button-1>", lambda e, sid=evo["id"], n=evo["name"]: abrir_pokedex(sid, n, ""))
+                        evo_name_lbl = ttk.Label(evo_col, text=evo.get("name", "—"), style="Subtle.TLabel")
+                        evo_name_lbl.pack()
+                        cond = evo.get("condition", "") or "Método desconocido"
+                        evo_cond_lbl = ttk.Label(evo_col, text=cond, style="Subtle.TLabel")
+                        evo_cond_lbl.pack()
+                elif evo_status == "error":
+                    ttk.Label(evo_frame, text="No se pudo consultar la cadena evolutiva ahora.", style="Subtle.TLabel").pack()
+
+            en_segundo_plano(cargar_datos_tarjeta, completar, species_id)
+            return card
+
+        def actualizar_nombres(card):
+            nickname = card["nickname"]
+            nombre_api = card["nombre_api"]
+            set_text(card["l1"], nickname if nickname.strip() else nombre_api)
+            set_text(card["l2"], nombre_api if nickname.strip() else "")
+
+        def actualizar_tarjeta(card, mon):
+            """Aplica a una tarjeta existente solo los datos del save que cambiaron."""
+            nickname = mon.get("Nickname") or ""
+            level = mon.get("Level", "?")
+            friendship = mon.get("Friendship", -1)
+            if nickname != card["nickname"]:
+                card["nickname"] = nickname
+                actualizar_nombres(card)
+            if level != card["level"]:
+                card["level"] = level
+                set_text(card["l3"], f"Nivel {level}")
+            if friendship != card["friendship"]:
+                card["friendship"] = friendship
+                if isinstance(friendship, int) and friendship >= 0:
+                    set_text(card["l4"], f"Amistad: {friendship}/255")
+                    card["l4"].pack(before=card["evo_frame"])
+                else:
+                    card["l4"].pack_forget()
+
+        def reconciliar_last(last):
+            actual = vista["last"]
+            if actual is not None and actual["datos"] == last:
+                return
+            # Último capturado (clic para abrir Pokédex)
+            if not last:
+                if actual is not None:
+                    actual["widget"].destroy()
+                    vista["last"] = None
+                return
             last_id = last.get("SpeciesId")
-            last_nick = last.get("Nickname") or ""
-            last_friendship = last.get("Friendship", -1)
-            last_nombre, last_sprite_url = obtener_datos_pokeapi(last_id)
-            last_photo = cargar_sprite(last_sprite_url, size=64)
+            if actual is not None and actual["species_id"] == last_id:
+                # Misma especie: solo cambian textos (apodo, nivel, amistad).
+                actual["datos"] = last
+                actualizar_last(actual)
+                return
+            if actual is not None:
+                actual["widget"].destroy()
+
+            last_frame = ttk.LabelFrame(last_area, text="Último capturado", padding=10)
+            last_frame.pack(fill=tk.X, pady=(16, 0))
+            view = {"species_id": last_id, "datos": last, "widget": last_frame, "nombre_api": f"Species {last_id}"}
+            vista["last"] = view
             inner = ttk.Frame(last_frame)
             inner.pack()
 
             def abrir_last():
-                abrir_pokedex(last_id, last_nick, str(last.get("Level", "?")))
-
-            if last_photo:
-                lbl = ttk.Label(inner, image=last_photo, cursor="hand2")
-                lbl.image = last_photo
-                lbl.pack(side=tk.LEFT, padx=(0, 10))
-                lbl.bind("<Button-1>", lambda e: abrir_last())
-            last_txt = ttk.Label(
-                inner,
-                text=f"{last_nick or last_nombre} (Nivel {last.get('Level', '?')}) — Clic para Pokédex",
-                font=("Segoe UI", 10),
-                cursor="hand2",
-            )
-            last_txt.pack(side=tk.LEFT)
-            last_txt.bind("<Button-1>", lambda e: abrir_last())
+                datos_last = view["datos"]
+                abrir_pokedex(last_id, datos_last.get("Nickname") or "", str(datos_last.get("Level", "?")))
+
+            lbl = ttk.Label(inner, cursor="hand2")
+            lbl.pack(side=tk.LEFT, padx=(0, 10))
+            lbl.bind("<Button-1>", lambda e: abrir_last())
+            view["txt"] = ttk.Label(inner, font=("Segoe UI", 10), cursor="hand2")
+            view["txt"].pack(side=tk.LEFT)
+            view["txt"].bind("<Button-1>", lambda e: abrir_last())
             last_frame.bind("<Button-1>", lambda e: abrir_last())
+            view["friendship"] = ttk.Label(last_frame, style="Subtle.TLabel")
+            actualizar_last(view)
+
+            def cargar_last(species_id):
+                last_nombre, last_sprite_url = obtener_datos_pokeapi(species_id)
+                return last_nombre, last_sprite_url, descargar_imagen(last_sprite_url, size=64)
+
+            def completar_last(resultado):
+                if isinstance(resultado, Exception) or not last_frame.winfo_exists():
+                    return
+                view["nombre_api"], last_sprite_url, last_img = resultado
+                actualizar_last(view)
+                last_photo = foto(last_sprite_url, 64, last_img)
+                if last_photo:
+                    lbl.configure(image=last_photo)
+                    lbl.image = last_photo
+                else:
+                    lbl.pack_forget()
+
+            en_segundo_plano(cargar_last, completar_last, last_id)
+
+        def actualizar_last(view):
+            last = view["datos"]
+            last_nick = last.get("Nickname") or ""
+            set_text(view["txt"], f"{last_nick or view['nombre_api']} (Nivel {last.get('Level', '?')}) — Clic para Pokédex")
+            last_friendship = last.get("Friendship", -1)
             if isinstance(last_friendship, int) and last_friendship >= 0:
-                ttk.Label(
-                    last_frame,
-                    text=f"Amistad actual: {last_friendship}/255",
-                    style="Subtle.TLabel",
-                ).pack(anchor=tk.W, pady=(6, 0))
+                set_text(view["friendship"], f"Amistad actual: {last_friendship}/255")
+                view["friendship"].pack(anchor=tk.W, pady=(6, 0))
+            else:
+                view["friendship"].pack_forget()
+
+        panel = {"ruta": ruta, "status_var": status_var, "render_data": render_data}
+        # Enlace de trazas del disparo del watcher, primer aviso de error y pintado diferido (pestaña oculta).
+        estado = {"encargo": None, "avisar_error": True, "diferido": None, "por_aplicar": []}
+        # Detector (NumPy) e historial se crean en la primera lectura, ya en el pool y no en el arranque.
+        perezosos = {}
+
+        def parsear():
+            """Hilo de `ColaParseo`: decide qué cambió y lee el save; el pintado se hace en el hilo de Tk."""
+            if not perezosos:
+                # Sin historial (directorio sin permisos, disco lleno) el HUD sigue refrescando igual.
+                try:
+                    historial = historial_para(ruta)
+                except OSError:
+                    historial = None
+                perezosos.update(detector=crear_detector(), historial=historial)
+            detector, historial = perezosos["detector"], perezosos["historial"]
+            encargo, estado["encargo"] = estado["encargo"], None
+            datos = secciones = error = None
+            with trazas.tramo("refresco", padre=encargo, ruta=ruta) as tramo:
+                try:
+                    # Si el emulador reescribió el save sin tocar nada que muestre el HUD, no se parsea.
+                    with trazas.tramo("save.cambios"):
+                        secciones = detector.cambios(ruta) if detector is not None else None
+                    if secciones is not None and not secciones:
+                        tramo.set(omitido=True)
+                        return
+                    with trazas.tramo("save.leer"):
+                        datos = motor.leer_save(ruta)
+                except Exception as ex:
+                    if detector is not None:
+                        detector.olvidar()
+                    error = ex
+                if datos:
+                    # Una fila por snapshot distinto; un fallo del historial no corta el refresco.
+                    if historial is not None:
+                        try:
+                            with trazas.tramo("historial.anexar") as tramo_historial:
+                                tramo_historial.set(nueva=historial.registrar(datos))
+                        except OSError:
+                            pass
+                    # Lo que se pintará en el próximo arranque mientras llega la lectura fresca.
+                    try:
+                        with trazas.tramo("instantanea.guardar"):
+                            guardar_instantanea(ruta, datos)
+                    except OSError:
+                        pass
+                vuelta = trazas.enlace()
+            # Se cuenta antes de salir del pool para que `pendientes` no pase por cero entre medias.
+            estado["por_aplicar"].append(None)
+            en_hilo_tk(lambda: aplicar(datos, secciones, error, vuelta))
+
+        def aplicar(datos, secciones, error, vuelta):
+            estado["por_aplicar"].pop()
+            with trazas.tramo("aplicar.refresco", padre=vuelta):
+                avisar_error, estado["avisar_error"] = estado["avisar_error"], False
+                if error is not None:
+                    status_var.set("Error al leer save. Reintentando...")
+                    if avisar_error:
+                        messagebox.showerror("Error", f"No se pudo leer el save:\n{error}")
+                    return
+                if not visible(ruta):
+                    # Pestaña oculta: se pinta al mostrarla, juntando las secciones de todos los cambios.
+                    previo = estado["diferido"]
+                    if previo is not None:
+                        secciones = None if previo[1] is None or secciones is None else previo[1] | secciones
+                    estado["diferido"] = (datos, secciones)
+                    status_var.set(f"Leído: {time.strftime('%H:%M:%S')} (se pinta al abrir la pestaña)")
+                    return
+                render_data(datos, secciones)
+                status_var.set(f"Actualizado: {time.strftime('%H:%M:%S')}")
+                if arranque["datos_frescos_ms"] is None:
+                    arranque["datos_frescos_ms"] = (time.perf_counter_ns() - INICIO_NS) / 1e6
+                    trazas.registrar("arranque.datos_frescos", INICIO_NS)
+
+        def mostrar_instantanea():
+            """Pinta (o deja pendiente, si la pestaña está oculta) la última lectura de la sesión anterior."""
+            previa = cargar_instantanea(ruta)
+            if previa is None:
+                return False
+            datos, guardada = previa
+            cuando = time.strftime("%d/%m %H:%M", time.localtime(guardada)) if guardada else "?"
+            if visible(ruta):
+                render_data(datos)
+            else:
+                estado["diferido"] = (datos, None)
+            status_var.set(f"Última sesión ({cuando}) — actualizando...")
+            return True
 
-    def load_and_render(show_popup_on_error=False):
-        try:
-            datos = leer_wrapper(RUTA_SAVE)
-            render_data(datos)
-            status_var.set(f"Actualizado: {time.strftime('%H:%M:%S')}")
-        except Exception as ex:
-            status_var.set("Error al leer save. Reintentando...")
-            if show_popup_on_error:
-                messagebox.showerror("Error", f"No se pudo leer el save:\n{ex}")
-
-    stop_event = threading.Event()
-
-    def watch_save_loop():
-        last_signature = None
-        while not stop_event.is_set():
-            try:
-                st = os.stat(RUTA_SAVE)
-                signature = (st.st_mtime_ns, st.st_size)
-                if signature != last_signature:
-                    last_signature = signature
-                    time.sleep(SAVE_DEBOUNCE_SECONDS)
-                    root.after(0, load_and_render)
-            except FileNotFoundError:
-                root.after(0, lambda: status_var.set("Archivo save no encontrado."))
-            except Exception:
-                root.after(0, lambda: status_var.set("Error monitoreando save."))
-            time.sleep(POLL_SECONDS)
+        def mostrar():
+            diferido, estado["diferido"] = estado["diferido"], None
+            if diferido is not None:
+                render_data(*diferido)
+                status_var.set(f"Actualizado: {time.strftime('%H:%M:%S')}")
+
+        def encargar(encargo=None):
+            estado["encargo"] = encargo
+            cola.encargar(ruta)
+
+        panel.update(
+            parsear=parsear,
+            mostrar=mostrar,
+            mostrar_instantanea=mostrar_instantanea,
+            encargar=encargar,
+            por_aplicar=estado["por_aplicar"],
+        )
+        return panel
+
+    # Un panel por save (pestañas si hay más de uno); todos comparten motor, fotos y pools.
+    if len(rutas) == 1:
+        paneles = {rutas[0]: crear_panel(content, rutas[0], status_var)}
+        cuaderno = None
+    else:
+        cuaderno = ttk.Notebook(content)
+        cuaderno.pack(fill=tk.BOTH, expand=True)
+        paneles = {}
+        for ruta, etiqueta in zip(rutas, etiquetas_saves(rutas)):
+            pestana = ttk.Frame(cuaderno, padding=(0, 8, 0, 0))
+            cuaderno.add(pestana, text=etiqueta)
+            estado_var = tk.StringVar(value="Cargando save...")
+            ttk.Label(pestana, textvariable=estado_var, style="Subtle.TLabel").pack(anchor=tk.W, pady=(0, 8))
+            paneles[ruta] = crear_panel(pestana, ruta, estado_var)
+            paneles[ruta]["pestana"] = str(pestana)
+        status_var.set(f"Vigilando {len(rutas)} saves")
+    activa = {"ruta": rutas[0]}
+
+    def visible(ruta):
+        return ruta == activa["ruta"]
+
+    def on_tab_changed(event=None):
+        seleccion = cuaderno.select()
+        for ruta, panel in paneles.items():
+            if panel["pestana"] == seleccion:
+                activa["ruta"] = ruta
+                panel["mostrar"]()
+
+    if cuaderno is not None:
+        cuaderno.bind("<<NotebookTabChanged>>", on_tab_changed)
+
+    # Los saves cambiados se parsean en un pool acotado; la pestaña visible pasa primero.
+    cola = ColaParseo(
+        lambda ruta: paneles[ruta]["parsear"](),
+        prioridad=lambda ruta: 0 if visible(ruta) else 1,
+        workers=min(PARSE_WORKERS, len(rutas)),
+    )
 
-    load_and_render(show_popup_on_error=True)
-    watcher = threading.Thread(target=watch_save_loop, daemon=True)
-    watcher.start()
+    def save_cambiado(ruta):
+        paneles[ruta]["encargar"](trazas.enlace())
+
+    def save_faltante(ruta):
+        en_hilo_tk(lambda: paneles[ruta]["status_var"].set("Archivo save no encontrado."))
+
+    # inotify en Linux (sin sondeo en reposo); polling por `os.stat` en el resto. Un solo hilo para todos los saves.
+    watcher = crear_watcher(
+        rutas,
+        al_cambiar=save_cambiado,
+        al_faltar=save_faltante,
+        al_error=lambda ex: en_hilo_tk(lambda: status_var.set("Error monitoreando saves.")),
+    )
+
+    # Arranque en caliente: la instantánea se pinta ya y la lectura fresca la reconcilia al llegar.
+    arranque = {"origen": "vacio", "primer_cuadro_ms": None, "datos_frescos_ms": None}
+    with trazas.tramo("arranque.instantanea"):
+        pintadas = [panel["mostrar_instantanea"]() for panel in paneles.values()]
+    if any(pintadas):
+        arranque["origen"] = "instantanea"
+
+    def primer_cuadro(event=None):
+        # Ventana ya mapeada: lo que queda en cola tras los redibujados pendientes es el primer cuadro.
+        root.unbind("<Map>")
+
+        def marcar():
+            arranque["primer_cuadro_ms"] = (time.perf_counter_ns() - INICIO_NS) / 1e6
+            trazas.registrar("arranque.primer_cuadro", INICIO_NS, origen=arranque["origen"])
+
+        root.after_idle(marcar)
+
+    root.bind("<Map>", primer_cuadro)
+
+    for panel in paneles.values():
+        panel["encargar"]()
+    watcher.iniciar()
+    if motor.pack is None and (motor.indice_nombres.caducado() or not motor.nombres_completos(MAX_SPECIES_GEN7)):
+        pedir_nombres()
 
     def on_close():
-        stop_event.set()
+        watcher.detener()
+        cola.detener()
+        fetch_pool.shutdown(wait=False, cancel_futures=True)
         root.destroy()
 
     root.protocol("WM_DELETE_WINDOW", on_close)
+
+    def exportar_trazas(event=None):
+        ruta = trazas.RUTA_ENTORNO or f"trazas_{time.strftime('%Y%m%d_%H%M%S')}.json"
+        try:
+            n = trazas.exportar_chrome(ruta)
+        except OSError as ex:
+            status_var.set(f"No se pudieron exportar las trazas: {ex}")
+            return
+        status_var.set(f"Trazas exportadas ({n} tramos): {os.path.basename(ruta)}")
+
+    if trazas.activas():
+        # Con HUD_TRAZAS, F12 vuelca lo registrado hasta ahora sin cerrar el HUD.
+        root.bind("<F12>", exportar_trazas)
+    if al_iniciar is not None:
+        al_iniciar({
+            "root": root,
+            "motor": motor,
+            "status_var": status_var,
+            "render_data": paneles[rutas[0]]["render_data"],
+            "load_and_render": paneles[rutas[0]]["encargar"],
+            "paneles": paneles,
+            "obtener_info_pokedex": obtener_info_pokedex,
+            "obtener_siguiente_evolucion": obtener_siguiente_evolucion,
+            "abrir_pokedex_completa": abrir_pokedex_completa,
+            "abrir_cajas": abrir_cajas,
+            "abrir_historial": abrir_historial,
+            "arranque": arranque,
+            "pendientes": lambda: (
+                trabajos["pendientes"] + cola.pendientes() + sum(len(p["por_aplicar"]) for p in paneles.values())
+            ),
+            "cerrar": on_close,
+        })
     root.mainloop()
 
 
 if __name__ == "__main__":
-    main()
+    # `python ui_equipo.py [save1 save2 ...]`: sin argumentos se vigila RUTA_SAVE.
+    main(rutas=sys.argv[1:] or None)
@@ -0,0 +1,190 @@
+"""
+Cliente del modo persistente del wrapper PokeLastCatch (`PokeLastCatch --server`).
+
+En lugar de lanzar `dotnet run` en cada refresco, se mantiene un único proceso vivo
+que recibe peticiones JSON por stdin (una por línea) y responde una línea JSON por stdout.
+Así solo se paga una vez el arranque del runtime, la carga de PKHeX.Core y la reflexión.
+"""
+import atexit
+import collections
+import json
+import queue
+import subprocess
+import threading
+
+import trazas
+
+# Tiempo máximo de espera por respuesta. La primera petición incluye la compilación de `dotnet run`.
+TIMEOUT_ARRANQUE = 120.0
+TIMEOUT_PETICION = 30.0
+
+
+class WrapperDaemon:
+    """Dueño del proceso `PokeLastCatch --server`: lo arranca, lo reinicia si muere y serializa peticiones."""
+
+    def __init__(self, ruta_proyecto, comando=None):
+        self.ruta_proyecto = ruta_proyecto
+        self.comando = comando or ["dotnet", "run", "--project", ruta_proyecto, "--", "--server"]
+        self._lock = threading.Lock()
+        self._proc = None
+        self._respuestas = None
+        self._stderr = collections.deque(maxlen=50)
+        self._next_id = 0
+        self._primera_peticion = True
+
+    def _arrancar(self):
+        self._proc = subprocess.Popen(
+            self.comando,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+            cwd=self.ruta_proyecto,
+        )
+        self._respuestas = queue.Queue()
+        self._primera_peticion = True
+        self._stderr.clear()
+        # Hilos lectores: stdout alimenta la cola de respuestas; stderr se drena para no bloquear el proceso.
+        threading.Thread(target=self._leer_stdout, args=(self._proc, self._respuestas), daemon=True).start()
+        threading.Thread(target=self._leer_stderr, args=(self._proc,), daemon=True).start()
+
+    def _leer_stdout(self, proc, respuestas):
+        for linea in proc.stdout:
+            linea = linea.strip()
+            # `dotnet run` puede imprimir avisos de compilación antes del primer JSON.
+            if linea.startswith("{"):
+                respuestas.put(linea)
+        respuestas.put(None)
+
+    def _leer_stderr(self, proc):
+        for linea in proc.stderr:
+            self._stderr.append(linea.rstrip())
+
+    def _detener(self):
+        proc = self._proc
+        self._proc = None
+        if proc is None:
+            return
+        try:
+            proc.kill()
+            proc.wait(timeout=5)
+        except Exception:
+            pass
+
+    def _peticion(self, payload, al_parcial=None):
+        """
+        Envía `payload` y devuelve su respuesta final. Las líneas intermedias de la misma petición
+        (`{"id", "slot": ...}` de "boxes") se entregan a `al_parcial` según llegan.
+        """
+        if self._proc is None or self._proc.poll() is not None:
+            self._detener()
+            self._arrancar()
+
+        self._next_id += 1
+        payload = dict(payload, id=self._next_id)
+        timeout = TIMEOUT_ARRANQUE if self._primera_peticion else TIMEOUT_PETICION
+        self._proc.stdin.write(json.dumps(payload) + "\n")
+        self._proc.stdin.flush()
+
+        while True:
+            try:
+                linea = self._respuestas.get(timeout=timeout)
+            except queue.Empty:
+                self._detener()
+                raise TimeoutError(f"El wrapper no respondió en {timeout:.0f}s")
+            if linea is None:
+                detalle = "\n".join(self._stderr) or "el proceso terminó inesperadamente"
+                self._detener()
+                raise ConnectionError(f"Wrapper caído: {detalle}")
+            try:
+                with trazas.tramo("wrapper.json", bytes=len(linea)):
+                    respuesta = json.loads(linea)
+            except json.JSONDecodeError:
+                continue
+            # Respuestas de peticiones anteriores que expiraron se descartan.
+            if respuesta.get("id") != self._next_id:
+                continue
+            self._primera_peticion = False
+            if al_parcial is not None and "slot" in respuesta:
+                al_parcial(respuesta["slot"])
+                continue
+            return respuesta
+
+    def parse(self, ruta_save):
+        """
+        Devuelve el mismo dict que imprimiría `PokeLastCatch <ruta_save> --bits`: visto/capturado como
+        bitsets en base64 (`SeenBits`/`CaughtBits`) en lugar de listas de hasta 807 IDs. Un wrapper
+        compilado antes de esa opción la ignora y sigue mandando listas (`indice_pokedex.normalizar_pokedex`
+        acepta las dos formas).
+        """
+        with self._lock, trazas.tramo("wrapper.parse") as tramo:
+            tramo.set(arranque=self._proc is None or self._proc.poll() is not None)
+            payload = {"op": "parse", "path": ruta_save, "bits": True}
+            try:
+                respuesta = self._peticion(payload)
+            except TimeoutError:
+                raise
+            except OSError:
+                # Un reinicio automático: si el proceso murió (tubería rota o caída), se vuelve a lanzar.
+                self._detener()
+                tramo.set(reinicio=True)
+                respuesta = self._peticion(payload)
+        if not respuesta.get("ok"):
+            raise RuntimeError(respuesta.get("error") or "Error al ejecutar wrapper")
+        return respuesta.get("data") or {}
+
+    def cajas(self, ruta_save):
+        """
+        Inventario de cajas: un dict por slot ocupado, igual que cada línea de `PokeLastCatch <ruta_save> --cajas`.
+        El wrapper los manda en streaming (una línea por slot); aquí se juntan según llegan.
+        """
+        registros = []
+        with self._lock, trazas.tramo("wrapper.cajas") as tramo:
+            payload = {"op": "boxes", "path": ruta_save}
+            try:
+                respuesta = self._peticion(payload, registros.append)
+            except TimeoutError:
+                raise
+            except OSError:
+                self._detener()
+                registros.clear()
+                tramo.set(reinicio=True)
+                respuesta = self._peticion(payload, registros.append)
+            tramo.set(slots=len(registros))
+        if not respuesta.get("ok"):
+            raise RuntimeError(respuesta.get("error") or "Error al ejecutar wrapper")
+        return registros
+
+    def cerrar(self):
+        with self._lock:
+            proc = self._proc
+            if proc is not None and proc.poll() is None:
+                try:
+                    proc.stdin.write(json.dumps({"op": "exit"}) + "\n")
+                    proc.stdin.flush()
+                    proc.wait(timeout=2)
+                except Exception:
+                    pass
+            self._detener()
+
+
+_daemons = {}
+_daemons_lock = threading.Lock()
+
+
+def obtener_daemon(ruta_proyecto):
+    """Devuelve el daemon compartido del proceso para `ruta_proyecto` (se crea bajo demanda)."""
+    with _daemons_lock:
+        daemon = _daemons.get(ruta_proyecto)
+        if daemon is None:
+            daemon = WrapperDaemon(ruta_proyecto)
+            _daemons[ruta_proyecto] = daemon
+        return daemon
+
+
+@atexit.register
+def _cerrar_todos():
+    for daemon in list(_daemons.values()):
+        daemon.cerrar()